@@ -0,0 +1,31 @@
+"""baseline: schéma créé par Base.metadata.create_all
+
+Jusqu'ici le schéma était créé au démarrage par create_all (app/main.py).
+Cette révision sert de point de départ: sur une base vide elle crée les
+tables des modèles, sur une base existante elle ne fait rien (create_all
+ignore les tables présentes).
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2025-06-02 10:00:00
+"""
+
+from alembic import op
+
+from app.core.database import Base
+import app.models  # noqa: F401
+
+# Identifiants de révision utilisés par Alembic
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    Base.metadata.create_all(bind=op.get_bind())
+
+
+def downgrade() -> None:
+    # Pas de retour en arrière au-delà du schéma initial
+    pass
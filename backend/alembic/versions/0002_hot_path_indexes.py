@@ -0,0 +1,74 @@
+"""index composites et partiels des filtres les plus fréquents
+
+Formes de requêtes couvertes (voir explain_queries.py):
+- produits actifs listés par date, catégorie, prix, ventes, mis en avant;
+- commandes payées sur une période, listes admin par statut, historique client;
+- articles de commande par commande et par produit (analytics, recommandations);
+- rendez-vous par date et statut (créneaux, planning, liste admin).
+
+Sur PostgreSQL les index sont créés en CONCURRENTLY (sans bloquer les
+écritures), hors transaction.
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2025-06-02 10:30:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Identifiants de révision utilisés par Alembic
+revision = "0002_hot_path_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+ACTIVE_ONLY = ("is_active = true", "is_active = 1")
+FEATURED_ONLY = ("is_active = true AND is_featured = true", "is_active = 1 AND is_featured = 1")
+
+# (nom, table, colonnes, prédicat partiel (PostgreSQL, SQLite) ou None)
+INDEXES = [
+    ("ix_products_active_created", "products", ["created_at", "id"], ACTIVE_ONLY),
+    ("ix_products_active_category_created", "products", ["category_id", "created_at", "id"], ACTIVE_ONLY),
+    ("ix_products_active_price", "products", ["price", "id"], ACTIVE_ONLY),
+    ("ix_products_active_sales", "products", ["sales_count", "id"], ACTIVE_ONLY),
+    ("ix_products_featured", "products", ["sales_count", "created_at"], FEATURED_ONLY),
+    ("ix_products_category_id", "products", ["category_id"], None),
+    ("ix_orders_payment_status_created", "orders", ["payment_status", "created_at"], None),
+    ("ix_orders_status_created", "orders", ["status", "created_at", "id"], None),
+    ("ix_orders_created", "orders", ["created_at", "id"], None),
+    ("ix_orders_user_created", "orders", ["user_id", "created_at"], None),
+    ("ix_order_items_order_id", "order_items", ["order_id"], None),
+    ("ix_order_items_product_order", "order_items", ["product_id", "order_id"], None),
+    ("ix_appointments_scheduled_status", "appointments", ["scheduled_date", "status"], None),
+    ("ix_appointments_status_scheduled", "appointments", ["status", "scheduled_date", "id"], None),
+    ("ix_appointments_user_scheduled", "appointments", ["user_id", "scheduled_date"], None),
+]
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    def create_all():
+        for name, table, columns, where in INDEXES:
+            kwargs = {}
+            if where:
+                kwargs["postgresql_where"] = sa.text(where[0])
+                kwargs["sqlite_where"] = sa.text(where[1])
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=is_postgres,
+                **kwargs
+            )
+
+    if is_postgres:
+        with op.get_context().autocommit_block():
+            create_all()
+    else:
+        create_all()
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
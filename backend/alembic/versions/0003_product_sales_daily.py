@@ -0,0 +1,40 @@
+"""agrégats quotidiens des ventes payées par produit (classements)
+
+Table product_sales_daily: instantané des classements 7/30/90 jours relu
+au démarrage. Elle est remplie depuis les commandes payées au premier
+démarrage (voir LeaderboardService.rebuild).
+
+Revision ID: 0003_product_sales_daily
+Revises: 0002_hot_path_indexes
+Create Date: 2025-06-09 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Identifiants de révision utilisés par Alembic
+revision = "0003_product_sales_daily"
+down_revision = "0002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # La révision de base crée déjà la table sur une base neuve
+    if sa.inspect(op.get_bind()).has_table("product_sales_daily"):
+        return
+
+    op.create_table(
+        "product_sales_daily",
+        sa.Column("product_id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("line_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_product_sales_daily_day", "product_sales_daily", ["day"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_sales_daily_day", table_name="product_sales_daily", if_exists=True)
+    op.drop_table("product_sales_daily")
@@ -0,0 +1,53 @@
+"""réservations temporaires de stock (paniers avec expiration)
+
+- products.reserved_quantity: unités retenues par les réservations en cours;
+- table stock_holds: une ligne par produit réservé, avec son expiration.
+
+Revision ID: 0004_stock_holds
+Revises: 0003_product_sales_daily
+Create Date: 2025-06-16 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Identifiants de révision utilisés par Alembic
+revision = "0004_stock_holds"
+down_revision = "0003_product_sales_daily"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # La révision de base crée déjà colonne et table sur une base neuve
+    if "reserved_quantity" not in {column["name"] for column in inspector.get_columns("products")}:
+        op.add_column(
+            "products",
+            sa.Column("reserved_quantity", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    if not inspector.has_table("stock_holds"):
+        op.create_table(
+            "stock_holds",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("token", sa.String(36), nullable=False),
+            sa.Column(
+                "product_id", sa.Integer(),
+                sa.ForeignKey("products.id", ondelete="CASCADE"),
+                nullable=False
+            ),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_stock_holds_id", "stock_holds", ["id"])
+        op.create_index("ix_stock_holds_token", "stock_holds", ["token"])
+        op.create_index("ix_stock_holds_expires_product", "stock_holds", ["expires_at", "product_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("stock_holds")
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("reserved_quantity")
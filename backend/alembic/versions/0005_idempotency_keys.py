@@ -0,0 +1,43 @@
+"""clés d'idempotence des créations de commande
+
+Table idempotency_keys: réponse enregistrée par (portée, Idempotency-Key),
+rejouée quand un client répète la même requête.
+
+Revision ID: 0005_idempotency_keys
+Revises: 0004_stock_holds
+Create Date: 2025-06-23 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Identifiants de révision utilisés par Alembic
+revision = "0005_idempotency_keys"
+down_revision = "0004_stock_holds"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # La révision de base crée déjà la table sur une base neuve
+    if sa.inspect(op.get_bind()).has_table("idempotency_keys"):
+        return
+
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("scope", sa.String(100), nullable=False),
+        sa.Column("key", sa.String(255), nullable=False),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("response_body", sa.Text(), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,35 @@
+"""compteurs journaliers des numéros de commande et de facture
+
+Table number_sequences: dernier numéro distribué par série (WA, ST, INV)
+et par jour. Remplace le suffixe aléatoire (uuid4) des numéros.
+
+Revision ID: 0006_number_sequences
+Revises: 0005_idempotency_keys
+Create Date: 2025-06-30 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Identifiants de révision utilisés par Alembic
+revision = "0006_number_sequences"
+down_revision = "0005_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # La révision de base crée déjà la table sur une base neuve
+    if sa.inspect(op.get_bind()).has_table("number_sequences"):
+        return
+
+    op.create_table(
+        "number_sequences",
+        sa.Column("series", sa.String(10), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("last_value", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("number_sequences")
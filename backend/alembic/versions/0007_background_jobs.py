@@ -0,0 +1,47 @@
+"""tâches durables exécutées après commande (facture, notifications)
+
+Table background_jobs: file de tâches écrite dans la transaction de la
+commande, exécutée par le worker de l'application ou par Celery.
+
+Revision ID: 0007_background_jobs
+Revises: 0006_number_sequences
+Create Date: 2025-07-07 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Identifiants de révision utilisés par Alembic
+revision = "0007_background_jobs"
+down_revision = "0006_number_sequences"
+branch_labels = None
+depends_on = None
+
+job_status = sa.Enum("PENDING", "RUNNING", "SUCCEEDED", "FAILED", name="jobstatus")
+
+
+def upgrade() -> None:
+    # La révision de base crée déjà la table sur une base neuve
+    if sa.inspect(op.get_bind()).has_table("background_jobs"):
+        return
+
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", job_status, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="5"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_background_jobs_status_run_at", "background_jobs", ["status", "run_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("background_jobs")
+    job_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""index sur users.phone (recherche des clients invités par téléphone)
+
+Les commandes WhatsApp sans email retrouvent leur client par téléphone
+(GuestCustomerService). Sur PostgreSQL l'index est créé en CONCURRENTLY.
+
+Revision ID: 0008_users_phone_index
+Revises: 0007_background_jobs
+Create Date: 2025-07-14 09:00:00
+"""
+
+from alembic import op
+
+# Identifiants de révision utilisés par Alembic
+revision = "0008_users_phone_index"
+down_revision = "0007_background_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    if is_postgres:
+        with op.get_context().autocommit_block():
+            op.create_index("ix_users_phone", "users", ["phone"], if_not_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index("ix_users_phone", "users", ["phone"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_phone", table_name="users", if_exists=True)
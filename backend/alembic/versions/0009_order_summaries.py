@@ -0,0 +1,42 @@
+"""résumé dénormalisé des commandes (nombre d'articles et client)
+
+orders.item_count, orders.customer_name et orders.customer_email sont
+fixés à la création de la commande: les listes n'ont plus à charger les
+articles ni l'utilisateur de chaque ligne. Colonnes NULL sur les commandes
+existantes, remplies ensuite par backfill_order_summaries.py (par lots,
+sans verrouiller toute la table pendant la migration).
+
+Revision ID: 0009_order_summaries
+Revises: 0008_users_phone_index
+Create Date: 2025-07-21 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Identifiants de révision utilisés par Alembic
+revision = "0009_order_summaries"
+down_revision = "0008_users_phone_index"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("item_count", sa.Integer()),
+    ("customer_name", sa.String(201)),
+    ("customer_email", sa.String(255)),
+)
+
+
+def upgrade() -> None:
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("orders")}
+
+    # Colonnes nullables sans défaut: ajout instantané, sans réécrire la table
+    for name, column_type in COLUMNS:
+        if name not in existing:
+            op.add_column("orders", sa.Column(name, column_type, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("orders") as batch:
+        for name, _ in reversed(COLUMNS):
+            batch.drop_column(name)
@@ -3,15 +3,37 @@ Endpoints d'administration pour la gestion du back-office
 Tous les endpoints nécessitent une authentification admin
 """
 
+from datetime import date
 from typing import Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from slugify import slugify
 
 from app.core.database import get_db
+from app.core.pagination import COUNT_MODES, count_total, paginate
+from app.core.responses import FastJSONResponse
 from app.core.security import get_current_admin_user
+from app.models.job import JobStatus
 from app.models.product import Product, Category
 from app.models.user import User
+from app.schemas.catalog import AdminProductItem, AdminProductPage
+from app.schemas.product import ProductBulkUpdate
+from app.services.product_service import (
+    PRODUCT_LIST_OPTIONS,
+    active_product_counts,
+    get_product_service
+)
+from app.services.job_queue import get_job_queue_service, job_worker
+from app.services.product_io_service import get_product_export_service, get_product_import_service
+from app.services.catalog_cache import (
+    catalog_cache,
+    categories_changed,
+    product_deleted,
+    products_changed
+)
 
 router = APIRouter()
 
@@ -32,16 +54,19 @@ async def get_all_categories(
     if not include_inactive:
         query = query.filter(Category.is_active == True)
     
-    categories = (
+    total = query.count()
+    
+    counts = active_product_counts()
+    rows = (
         query
+        .add_columns(func.coalesce(counts.c.product_count, 0))
+        .outerjoin(counts, counts.c.category_id == Category.id)
         .order_by(Category.sort_order, Category.name)
         .offset(skip)
         .limit(limit)
         .all()
     )
     
-    total = query.count()
-    
     return {
         "categories": [
             {
@@ -52,11 +77,11 @@ async def get_all_categories(
                 "image_url": cat.image_url,
                 "is_active": cat.is_active,
                 "sort_order": cat.sort_order,
-                "product_count": len([p for p in cat.products if p.is_active]),
+                "product_count": product_count,
                 "created_at": cat.created_at,
                 "updated_at": cat.updated_at
             }
-            for cat in categories
+            for cat, product_count in rows
         ],
         "total": total
     }
@@ -98,6 +123,7 @@ async def create_category(
     db.add(category)
     db.commit()
     db.refresh(category)
+    categories_changed()
     
     return {
         "message": "Catégorie créée avec succès",
@@ -150,6 +176,7 @@ async def update_category(
         category.is_active = is_active
     
     db.commit()
+    categories_changed()
     
     return {"message": "Catégorie mise à jour avec succès"}
 
@@ -166,34 +193,41 @@ async def delete_category(
         raise HTTPException(status_code=404, detail="Catégorie non trouvée")
     
     # Vérifier si la catégorie a des produits actifs
-    active_products = [p for p in category.products if p.is_active]
+    active_products = (
+        db.query(func.count(Product.id))
+        .filter(Product.category_id == category_id, Product.is_active == True)
+        .scalar()
+    )
     if active_products:
         raise HTTPException(
             status_code=400, 
-            detail=f"Impossible de supprimer: {len(active_products)} produits actifs dans cette catégorie"
+            detail=f"Impossible de supprimer: {active_products} produits actifs dans cette catégorie"
         )
     
     # Soft delete - désactiver au lieu de supprimer
     category.is_active = False
     db.commit()
+    categories_changed()
     
     return {"message": "Catégorie supprimée avec succès"}
 
 
 # ========== PRODUCTS ADMIN (complémentaires) ==========
 
-@router.get("/products", dependencies=[Depends(get_current_admin_user)])
+@router.get("/products", response_model=AdminProductPage, dependencies=[Depends(get_current_admin_user)])
 async def get_all_products_admin(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     include_inactive: bool = True,
     category_id: Optional[int] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", regex=COUNT_MODES),
     db: Session = Depends(get_db)
 ) -> Any:
     """Liste tous les produits pour l'admin (incluant les inactifs, auth requise)"""
     
-    query = db.query(Product)
+    query = db.query(Product).options(*PRODUCT_LIST_OPTIONS)
     
     if not include_inactive:
         query = query.filter(Product.is_active == True)
@@ -204,38 +238,19 @@ async def get_all_products_admin(
     if search:
         query = query.filter(Product.name.ilike(f"%{search}%"))
     
-    total = query.count()
-    products = query.order_by(Product.created_at.desc()).offset(skip).limit(limit).all()
+    total = count_total(query, count)
+    products, has_more, next_cursor = paginate(
+        query, Product.created_at, Product.id, limit, skip=skip, cursor=cursor
+    )
     
-    return {
-        "products": [
-            {
-                "id": p.id,
-                "name": p.name,
-                "slug": p.slug,
-                "description": p.description,
-                "short_description": p.short_description,
-                "price": p.price,
-                "compare_at_price": p.compare_at_price,
-                "stock_quantity": p.stock_quantity,
-                "main_image_url": p.main_image_url,
-                "is_active": p.is_active,
-                "is_featured": p.is_featured,
-                "category": {
-                    "id": p.category.id,
-                    "name": p.category.name,
-                    "slug": p.category.slug
-                } if p.category else None,
-                "sales_count": p.sales_count,
-                "view_count": p.view_count,
-                "created_at": p.created_at
-            }
-            for p in products
-        ],
-        "total": total,
-        "skip": skip,
-        "limit": limit
-    }
+    return FastJSONResponse(AdminProductPage(
+        products=[AdminProductItem.model_validate(p) for p in products],
+        total=total,
+        skip=skip,
+        limit=limit,
+        has_more=has_more,
+        next_cursor=next_cursor
+    ))
 
 
 @router.put("/products/{product_id}/toggle-active", dependencies=[Depends(get_current_admin_user)])
@@ -251,6 +266,7 @@ async def toggle_product_active(
     
     product.is_active = not product.is_active
     db.commit()
+    products_changed([product_id])
     
     return {
         "message": f"Produit {'activé' if product.is_active else 'désactivé'}",
@@ -277,4 +293,132 @@ async def delete_product(
     
     db.commit()
     
+    if permanent:
+        product_deleted(db, product_id)
+    else:
+        products_changed([product_id])
+    
     return {"message": "Produit supprimé avec succès"}
+
+
+@router.post("/products/bulk-update", dependencies=[Depends(get_current_admin_user)])
+async def bulk_update_products(
+    payload: ProductBulkUpdate,
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Modifier des produits en masse (authentification admin requise)
+    
+    Chaque opération cible une liste d'ids avec:
+    - patch: champs à écraser (prix, stock, statut, mise en avant, catégorie...)
+    - price_adjustment_percent: variation de prix en % (keep_original_price pour une promo)
+    - stock_adjustment: variation de stock
+    
+    Tout est appliqué dans une seule transaction (tout ou rien).
+    """
+    
+    try:
+        result = get_product_service(db).bulk_update(payload.operations)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"message": f"{result['products']} produit(s) mis à jour", **result}
+
+
+@router.post("/products/import", dependencies=[Depends(get_current_admin_user)])
+async def import_products(
+    file: UploadFile = File(..., description="Fichier CSV ou NDJSON (une ligne par produit)"),
+    format: Optional[str] = Query(None, regex="^(csv|ndjson)$"),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Importer des produits en masse (authentification admin requise)
+    
+    - Les produits sont identifiés par slug (ou par SKU de variante)
+    - Existants: seules les colonnes présentes et non vides sont mises à jour
+    - Nouveaux: name et price sont requis
+    - Les lignes invalides sont listées dans errors sans interrompre l'import
+    """
+    
+    file_format = format or (
+        "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+    )
+    
+    # Traitement synchrone par lots, hors de la boucle d'événements
+    report = await run_in_threadpool(
+        get_product_import_service(db).import_file, file.file, file_format
+    )
+    
+    return {"message": "Import terminé", **report}
+
+
+@router.get("/products/export", dependencies=[Depends(get_current_admin_user)])
+async def export_products(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    include_inactive: bool = True
+) -> Any:
+    """Exporter le catalogue en flux CSV ou NDJSON (authentification admin requise)"""
+    
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    filename = f"produits-{date.today().isoformat()}.{format}"
+    
+    return StreamingResponse(
+        get_product_export_service().stream(format, include_inactive),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# ========== CACHE DU CATALOGUE ==========
+
+@router.get("/cache/stats", dependencies=[Depends(get_current_admin_user)])
+async def get_catalog_cache_stats() -> Any:
+    """Statistiques du cache du catalogue (taux de succès, mémoire utilisée)"""
+    
+    return catalog_cache.stats()
+
+
+@router.post("/cache/clear", dependencies=[Depends(get_current_admin_user)])
+async def clear_catalog_cache() -> Any:
+    """Vider le cache du catalogue (après une modification directe en base)"""
+    
+    catalog_cache.clear()
+    
+    return {"message": "Cache du catalogue vidé"}
+
+
+# ========== TÂCHES EN ARRIÈRE-PLAN ==========
+
+@router.get("/jobs/stats", dependencies=[Depends(get_current_admin_user)])
+async def get_job_stats(
+    db: Session = Depends(get_db)
+) -> Any:
+    """Tâches après commande par statut et par nom, retard de la file"""
+    
+    return get_job_queue_service(db).stats()
+
+
+@router.get("/jobs", dependencies=[Depends(get_current_admin_user)])
+async def list_jobs(
+    status: Optional[JobStatus] = None,
+    name: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+) -> Any:
+    """Dernières tâches (ex: status=failed pour les échecs définitifs)"""
+    
+    return {"jobs": get_job_queue_service(db).list_jobs(status, name, limit)}
+
+
+@router.post("/jobs/{job_id}/retry", dependencies=[Depends(get_current_admin_user)])
+async def retry_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+) -> Any:
+    """Relancer une tâche en échec définitif"""
+    
+    if not get_job_queue_service(db).retry(job_id):
+        raise HTTPException(status_code=404, detail="Tâche en échec non trouvée")
+    job_worker.wake()
+    
+    return {"message": "Tâche relancée"}
@@ -4,7 +4,7 @@ Endpoints pour les analytics et recommandations
 
 from typing import Any, List
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func, and_, desc
 from datetime import datetime, timedelta
 
@@ -13,6 +13,9 @@ from app.core.security import get_current_admin_user
 from app.models.product import Product
 from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
 from app.models.user import User
+from app.services.catalog_cache import sales_recorded
+from app.services.leaderboard_service import PERIODS, get_leaderboard_service
+from app.services.recommendation_service import get_recommendation_service
 
 router = APIRouter()
 
@@ -23,7 +26,39 @@ async def get_best_sellers_analytics(
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ) -> Any:
-    """Obtenir les meilleures ventes sur une période donnée"""
+    """
+    Obtenir les meilleures ventes sur une période donnée
+    
+    Les périodes de 7, 30 et 90 jours sont lues dans les classements
+    précalculés (jours calendaires, produits actifs); les autres sont
+    agrégées à la demande.
+    """
+    
+    if period_days in PERIODS:
+        leaderboard = get_leaderboard_service(db)
+        sales = leaderboard.product_sales(period_days, limit)
+        products = {
+            product.id: product for product in leaderboard.load_products(
+                [product_id for product_id, *_ in sales],
+                load_only(Product.id, Product.name, Product.price, Product.main_image_url)
+            )
+        }
+        return {
+            "period_days": period_days,
+            "best_sellers": [
+                {
+                    "product_id": product_id,
+                    "product_name": products[product_id].name,
+                    "product_price": products[product_id].price,
+                    "product_image": products[product_id].main_image_url,
+                    "total_sold": total_sold,
+                    "total_revenue": total_revenue,
+                    "order_count": order_count
+                }
+                for product_id, total_sold, total_revenue, order_count in sales
+                if product_id in products
+            ]
+        }
     
     # Date de début de la période
     start_date = datetime.utcnow() - timedelta(days=period_days)
@@ -77,45 +112,35 @@ async def get_frequently_bought_together(
     limit: int = Query(10, ge=1, le=20),
     db: Session = Depends(get_db)
 ) -> Any:
-    """Obtenir les produits souvent achetés ensemble"""
+    """
+    Obtenir les produits souvent achetés ensemble
+    
+    Avec product_id: voisins précalculés par le moteur de co-occurrence
+    (commandes payées), triés par score (lift ou cosinus).
+    """
     
     if product_id:
-        # Produits achetés avec un produit spécifique
-        subquery = (
-            db.query(OrderItem.order_id)
-            .filter(OrderItem.product_id == product_id)
-            .subquery()
-        )
-        
-        combinations = (
-            db.query(
-                Product.id,
-                Product.name,
-                Product.price,
-                Product.main_image_url,
-                func.count().label('frequency')
-            )
-            .join(OrderItem, Product.id == OrderItem.product_id)
-            .join(subquery, OrderItem.order_id == subquery.c.order_id)
-            .filter(Product.id != product_id)
-            .group_by(Product.id, Product.name, Product.price, Product.main_image_url)
-            .having(func.count() >= min_occurrences)
-            .order_by(desc('frequency'))
-            .limit(limit)
-            .all()
+        neighbours = get_recommendation_service(db).neighbours(
+            product_id, limit=limit, min_count=min_occurrences
         )
+        products = {
+            product.id: product
+            for product in db.query(Product).filter(Product.id.in_([n[0] for n in neighbours]))
+        } if neighbours else {}
         
         return {
             "product_id": product_id,
             "recommendations": [
                 {
-                    "product_id": item.id,
-                    "product_name": item.name,
-                    "product_price": item.price,
-                    "product_image": item.main_image_url,
-                    "frequency": int(item.frequency)
+                    "product_id": neighbour_id,
+                    "product_name": products[neighbour_id].name,
+                    "product_price": products[neighbour_id].price,
+                    "product_image": products[neighbour_id].main_image_url,
+                    "frequency": co_count,
+                    "score": score
                 }
-                for item in combinations
+                for neighbour_id, score, co_count in neighbours
+                if neighbour_id in products
             ]
         }
     
@@ -149,6 +174,49 @@ async def get_frequently_bought_together(
         }
 
 
+@router.get("/recommendations/stats", dependencies=[Depends(get_current_admin_user)])
+async def get_recommendation_stats(
+    db: Session = Depends(get_db)
+) -> Any:
+    """Statistiques du moteur de recommandations (Admin)"""
+    
+    service = get_recommendation_service(db)
+    service.ensure_loaded()
+    return service.model.stats()
+
+
+@router.post("/recommendations/rebuild", dependencies=[Depends(get_current_admin_user)])
+async def rebuild_recommendations(
+    db: Session = Depends(get_db)
+) -> Any:
+    """Reconstruire la matrice de co-occurrence depuis les commandes payées (Admin)"""
+    
+    stats = get_recommendation_service(db).rebuild()
+    return {"message": "Recommandations reconstruites", **stats}
+
+
+@router.get("/leaderboards/stats", dependencies=[Depends(get_current_admin_user)])
+async def get_leaderboard_stats(
+    db: Session = Depends(get_db)
+) -> Any:
+    """Statistiques des classements précalculés (Admin)"""
+    
+    service = get_leaderboard_service(db)
+    service.ensure_loaded()
+    return service.boards.stats()
+
+
+@router.post("/leaderboards/rebuild", dependencies=[Depends(get_current_admin_user)])
+async def rebuild_leaderboards(
+    db: Session = Depends(get_db)
+) -> Any:
+    """Recalculer les agrégats quotidiens depuis les commandes payées et les classements (Admin)"""
+    
+    stats = get_leaderboard_service(db).rebuild(backfill=True)
+    sales_recorded()
+    return {"message": "Classements reconstruits", **stats}
+
+
 @router.get("/sales-overview", dependencies=[Depends(get_current_admin_user)])
 async def get_sales_overview(
     period_days: int = Query(30, ge=1, le=365),
@@ -196,12 +264,15 @@ async def get_sales_overview(
     daily_sales = []
     for i in range(7):
         day = datetime.utcnow().date() - timedelta(days=i)
+        day_start = datetime.combine(day, datetime.min.time())
+        # Intervalle sur created_at (et non date(created_at)): l'index reste utilisable
         day_sales = (
             db.query(func.sum(Order.total_amount))
             .filter(
                 and_(
-                    func.date(Order.created_at) == day,
-                    Order.payment_status == PaymentStatus.PAID
+                    Order.payment_status == PaymentStatus.PAID,
+                    Order.created_at >= day_start,
+                    Order.created_at < day_start + timedelta(days=1)
                 )
             )
             .scalar() or 0
@@ -211,7 +282,27 @@ async def get_sales_overview(
             "sales": float(day_sales)
         })
     
-    # Top catégories
+    overview = {
+        "period_days": period_days,
+        "summary": {
+            "total_sales": float(total_sales),
+            "total_orders": int(total_orders),
+            "average_order_value": float(average_order_value),
+            "new_customers": int(new_customers)
+        },
+        "daily_sales": list(reversed(daily_sales)),  # Du plus ancien au plus récent
+    }
+    
+    # Top catégories (classement précalculé pour 7, 30 et 90 jours)
+    if period_days in PERIODS:
+        return {
+            **overview,
+            "category_sales": [
+                {"category_id": category_id, "revenue": revenue}
+                for category_id, revenue, _ in get_leaderboard_service(db).top_categories(period_days, 5)
+            ]
+        }
+    
     category_sales = (
         db.query(
             Product.category_id,
@@ -233,14 +324,7 @@ async def get_sales_overview(
     )
     
     return {
-        "period_days": period_days,
-        "summary": {
-            "total_sales": float(total_sales),
-            "total_orders": int(total_orders),
-            "average_order_value": float(average_order_value),
-            "new_customers": int(new_customers)
-        },
-        "daily_sales": list(reversed(daily_sales)),  # Du plus ancien au plus récent
+        **overview,
         "category_sales": [
             {
                 "category_id": item.category_id,
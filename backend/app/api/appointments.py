@@ -2,16 +2,18 @@
 Endpoints pour la gestion des rendez-vous
 """
 
-from typing import Any, List
+from typing import Any, List, Optional
 from datetime import datetime, timedelta, date
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
 from app.core.database import get_db
+from app.core.pagination import COUNT_MODES, count_total, paginate
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.appointment import Appointment, AppointmentStatus, ServiceSlot, BlockedDate
 from app.models.user import User
+from app.services.stats_service import get_stats_service
 
 router = APIRouter()
 
@@ -343,23 +345,32 @@ async def get_all_appointments(
     status: AppointmentStatus = None,
     date_from: date = None,
     date_to: date = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", regex=COUNT_MODES),
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir tous les rendez-vous (Admin)"""
     
-    query = db.query(Appointment).order_by(Appointment.scheduled_date.desc())
+    query = db.query(Appointment)
     
     if status:
         query = query.filter(Appointment.status == status)
     
+    # Bornes en intervalle sur scheduled_date (sargable, servies par l'index)
     if date_from:
-        query = query.filter(func.date(Appointment.scheduled_date) >= date_from)
+        query = query.filter(
+            Appointment.scheduled_date >= datetime.combine(date_from, datetime.min.time())
+        )
     
     if date_to:
-        query = query.filter(func.date(Appointment.scheduled_date) <= date_to)
+        query = query.filter(
+            Appointment.scheduled_date < datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+        )
     
-    total = query.count()
-    appointments = query.offset(skip).limit(limit).all()
+    total = count_total(query, count)
+    appointments, has_more, next_cursor = paginate(
+        query, Appointment.scheduled_date, Appointment.id, limit, skip=skip, cursor=cursor
+    )
     
     return {
         "appointments": [
@@ -380,7 +391,9 @@ async def get_all_appointments(
         ],
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
 
@@ -422,39 +435,4 @@ async def get_appointment_stats(
 ) -> Any:
     """Obtenir les statistiques des rendez-vous (Admin)"""
     
-    # Statistiques générales
-    total_appointments = db.query(Appointment).count()
-    pending_appointments = db.query(Appointment).filter(
-        Appointment.status == AppointmentStatus.PENDING
-    ).count()
-    confirmed_appointments = db.query(Appointment).filter(
-        Appointment.status == AppointmentStatus.CONFIRMED
-    ).count()
-    
-    # Rendez-vous du jour
-    today = datetime.utcnow().date()
-    today_appointments = db.query(Appointment).filter(
-        func.date(Appointment.scheduled_date) == today
-    ).count()
-    
-    # Taux de no-show
-    no_shows = db.query(Appointment).filter(
-        Appointment.status == AppointmentStatus.NO_SHOW
-    ).count()
-    
-    completed_appointments = db.query(Appointment).filter(
-        Appointment.status == AppointmentStatus.COMPLETED
-    ).count()
-    
-    no_show_rate = (
-        (no_shows / (no_shows + completed_appointments)) * 100
-        if (no_shows + completed_appointments) > 0 else 0
-    )
-    
-    return {
-        "total_appointments": total_appointments,
-        "pending_appointments": pending_appointments,
-        "confirmed_appointments": confirmed_appointments,
-        "today_appointments": today_appointments,
-        "no_show_rate": round(no_show_rate, 2)
-    }
+    return get_stats_service(db).appointment_stats()
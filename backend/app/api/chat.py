@@ -2,14 +2,18 @@
 Endpoints pour le système de chat temps réel
 """
 
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import COUNT_MODES, count_total, paginate
+from app.core.responses import FastJSONResponse
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.chat import ChatConversation, ChatMessage, MessageType, ChatStatus
+from app.schemas.chat import AdminConversationItem, AdminConversationPage, ConversationList, ConversationSummary
+from app.services.stats_service import get_stats_service
 
 
 router = APIRouter()
@@ -209,7 +213,7 @@ async def send_message(
     }
 
 
-@router.get("/conversations")
+@router.get("/conversations", response_model=ConversationList)
 async def get_user_conversations(
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -223,19 +227,9 @@ async def get_user_conversations(
         .all()
     )
     
-    return {
-        "conversations": [
-            {
-                "id": conv.id,
-                "subject": conv.subject,
-                "status": conv.status,
-                "last_message_at": conv.last_message_at,
-                "message_count": conv.message_count,
-                "created_at": conv.created_at
-            }
-            for conv in conversations
-        ]
-    }
+    return FastJSONResponse(ConversationList(
+        conversations=[ConversationSummary.model_validate(conv) for conv in conversations]
+    ))
 
 
 @router.put("/conversations/{conversation_id}/close")
@@ -277,43 +271,41 @@ async def close_conversation(
 
 # Endpoints d'administration
 
-@router.get("/admin/conversations", dependencies=[Depends(get_current_admin_user)])
+@router.get("/admin/conversations", response_model=AdminConversationPage, dependencies=[Depends(get_current_admin_user)])
 async def get_all_conversations(
     skip: int = 0,
     limit: int = 50,
     status: ChatStatus = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", regex=COUNT_MODES),
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir toutes les conversations (Admin)"""
     
-    query = db.query(ChatConversation).order_by(ChatConversation.last_message_at.desc())
+    query = db.query(ChatConversation)
     
     if status:
         query = query.filter(ChatConversation.status == status)
     
-    total = query.count()
-    conversations = query.offset(skip).limit(limit).all()
+    total = count_total(query, count)
+    conversations, has_more, next_cursor = paginate(
+        query,
+        ChatConversation.last_message_at,
+        ChatConversation.id,
+        limit,
+        skip=skip,
+        cursor=cursor,
+        nullable=True
+    )
     
-    return {
-        "conversations": [
-            {
-                "id": conv.id,
-                "participant_name": conv.participant_name,
-                "participant_email": conv.participant_email,
-                "subject": conv.subject,
-                "status": conv.status,
-                "last_message_at": conv.last_message_at,
-                "message_count": conv.message_count,
-                "rating": conv.rating,
-                "admin_assigned": conv.admin_assigned,
-                "created_at": conv.created_at
-            }
-            for conv in conversations
-        ],
-        "total": total,
-        "skip": skip,
-        "limit": limit
-    }
+    return FastJSONResponse(AdminConversationPage(
+        conversations=[AdminConversationItem.model_validate(conv) for conv in conversations],
+        total=total,
+        skip=skip,
+        limit=limit,
+        has_more=has_more,
+        next_cursor=next_cursor
+    ))
 
 
 @router.post("/admin/conversations/{conversation_id}/reply", dependencies=[Depends(get_current_admin_user)])
@@ -369,26 +361,4 @@ async def get_chat_stats(
 ) -> Any:
     """Obtenir les statistiques du chat (Admin)"""
     
-    total_conversations = db.query(ChatConversation).count()
-    open_conversations = db.query(ChatConversation).filter(
-        ChatConversation.status == ChatStatus.OPEN
-    ).count()
-    
-    # Conversations du jour
-    today = datetime.utcnow().date()
-    from sqlalchemy import func
-    today_conversations = db.query(ChatConversation).filter(
-        func.date(ChatConversation.created_at) == today
-    ).count()
-    
-    # Satisfaction moyenne
-    avg_rating = db.query(func.avg(ChatConversation.rating)).filter(
-        ChatConversation.rating.isnot(None)
-    ).scalar() or 0
-    
-    return {
-        "total_conversations": total_conversations,
-        "open_conversations": open_conversations,
-        "today_conversations": today_conversations,
-        "average_rating": round(float(avg_rating), 2) if avg_rating else 0
-    }
+    return get_stats_service(db).chat_stats()
@@ -3,22 +3,30 @@ Endpoints pour la gestion du slider hero dynamique
 """
 
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.http_cache import CACHE_CATALOG_STATIC, conditional_json
 from app.core.security import get_current_admin_user
 from app.models.hero_slider import HeroSlide, SiteSettings
+from app.services.catalog_cache import HERO, catalog_cache, hero_changed
 
 router = APIRouter()
 
 
 @router.get("/hero-slides")
 async def get_hero_slides(
+    request: Request,
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir tous les slides actifs du hero slider"""
     
+    since = catalog_cache.snapshot()
+    cached = catalog_cache.get(("hero_slides",))
+    if cached is not None:
+        return conditional_json(request, cached, CACHE_CATALOG_STATIC)
+    
     slides = (
         db.query(HeroSlide)
         .filter(HeroSlide.is_active == True)
@@ -26,7 +34,7 @@ async def get_hero_slides(
         .all()
     )
     
-    return {
+    payload = {
         "slides": [
             {
                 "id": slide.id,
@@ -40,6 +48,9 @@ async def get_hero_slides(
             for slide in slides
         ]
     }
+    
+    catalog_cache.set(("hero_slides",), payload, tags=(HERO,), since=since)
+    return conditional_json(request, payload, CACHE_CATALOG_STATIC)
 
 
 @router.get("/hero-slides/{slide_id}")
@@ -93,6 +104,7 @@ async def create_hero_slide(
     db.add(slide)
     db.commit()
     db.refresh(slide)
+    hero_changed()
     
     return {
         "message": "Slide créé avec succès",
@@ -134,6 +146,7 @@ async def update_hero_slide(
         slide.is_active = is_active
     
     db.commit()
+    hero_changed()
     
     return {"message": "Slide mis à jour avec succès"}
 
@@ -151,6 +164,7 @@ async def delete_hero_slide(
     
     db.delete(slide)
     db.commit()
+    hero_changed()
     
     return {"message": "Slide supprimé avec succès"}
 
@@ -2,15 +2,22 @@
 Endpoints pour la gestion des factures clients et fournisseurs
 """
 
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import COUNT_MODES, count_total, paginate
 from app.core.security import get_current_admin_user
 from app.models.invoice import CustomerInvoice, InvoiceStatus
+from app.models.order import Order, PaymentStatus
 from app.models.supplier import SupplierInvoice
+from app.services.catalog_cache import sales_recorded
+from app.services.leaderboard_service import get_leaderboard_service
+from app.services.numbering_service import next_invoice_number
+from app.services.recommendation_service import get_recommendation_service
+from app.services.stats_service import get_stats_service
 
 router = APIRouter()
 
@@ -23,11 +30,13 @@ async def get_customer_invoices(
     limit: int = Query(50, ge=1, le=100),
     status: InvoiceStatus = None,
     search: str = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", regex=COUNT_MODES),
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir toutes les factures clients (Admin)"""
     
-    query = db.query(CustomerInvoice).order_by(CustomerInvoice.invoice_date.desc())
+    query = db.query(CustomerInvoice)
     
     if status:
         query = query.filter(CustomerInvoice.status == status)
@@ -35,8 +44,10 @@ async def get_customer_invoices(
     if search:
         query = query.filter(CustomerInvoice.invoice_number.ilike(f"%{search}%"))
     
-    total = query.count()
-    invoices = query.offset(skip).limit(limit).all()
+    total = count_total(query, count)
+    invoices, has_more, next_cursor = paginate(
+        query, CustomerInvoice.invoice_date, CustomerInvoice.id, limit, skip=skip, cursor=cursor
+    )
     
     return {
         "invoices": [
@@ -60,7 +71,9 @@ async def get_customer_invoices(
         ],
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
 
@@ -114,9 +127,7 @@ async def create_customer_invoice(
 ) -> Any:
     """Créer une facture client (Admin)"""
     
-    import uuid
-    
-    invoice_number = f"INV-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+    invoice_number = next_invoice_number()
     total_amount = subtotal + tax_amount - discount_amount
     
     invoice = CustomerInvoice(
@@ -160,8 +171,20 @@ async def mark_customer_invoice_paid(
     invoice.payment_method = payment_method
     invoice.status = InvoiceStatus.PAID
     
+    # La commande associée est payée: elle entre dans les statistiques de vente
+    newly_paid = (
+        db.query(Order)
+        .filter(Order.id == invoice.order_id, Order.payment_status != PaymentStatus.PAID)
+        .update({Order.payment_status: PaymentStatus.PAID}, synchronize_session=False)
+    )
+    
     db.commit()
     
+    if newly_paid:
+        get_recommendation_service(db).record_paid_order(invoice.order_id)
+        if get_leaderboard_service(db).record_paid_order(invoice.order_id):
+            sales_recorded()
+    
     return {"message": "Facture marquée comme payée"}
 
 
@@ -271,36 +294,4 @@ async def get_invoices_stats(
 ) -> Any:
     """Obtenir les statistiques des factures (Admin)"""
     
-    from sqlalchemy import func
-    
-    # Stats factures clients
-    total_customer_invoices = db.query(CustomerInvoice).count()
-    customer_revenue = db.query(func.sum(CustomerInvoice.total_amount)).filter(
-        CustomerInvoice.is_paid == True
-    ).scalar() or 0
-    pending_customer_invoices = db.query(CustomerInvoice).filter(
-        CustomerInvoice.is_paid == False
-    ).count()
-    
-    # Stats factures fournisseurs
-    total_supplier_invoices = db.query(SupplierInvoice).count()
-    supplier_expenses = db.query(func.sum(SupplierInvoice.total_amount)).filter(
-        SupplierInvoice.is_paid == True
-    ).scalar() or 0
-    pending_supplier_invoices = db.query(SupplierInvoice).filter(
-        SupplierInvoice.is_paid == False
-    ).count()
-    
-    return {
-        "customer_invoices": {
-            "total": total_customer_invoices,
-            "total_revenue": customer_revenue,
-            "pending": pending_customer_invoices
-        },
-        "supplier_invoices": {
-            "total": total_supplier_invoices,
-            "total_expenses": supplier_expenses,
-            "pending": pending_supplier_invoices
-        },
-        "net_profit": customer_revenue - supplier_expenses
-    }
+    return get_stats_service(db).invoice_stats()
@@ -2,57 +2,123 @@
 Endpoints pour la gestion des commandes et du panier
 """
 
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from datetime import datetime
-import uuid
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import COUNT_MODES, count_total, paginate
+from app.core.responses import FastJSONResponse
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
-from app.models.product import Product
 from app.models.user import User
+from app.schemas.order import AdminOrderItem, AdminOrderPage, OrderList, OrderSummary
+from app.services.catalog_cache import products_changed
+from app.services.checkout_jobs import enqueue_post_checkout
+from app.services.customer_service import get_guest_customer_service
+from app.services.idempotency_service import IdempotencyClaim, IdempotencyError, idempotency_store
+from app.services.inventory_service import StockError, cart_quantities, get_inventory_service
+from app.services.job_queue import job_worker
+from app.services.numbering_service import (
+    ORDER_SERIES_STORE,
+    ORDER_SERIES_WHATSAPP,
+    next_invoice_number,
+    next_order_number
+)
+from app.services.stats_service import get_stats_service
 
 router = APIRouter()
 
+# Résumé dénormalisé des listes de commandes; les commandes antérieures à ces
+# colonnes (NULL tant que backfill_order_summaries.py n'a pas été lancé) le
+# recalculent par sous-requête, évaluée seulement pour elles
+_TOTAL_ITEMS = func.coalesce(
+    Order.item_count,
+    select(func.coalesce(func.sum(OrderItem.quantity), 0))
+    .where(OrderItem.order_id == Order.id)
+    .scalar_subquery()
+).label("total_items")
+_USER_EMAIL = func.coalesce(
+    Order.customer_email,
+    select(User.email).where(User.id == Order.user_id).scalar_subquery()
+).label("user_email")
+_USER_NAME = func.coalesce(
+    Order.customer_name,
+    select(User.first_name + " " + User.last_name).where(User.id == Order.user_id).scalar_subquery()
+).label("user_name")
+
+
+async def _run_idempotent(scope: str, idempotency_key: Optional[str], payload: Any, handler) -> Any:
+    """Exécuter une création une seule fois par Idempotency-Key (répétitions: réponse rejouée)"""
+    try:
+        return await idempotency_store.execute(scope, idempotency_key, payload, handler)
+    except IdempotencyError as error:
+        raise HTTPException(status_code=error.status_code, detail=str(error))
+
 
 @router.post("/whatsapp")
 async def create_whatsapp_order(
     cart_items: List[dict],  # [{"id": 1, "name": "...", "price": 149.99, "quantity": 2}, ...]
     customer_info: dict = None,  # {"name": "...", "email": "...", "phone": "..."}
+    hold_token: Optional[str] = Body(None, max_length=36),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Créer une commande WhatsApp (sans authentification)
     + Génération automatique de facture client
+    
+    hold_token: réservation obtenue via POST /holds, convertie en commande
+    (le stock retenu est consommé au lieu d'être revérifié).
+    
+    En-tête Idempotency-Key: une répétition de la requête (même clé, même
+    corps) rejoue la réponse de la première au lieu de recréer la commande.
     """
     
+    return await _run_idempotent(
+        "orders:whatsapp",
+        idempotency_key,
+        {"cart_items": cart_items, "customer_info": customer_info, "hold_token": hold_token},
+        lambda claim: _create_whatsapp_order(db, cart_items, customer_info, hold_token, claim)
+    )
+
+
+def _create_whatsapp_order(
+    db: Session,
+    cart_items: List[dict],
+    customer_info: Optional[dict],
+    hold_token: Optional[str],
+    claim: Optional[IdempotencyClaim] = None
+) -> dict:
     if not cart_items:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Le panier ne peut pas être vide"
         )
     
-    # Créer ou récupérer l'utilisateur guest
-    customer_email = customer_info.get("email", "guest@stelleworld.com") if customer_info else "guest@stelleworld.com"
-    customer_name = customer_info.get("name", "Client WhatsApp") if customer_info else "Client WhatsApp"
-    customer_phone = customer_info.get("phone", "") if customer_info else ""
+    # Numéros de commande et de facture (avant les écritures de la transaction)
+    order_number = next_order_number(ORDER_SERIES_WHATSAPP)
+    invoice_number = next_invoice_number()
     
-    user = db.query(User).filter(User.email == customer_email).first()
-    if not user:
-        from app.core.security import get_password_hash
-        user = User(
-            email=customer_email,
-            first_name=customer_name.split()[0] if customer_name else "Client",
-            last_name=customer_name.split()[-1] if len(customer_name.split()) > 1 else "WhatsApp",
-            phone=customer_phone,
-            hashed_password=get_password_hash("whatsapp_guest"),
-            is_active=True,
-            country="Canada"
+    # Client existant (email, sinon téléphone) ou invité sans mot de passe
+    customer_phone = customer_info.get("phone", "") if customer_info else ""
+    user = get_guest_customer_service(db).get_or_create(customer_info)
+    
+    # Réserver le stock des produits connus du catalogue (2 requêtes)
+    try:
+        get_inventory_service(db).reserve(
+            cart_quantities(cart_items, key="id"),
+            count_sales=False,
+            require_active=False,
+            skip_missing=True,
+            hold_token=hold_token
         )
-        db.add(user)
-        db.flush()
+    except StockError as error:
+        db.rollback()
+        raise HTTPException(status_code=error.status_code, detail=str(error))
     
     # Calculer les totaux
     subtotal = sum(item["price"] * item["quantity"] for item in cart_items)
@@ -60,9 +126,6 @@ async def create_whatsapp_order(
     shipping_amount = 0 if subtotal >= 100 else 9.99
     total_amount = subtotal + tax_amount + shipping_amount
     
-    # Générer numéro de commande
-    order_number = f"WA-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
-    
     # Créer la commande
     order = Order(
         order_number=order_number,
@@ -73,6 +136,9 @@ async def create_whatsapp_order(
         tax_amount=tax_amount,
         shipping_amount=shipping_amount,
         total_amount=total_amount,
+        item_count=sum(item["quantity"] for item in cart_items),
+        customer_name=user.full_name,
+        customer_email=user.email,
         shipping_first_name=user.first_name,
         shipping_last_name=user.last_name,
         shipping_email=user.email,
@@ -107,52 +173,113 @@ async def create_whatsapp_order(
             total_price=item["price"] * item["quantity"]
         )
         db.add(order_item)
-        
-        # Décrémenter le stock si produit existe
-        product = db.query(Product).filter(Product.id == item.get("id")).first()
-        if product and product.track_inventory:
-            product.stock_quantity -= item["quantity"]
-            if product.stock_quantity < 0:
-                product.stock_quantity = 0
-    
-    db.commit()
-    db.refresh(order)
-    
-    # Créer la facture client automatiquement
-    from app.models.invoice import CustomerInvoice, InvoiceStatus
     
-    invoice_number = f"INV-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:6].upper()}"
-    
-    invoice = CustomerInvoice(
+    # Facture, email, alerte admin et stock faible: tâches validées avec la commande
+    product_ids = [item["id"] for item in cart_items if item.get("id")]
+    enqueue_post_checkout(
+        db,
+        order,
+        product_ids,
         invoice_number=invoice_number,
-        order_id=order.id,
-        user_id=user.id,
-        subtotal=subtotal,
-        tax_amount=tax_amount,
-        discount_amount=0,
-        total_amount=total_amount,
-        status=InvoiceStatus.DRAFT,
-        is_paid=False,
         payment_method="whatsapp",
-        invoice_date=datetime.utcnow(),
-        notes=f"Facture pour commande WhatsApp {order_number}"
+        invoice_notes=f"Facture pour commande WhatsApp {order_number}"
     )
     
-    db.add(invoice)
-    db.commit()
-    db.refresh(invoice)
-    
-    return {
+    # La facture est créée en arrière-plan sous le numéro déjà attribué
+    response = {
         "success": True,
         "order_id": order.id,
         "order_number": order.order_number,
-        "invoice_id": invoice.id,
-        "invoice_number": invoice.invoice_number,
+        "invoice_id": None,
+        "invoice_number": invoice_number,
         "total_amount": total_amount,
-        "message": "Commande et facture créées avec succès"
+        "message": "Commande créée avec succès, facture en préparation"
+    }
+    
+    # Réponse d'idempotence validée avec la commande: jamais de commande en double
+    if claim is not None:
+        claim.record(db, response)
+    db.commit()
+    job_worker.wake()
+    
+    # Le stock a changé: invalider les fiches en cache de ces produits
+    products_changed(product_ids, listings=False)
+    
+    return response
+
+
+
+@router.post("/holds")
+async def create_stock_hold(
+    items: List[dict],  # [{"product_id": 1, "quantity": 2}, ...]
+    ttl_seconds: int = Body(settings.STOCK_HOLD_TTL_SECONDS, ge=60, le=settings.STOCK_HOLD_MAX_TTL_SECONDS),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Retenir le stock d'un panier pendant le checkout (sans authentification)
+    
+    Le token retourné est passé à POST /whatsapp pour confirmer la commande;
+    sans confirmation, le stock est libéré à l'expiration.
+    """
+    
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le panier ne peut pas être vide"
+        )
+    
+    try:
+        token, expires_at, held = get_inventory_service(db).create_hold(cart_quantities(items), ttl_seconds)
+    except StockError as error:
+        db.rollback()
+        raise HTTPException(status_code=error.status_code, detail=str(error))
+    db.commit()
+    
+    # Le stock disponible a changé
+    products_changed(held, listings=False)
+    
+    return {
+        "hold_token": token,
+        "expires_at": expires_at,
+        "items": [{"product_id": product_id, "quantity": quantity} for product_id, quantity in held.items()]
+    }
+
+
+@router.get("/holds/{token}")
+async def get_stock_hold(
+    token: str,
+    db: Session = Depends(get_db)
+) -> Any:
+    """Consulter une réservation de stock"""
+    
+    lines = get_inventory_service(db).get_hold(token)
+    if not lines:
+        raise HTTPException(status_code=404, detail="Réservation non trouvée ou expirée")
+    
+    expires_at = min(expires for _, expires in lines.values())
+    return {
+        "hold_token": token,
+        "expires_at": expires_at,
+        "expired": expires_at <= datetime.utcnow(),
+        "items": [{"product_id": product_id, "quantity": quantity} for product_id, (quantity, _) in lines.items()]
     }
 
 
+@router.delete("/holds/{token}")
+async def release_stock_hold(
+    token: str,
+    db: Session = Depends(get_db)
+) -> Any:
+    """Libérer une réservation de stock (panier abandonné)"""
+    
+    released = get_inventory_service(db).release_hold(token)
+    if not released:
+        raise HTTPException(status_code=404, detail="Réservation non trouvée ou expirée")
+    db.commit()
+    
+    products_changed(released, listings=False)
+    return {"message": "Réservation libérée"}
+
 
 @router.post("/")
 async def create_order(
@@ -160,42 +287,56 @@ async def create_order(
     shipping_address: dict,
     billing_address: dict = None,
     notes: str = None,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Any:
-    """Créer une nouvelle commande"""
+    """
+    Créer une nouvelle commande
+    
+    En-tête Idempotency-Key (propre à chaque utilisateur): une répétition
+    de la requête rejoue la réponse de la première.
+    """
     
+    return await _run_idempotent(
+        f"orders:user:{current_user.id}",
+        idempotency_key,
+        {"items": items, "shipping_address": shipping_address, "billing_address": billing_address, "notes": notes},
+        lambda claim: _create_order(db, current_user, items, shipping_address, billing_address, notes, claim)
+    )
+
+
+def _create_order(
+    db: Session,
+    current_user: User,
+    items: List[dict],
+    shipping_address: dict,
+    billing_address: Optional[dict],
+    notes: Optional[str],
+    claim: Optional[IdempotencyClaim] = None
+) -> dict:
     if not items:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Le panier ne peut pas être vide"
         )
     
-    # Vérifier la disponibilité des produits
+    # Numéro de commande (avant les écritures de la transaction)
+    order_number = next_order_number(ORDER_SERIES_STORE)
+    
+    # Verrouiller les produits du panier et réserver leur stock (2 requêtes)
+    try:
+        products = get_inventory_service(db).reserve(cart_quantities(items))
+    except StockError as error:
+        db.rollback()
+        raise HTTPException(status_code=error.status_code, detail=str(error))
+    
     order_items = []
     subtotal = 0
     
     for item in items:
-        product = db.query(Product).filter(
-            Product.id == item["product_id"],
-            Product.is_active == True
-        ).first()
-        
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Produit {item['product_id']} non trouvé"
-            )
-        
+        product = products[item["product_id"]]
         quantity = item["quantity"]
-        
-        if product.track_inventory and product.stock_quantity < quantity:
-            if not product.allow_backorder:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Stock insuffisant pour {product.name}"
-                )
-        
         unit_price = product.price
         total_price = unit_price * quantity
         subtotal += total_price
@@ -212,9 +353,6 @@ async def create_order(
     shipping_amount = 0 if subtotal >= 50 else 5.99  # Gratuit à partir de 50€
     total_amount = subtotal + tax_amount + shipping_amount
     
-    # Générer un numéro de commande unique
-    order_number = f"ST-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
-    
     # Utiliser l'adresse de facturation ou celle de livraison
     if not billing_address:
         billing_address = shipping_address
@@ -227,6 +365,9 @@ async def create_order(
         tax_amount=tax_amount,
         shipping_amount=shipping_amount,
         total_amount=total_amount,
+        item_count=sum(item["quantity"] for item in order_items),
+        customer_name=current_user.full_name,
+        customer_email=current_user.email,
         shipping_first_name=shipping_address["first_name"],
         shipping_last_name=shipping_address["last_name"],
         shipping_email=shipping_address["email"],
@@ -264,57 +405,60 @@ async def create_order(
             total_price=item_data["total_price"]
         )
         db.add(order_item)
-        
-        # Décrémenter le stock si nécessaire
-        if item_data["product"].track_inventory:
-            item_data["product"].stock_quantity -= item_data["quantity"]
-        
-        # Incrémenter le compteur de ventes
-        item_data["product"].sales_count += item_data["quantity"]
     
-    db.commit()
-    db.refresh(order)
+    # Email, alerte admin et stock faible: tâches validées avec la commande
+    product_ids = [item_data["product"].id for item_data in order_items]
+    enqueue_post_checkout(db, order, product_ids)
     
-    return {
+    response = {
         "order_id": order.id,
         "order_number": order.order_number,
         "total_amount": order.total_amount,
         "status": order.status,
         "message": "Commande créée avec succès"
     }
+    
+    # Réponse d'idempotence validée avec la commande: jamais de commande en double
+    if claim is not None:
+        claim.record(db, response)
+    db.commit()
+    job_worker.wake()
+    
+    # Le stock a changé: invalider les fiches en cache de ces produits
+    products_changed(product_ids, listings=False)
+    
+    return response
 
 
-@router.get("/")
+@router.get("/", response_model=OrderList)
 async def get_user_orders(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir les commandes de l'utilisateur connecté"""
     
+    # Seulement les colonnes affichées: ni articles ni utilisateur chargés
     orders = (
-        db.query(Order)
+        db.query(
+            Order.id,
+            Order.order_number,
+            Order.status,
+            Order.payment_status,
+            Order.total_amount,
+            _TOTAL_ITEMS,
+            Order.created_at,
+            Order.confirmed_at,
+            Order.shipped_at,
+            Order.tracking_number
+        )
         .filter(Order.user_id == current_user.id)
         .order_by(Order.created_at.desc())
         .all()
     )
     
-    return {
-        "orders": [
-            {
-                "id": order.id,
-                "order_number": order.order_number,
-                "status": order.status,
-                "payment_status": order.payment_status,
-                "total_amount": order.total_amount,
-                "total_items": order.total_items,
-                "created_at": order.created_at,
-                "confirmed_at": order.confirmed_at,
-                "shipped_at": order.shipped_at,
-                "tracking_number": order.tracking_number
-            }
-            for order in orders
-        ]
-    }
+    return FastJSONResponse(OrderList(
+        orders=[OrderSummary.model_validate(order) for order in orders]
+    ))
 
 
 @router.get("/{order_id}")
@@ -483,43 +627,49 @@ async def download_invoice_pdf(
 
 # Endpoints d'administration
 
-@router.get("/admin/all", dependencies=[Depends(get_current_admin_user)])
+@router.get("/admin/all", response_model=AdminOrderPage, dependencies=[Depends(get_current_admin_user)])
 async def get_all_orders(
     skip: int = 0,
     limit: int = 50,
     status: OrderStatus = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", regex=COUNT_MODES),
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir toutes les commandes (Admin)"""
     
-    query = db.query(Order).order_by(Order.created_at.desc())
+    # Seulement les colonnes affichées (une requête pour toute la page)
+    query = db.query(
+        Order.id,
+        Order.order_number,
+        _USER_EMAIL,
+        _USER_NAME,
+        Order.status,
+        Order.payment_status,
+        Order.total_amount,
+        _TOTAL_ITEMS,
+        Order.created_at,
+        Order.shipping_city
+    )
+    count_query = db.query(Order.id)
     
     if status:
         query = query.filter(Order.status == status)
+        count_query = count_query.filter(Order.status == status)
     
-    total = query.count()
-    orders = query.offset(skip).limit(limit).all()
+    total = count_total(count_query, count)
+    orders, has_more, next_cursor = paginate(
+        query, Order.created_at, Order.id, limit, skip=skip, cursor=cursor
+    )
     
-    return {
-        "orders": [
-            {
-                "id": order.id,
-                "order_number": order.order_number,
-                "user_email": order.user.email,
-                "user_name": order.user.full_name,
-                "status": order.status,
-                "payment_status": order.payment_status,
-                "total_amount": order.total_amount,
-                "total_items": order.total_items,
-                "created_at": order.created_at,
-                "shipping_city": order.shipping_city
-            }
-            for order in orders
-        ],
-        "total": total,
-        "skip": skip,
-        "limit": limit
-    }
+    return FastJSONResponse(AdminOrderPage(
+        orders=[AdminOrderItem.model_validate(order) for order in orders],
+        total=total,
+        skip=skip,
+        limit=limit,
+        has_more=has_more,
+        next_cursor=next_cursor
+    ))
 
 
 @router.put("/{order_id}/status", dependencies=[Depends(get_current_admin_user)])
@@ -566,33 +716,4 @@ async def get_order_stats(
 ) -> Any:
     """Obtenir les statistiques des commandes (Admin)"""
     
-    from sqlalchemy import func
-    
-    # Statistiques générales
-    total_orders = db.query(Order).count()
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.payment_status == PaymentStatus.PAID
-    ).scalar() or 0
-    
-    pending_orders = db.query(Order).filter(Order.status == OrderStatus.PENDING).count()
-    confirmed_orders = db.query(Order).filter(Order.status == OrderStatus.CONFIRMED).count()
-    
-    # Commandes du jour
-    today = datetime.utcnow().date()
-    today_orders = db.query(Order).filter(
-        func.date(Order.created_at) == today
-    ).count()
-    
-    today_revenue = db.query(func.sum(Order.total_amount)).filter(
-        func.date(Order.created_at) == today,
-        Order.payment_status == PaymentStatus.PAID
-    ).scalar() or 0
-    
-    return {
-        "total_orders": total_orders,
-        "total_revenue": total_revenue,
-        "pending_orders": pending_orders,
-        "confirmed_orders": confirmed_orders,
-        "today_orders": today_orders,
-        "today_revenue": today_revenue
-    }
+    return get_stats_service(db).order_stats()
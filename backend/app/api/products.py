@@ -3,28 +3,81 @@ Endpoints pour la gestion des produits et du catalogue
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, func
 
 from app.core.database import get_db
+from app.core.http_cache import (
+    CACHE_CATALOG_DETAIL,
+    CACHE_CATALOG_LIST,
+    CACHE_CATALOG_STATIC,
+    conditional_json
+)
+from app.core.pagination import COUNT_MODES, count_total, paginate
 from app.core.security import get_current_admin_user
 from app.models.product import Product, Category
 from app.models.user import User
+from app.schemas.catalog import (
+    BestSeller,
+    BestSellerList,
+    CategoryList,
+    CategoryListItem,
+    FeaturedProduct,
+    FeaturedProductList,
+    ProductCard,
+    ProductPage
+)
+from app.services.catalog_cache import (
+    CATALOG,
+    CATEGORIES,
+    LEADERBOARDS,
+    catalog_cache,
+    product_deleted,
+    product_saved,
+    product_tag,
+    product_tags,
+    products_changed
+)
+from app.services.facet_service import get_facet_service
+from app.services.leaderboard_service import PERIODS, get_leaderboard_service
+from app.services.product_projection import (
+    PRODUCT_VIEW_PATTERN,
+    PRODUCT_VIEWS,
+    project,
+    projection_options,
+    resolve_fields
+)
+from app.services.product_service import (
+    PRODUCT_DETAIL_OPTIONS,
+    active_product_counts
+)
+from app.services.recommendation_service import get_recommendation_service
+from app.services.search_service import SEARCH_MODE_PATTERN, get_search_service
+from app.services.view_counter import view_counter
 
 router = APIRouter()
 
 
-@router.get("/categories")
+@router.get("/categories", response_model=CategoryList)
 async def get_categories(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db)
 ) -> Any:
-    """Obtenir la liste des catégories"""
-    
-    categories = (
-        db.query(Category)
+    """Obtenir la liste des catégories (avec le nombre de produits actifs)"""
+    
+    cache_key = ("categories", skip, limit)
+    since = catalog_cache.snapshot()
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return conditional_json(request, cached, CACHE_CATALOG_STATIC)
+    
+    counts = active_product_counts()
+    rows = (
+        db.query(Category, func.coalesce(counts.c.product_count, 0))
+        .outerjoin(counts, counts.c.category_id == Category.id)
         .filter(Category.is_active == True)
         .order_by(Category.sort_order, Category.name)
         .offset(skip)
@@ -32,28 +85,38 @@ async def get_categories(
         .all()
     )
     
-    return {
-        "categories": [
-            {
-                "id": cat.id,
-                "name": cat.name,
-                "description": cat.description,
-                "slug": cat.slug,
-                "image_url": cat.image_url,
-                "product_count": len(cat.products)
-            }
-            for cat in categories
+    payload = CategoryList(
+        categories=[
+            CategoryListItem(
+                id=cat.id,
+                name=cat.name,
+                description=cat.description,
+                slug=cat.slug,
+                image_url=cat.image_url,
+                product_count=product_count
+            )
+            for cat, product_count in rows
         ]
-    }
+    )
+    
+    catalog_cache.set(cache_key, payload, tags=(CATEGORIES,), since=since)
+    return conditional_json(request, payload, CACHE_CATALOG_STATIC)
 
 
 @router.get("/categories/{slug}")
 async def get_category_by_slug(
+    request: Request,
     slug: str,
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir une catégorie par son slug"""
     
+    cache_key = ("category", slug)
+    since = catalog_cache.snapshot()
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return conditional_json(request, cached, CACHE_CATALOG_STATIC)
+    
     category = (
         db.query(Category)
         .filter(Category.slug == slug, Category.is_active == True)
@@ -63,7 +126,13 @@ async def get_category_by_slug(
     if not category:
         raise HTTPException(status_code=404, detail="Catégorie non trouvée")
     
-    return {
+    product_count = (
+        db.query(func.count(Product.id))
+        .filter(Product.category_id == category.id, Product.is_active == True)
+        .scalar()
+    )
+    
+    payload = {
         "id": category.id,
         "name": category.name,
         "description": category.description,
@@ -71,29 +140,64 @@ async def get_category_by_slug(
         "image_url": category.image_url,
         "icon": category.icon,
         "color": category.color,
-        "product_count": len([p for p in category.products if p.is_active])
+        "product_count": product_count
     }
+    
+    catalog_cache.set(cache_key, payload, tags=(CATEGORIES,), since=since)
+    return conditional_json(request, payload, CACHE_CATALOG_STATIC)
 
 
-@router.get("/")
+@router.get("/", response_model=ProductPage)
 async def get_products(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     category_id: Optional[int] = None,
     search: Optional[str] = None,
+    search_mode: str = Query("fulltext", regex=SEARCH_MODE_PATTERN),
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     featured_only: bool = False,
     in_stock_only: bool = False,
     on_promo: bool = False,
     include_inactive: bool = False,
-    sort_by: str = Query("created_at", regex="^(created_at|name|price|sales_count)$"),
+    sort_by: Optional[str] = Query(None, regex="^(relevance|created_at|name|price|sales_count)$"),
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", regex=COUNT_MODES),
+    view: str = Query("detail", regex=PRODUCT_VIEW_PATTERN),
+    fields: Optional[str] = Query(None, max_length=500),
     db: Session = Depends(get_db)
 ) -> Any:
-    """Obtenir la liste des produits avec filtres"""
+    """
+    Obtenir la liste des produits avec filtres
+    
+    - search: recherche plein texte (sans accents), triée par pertinence par défaut
+    - search_mode: fulltext (tous les termes) ou fuzzy (tolérant aux fautes de frappe);
+      did_you_mean propose une correction en mode fuzzy ou si aucun produit ne correspond
+    - cursor: curseur opaque renvoyé par la page précédente (next_cursor)
+    - count: exact, estimate (statistiques du planificateur) ou none
+    - view: card (id, nom, slug, prix, image, disponibilité) ou detail (par défaut)
+    - fields: liste de champs séparés par des virgules (prioritaire sur view)
+    """
+    
+    try:
+        selected_fields = resolve_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    cache_key = (
+        "products", skip, limit, category_id, search, search_mode, min_price, max_price,
+        featured_only, in_stock_only, on_promo, include_inactive,
+        sort_by, sort_order, cursor, count, selected_fields
+    )
+    since = catalog_cache.snapshot()
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return conditional_json(request, cached, CACHE_CATALOG_LIST)
     
     query = db.query(Product)
+    rank = None
     
     # Par défaut, n'afficher que les produits actifs (sauf si include_inactive=True pour l'admin)
     if not include_inactive:
@@ -104,12 +208,7 @@ async def get_products(
         query = query.filter(Product.category_id == category_id)
     
     if search:
-        search_filter = or_(
-            Product.name.ilike(f"%{search}%"),
-            Product.description.ilike(f"%{search}%"),
-            Product.short_description.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        query, rank = get_search_service(db).apply(query, search, search_mode)
     
     if min_price is not None:
         query = query.filter(Product.price >= min_price)
@@ -124,141 +223,221 @@ async def get_products(
         query = query.filter(
             or_(
                 Product.track_inventory == False,
-                Product.stock_quantity > 0
+                Product.available_quantity > 0
             )
         )
     
     if on_promo:
         query = query.filter(Product.compare_at_price != None)
     
-    # Tri
-    if sort_order == "desc":
-        query = query.order_by(getattr(Product, sort_by).desc())
-    else:
-        query = query.order_by(getattr(Product, sort_by))
+    # Tri (pertinence par défaut lors d'une recherche)
+    if sort_by is None:
+        sort_by = "relevance" if search else "created_at"
+    
+    if sort_by == "relevance" and rank is None:
+        sort_by = "created_at"
+    
+    # Projection: seules les colonnes des champs demandés (et la clé de tri) sont lues
+    sort_columns = () if sort_by == "relevance" else (getattr(Product, sort_by),)
+    query = query.options(*projection_options(selected_fields, sort_columns))
     
     # Pagination
-    total = query.count()
-    products = query.offset(skip).limit(limit).all()
+    total = count_total(query, count)
     
-    return {
-        "products": [
-            {
-                "id": product.id,
-                "name": product.name,
-                "description": product.description,
-                "short_description": product.short_description,
-                "slug": product.slug,
-                "price": product.price,
-                "compare_at_price": product.compare_at_price,
-                "discount_percentage": product.discount_percentage,
-                "main_image_url": product.main_image_url,
-                "gallery_images": product.gallery_images,
-                "is_in_stock": product.is_in_stock,
-                "is_active": product.is_active,
-                "stock_quantity": product.stock_quantity if product.track_inventory else None,
-                "is_featured": product.is_featured,
-                "category": {
-                    "id": product.category.id,
-                    "name": product.category.name,
-                    "slug": product.category.slug
-                } if product.category else None,
-                "sales_count": product.sales_count,
-                "view_count": product.view_count
-            }
-            for product in products
-        ],
+    if sort_by == "relevance":
+        if cursor:
+            raise HTTPException(
+                status_code=400,
+                detail="La pagination par curseur n'est pas disponible pour le tri par pertinence"
+            )
+        products = (
+            query.order_by(rank.desc(), Product.id.desc())
+            .offset(skip)
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(products) > limit
+        products = products[:limit]
+        next_cursor = None
+    else:
+        products, has_more, next_cursor = paginate(
+            query,
+            getattr(Product, sort_by),
+            Product.id,
+            limit,
+            skip=skip,
+            cursor=cursor,
+            descending=sort_order == "desc"
+        )
+    
+    did_you_mean = None
+    if search and (search_mode == "fuzzy" or (not products and skip == 0)):
+        did_you_mean = get_search_service(db).did_you_mean(search)
+    
+    page = {
         "total": total,
         "skip": skip,
         "limit": limit,
-        "has_more": skip + limit < total
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+        "did_you_mean": did_you_mean
     }
+    if selected_fields == PRODUCT_VIEWS["detail"]:
+        payload = ProductPage(
+            products=[ProductCard.model_validate(product) for product in products],
+            **page
+        )
+    else:
+        # Liste partielle: même enveloppe, produits réduits aux champs demandés
+        payload = {
+            **page,
+            "products": [project(product, selected_fields) for product in products]
+        }
+    
+    catalog_cache.set(cache_key, payload, tags=[CATALOG, *product_tags(p.id for p in products)], since=since)
+    return conditional_json(request, payload, CACHE_CATALOG_LIST)
 
 
-@router.get("/featured")
+@router.get("/featured", response_model=FeaturedProductList)
 async def get_featured_products(
+    request: Request,
     limit: int = Query(8, ge=1, le=20),
     db: Session = Depends(get_db)
 ) -> Any:
     """Obtenir les produits mis en avant"""
     
-    products = (
-        db.query(Product)
-        .filter(and_(Product.is_active == True, Product.is_featured == True))
-        .order_by(Product.sales_count.desc(), Product.created_at.desc())
-        .limit(limit)
-        .all()
+    cache_key = ("featured", limit)
+    since = catalog_cache.snapshot()
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return conditional_json(request, cached, CACHE_CATALOG_LIST)
+    
+    # Classement précalculé, puis lecture des produits par clé primaire
+    leaderboard = get_leaderboard_service(db)
+    products = leaderboard.load_products(leaderboard.featured(limit))
+    
+    payload = FeaturedProductList(
+        featured_products=[FeaturedProduct.model_validate(product) for product in products]
     )
     
-    return {
-        "featured_products": [
-            {
-                "id": product.id,
-                "name": product.name,
-                "short_description": product.short_description,
-                "slug": product.slug,
-                "price": product.price,
-                "compare_at_price": product.compare_at_price,
-                "discount_percentage": product.discount_percentage,
-                "main_image_url": product.main_image_url,
-                "is_in_stock": product.is_in_stock,
-                "sales_count": product.sales_count
-            }
-            for product in products
-        ]
-    }
+    catalog_cache.set(cache_key, payload, tags=[CATALOG, LEADERBOARDS, *product_tags(p.id for p in products)], since=since)
+    return conditional_json(request, payload, CACHE_CATALOG_LIST)
 
 
-@router.get("/best-sellers")
+@router.get("/best-sellers", response_model=BestSellerList)
 async def get_best_sellers(
+    request: Request,
     limit: int = Query(10, ge=1, le=20),
+    period_days: Optional[int] = None,
+    category_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ) -> Any:
-    """Obtenir les meilleures ventes"""
+    """
+    Obtenir les meilleures ventes
     
-    products = (
-        db.query(Product)
-        .filter(Product.is_active == True)
-        .order_by(Product.sales_count.desc())
-        .limit(limit)
-        .all()
+    Sans period_days: classement de tous les temps (sales_count).
+    period_days (7, 30 ou 90): quantités vendues sur les commandes payées
+    de la période. category_id restreint le classement à une catégorie.
+    """
+    
+    if period_days is not None and period_days not in PERIODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"period_days doit valoir {', '.join(str(period) for period in PERIODS)}"
+        )
+    
+    cache_key = ("best_sellers", limit, period_days, category_id)
+    since = catalog_cache.snapshot()
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return conditional_json(request, cached, CACHE_CATALOG_LIST)
+    
+    # Classement précalculé, puis lecture des produits par clé primaire
+    leaderboard = get_leaderboard_service(db)
+    products = leaderboard.load_products(leaderboard.best_sellers(limit, period_days, category_id))
+    
+    payload = BestSellerList(
+        best_sellers=[BestSeller.model_validate(product) for product in products]
     )
     
-    return {
-        "best_sellers": [
-            {
-                "id": product.id,
-                "name": product.name,
-                "slug": product.slug,
-                "price": product.price,
-                "main_image_url": product.main_image_url,
-                "sales_count": product.sales_count,
-                "is_in_stock": product.is_in_stock
-            }
-            for product in products
-        ]
-    }
+    catalog_cache.set(cache_key, payload, tags=[CATALOG, LEADERBOARDS, *product_tags(p.id for p in products)], since=since)
+    return conditional_json(request, payload, CACHE_CATALOG_LIST)
 
 
-@router.get("/{product_id}")
-async def get_product(
-    product_id: int,
+@router.get("/facets")
+async def get_product_facets(
+    request: Request,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    search_mode: str = Query("fulltext", regex=SEARCH_MODE_PATTERN),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    featured_only: bool = False,
+    in_stock_only: bool = False,
+    on_promo: bool = False,
+    buckets: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ) -> Any:
-    """Obtenir les détails d'un produit"""
+    """
+    Obtenir les facettes de la liste de produits (mêmes filtres que GET /)
     
-    product = (
-        db.query(Product)
-        .filter(and_(Product.id == product_id, Product.is_active == True))
-        .first()
+    Compteurs par catégorie, disponibilité, promotions et histogramme de prix,
+    calculés en une seule requête groupée.
+    """
+    
+    cache_key = (
+        "facets", category_id, search, search_mode, min_price, max_price,
+        featured_only, in_stock_only, on_promo, buckets
     )
+    since = catalog_cache.snapshot()
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return conditional_json(request, cached, CACHE_CATALOG_LIST)
     
-    if not product:
-        raise HTTPException(status_code=404, detail="Produit non trouvé")
+    payload = get_facet_service(db).compute(
+        category_id=category_id,
+        search=search,
+        search_mode=search_mode,
+        min_price=min_price,
+        max_price=max_price,
+        featured_only=featured_only,
+        in_stock_only=in_stock_only,
+        on_promo=on_promo,
+        buckets=buckets
+    )
     
-    # Incrémenter le compteur de vues
-    product.view_count += 1
-    db.commit()
+    catalog_cache.set(cache_key, payload, tags=(CATALOG, CATEGORIES), since=since)
+    return conditional_json(request, payload, CACHE_CATALOG_LIST)
+
+
+def _related_products(db: Session, product: Product, limit: int = 5) -> List[Product]:
+    """
+    Produits recommandés: sélection manuelle d'abord, complétée par les
+    voisins précalculés du moteur de co-occurrence (commandes payées)
+    """
+    
+    related = [item for item in product.related_products if item.is_active][:limit]
+    if len(related) >= limit:
+        return related
+    
+    seen = {product.id, *(item.id for item in related)}
+    neighbour_ids = [
+        neighbour_id
+        for neighbour_id, _, _ in get_recommendation_service(db).neighbours(product.id, limit=limit * 2)
+        if neighbour_id not in seen
+    ]
+    if neighbour_ids:
+        by_id = {
+            item.id: item
+            for item in db.query(Product).filter(Product.id.in_(neighbour_ids), Product.is_active == True)
+        }
+        related += [by_id[neighbour_id] for neighbour_id in neighbour_ids if neighbour_id in by_id]
+    
+    return related[:limit]
+
+
+def _product_detail(db: Session, product: Product) -> dict:
+    """Représentation détaillée d'un produit (mise en cache, sans les vues en attente)"""
     
     # Produits recommandés (souvent achetés ensemble)
     related_products = [
@@ -270,8 +449,7 @@ async def get_product(
             "main_image_url": related.main_image_url,
             "is_in_stock": related.is_in_stock
         }
-        for related in product.related_products[:5]
-        if related.is_active
+        for related in _related_products(db, product)
     ]
     
     return {
@@ -283,7 +461,7 @@ async def get_product(
         "price": product.price,
         "compare_at_price": product.compare_at_price,
         "discount_percentage": product.discount_percentage,
-        "stock_quantity": product.stock_quantity if product.track_inventory else None,
+        "stock_quantity": product.available_quantity if product.track_inventory else None,
         "track_inventory": product.track_inventory,
         "allow_backorder": product.allow_backorder,
         "is_in_stock": product.is_in_stock,
@@ -298,7 +476,7 @@ async def get_product(
             "slug": product.category.slug
         } if product.category else None,
         "sales_count": product.sales_count,
-        "view_count": product.view_count,
+        "view_count": product.view_count or 0,
         "related_products": related_products,
         "meta_title": product.meta_title,
         "meta_description": product.meta_description,
@@ -306,23 +484,99 @@ async def get_product(
     }
 
 
+def _cache_product_detail(db: Session, cache_key, product: Product, since: int) -> dict:
+    """Mettre en cache la fiche d'un produit, invalidée avec lui ou ses produits liés (since: snapshot pris avant sa lecture)"""
+    
+    payload = _product_detail(db, product)
+    # Vues déjà écrites par ce processus à la lecture de view_count (voir _count_view)
+    payload["views_flushed"] = view_counter.flushed("product", product.id)
+    tags = [
+        CATEGORIES,
+        product_tag(product.id),
+        *product_tags(related["id"] for related in payload["related_products"])
+    ]
+    catalog_cache.set(cache_key, payload, tags=tags, since=since)
+    return payload
+
+
+def _count_view(payload: dict) -> dict:
+    """Compter la vue (écriture différée) et renvoyer une copie à jour de la fiche"""
+    
+    view_counter.increment("product", payload["id"])
+    detail = {key: value for key, value in payload.items() if key != "views_flushed"}
+    # Vues écrites depuis la mise en cache + vues en attente: ne recule pas après un vidage
+    detail["view_count"] = payload["view_count"] + view_counter.since(
+        "product", payload["id"], payload["views_flushed"]
+    )
+    return detail
+
+
+@router.get("/{product_id}")
+async def get_product(
+    request: Request,
+    product_id: int,
+    db: Session = Depends(get_db)
+) -> Any:
+    """Obtenir les détails d'un produit"""
+    
+    cache_key = ("product", product_id)
+    since = catalog_cache.snapshot()
+    payload = catalog_cache.get(cache_key)
+    
+    if payload is None:
+        product = (
+            db.query(Product)
+            .options(*PRODUCT_DETAIL_OPTIONS)
+            .filter(and_(Product.id == product_id, Product.is_active == True))
+            .first()
+        )
+        
+        if not product:
+            raise HTTPException(status_code=404, detail="Produit non trouvé")
+        
+        payload = _cache_product_detail(db, cache_key, product, since)
+    
+    # ETag faible de la fiche en cache: le compteur de vues n'en fait pas partie
+    return conditional_json(request, _count_view(payload), CACHE_CATALOG_DETAIL, etag_source=payload)
+
+
 @router.get("/slug/{slug}")
 async def get_product_by_slug(
+    request: Request,
     slug: str,
     db: Session = Depends(get_db)
 ) -> Any:
-    """Obtenir un produit par son slug"""
+    """
+    Obtenir un produit par son slug
     
-    product = (
-        db.query(Product)
-        .filter(and_(Product.slug == slug, Product.is_active == True))
-        .first()
-    )
+    Le slug est résolu en id via le cache (invalidé quand le produit change,
+    y compris quand update_product recalcule le slug), puis la fiche est
+    partagée avec GET /{product_id}. En cas d'absence: une seule requête
+    charge produit, catégorie et produits associés.
+    """
     
-    if not product:
-        raise HTTPException(status_code=404, detail="Produit non trouvé")
+    payload = None
+    since = catalog_cache.snapshot()
+    product_id = catalog_cache.get(("slug", slug))
+    if product_id is not None:
+        payload = catalog_cache.get(("product", product_id))
+    
+    if payload is None:
+        product = (
+            db.query(Product)
+            .options(*PRODUCT_DETAIL_OPTIONS)
+            .filter(and_(Product.slug == slug, Product.is_active == True))
+            .first()
+        )
+        
+        if not product:
+            raise HTTPException(status_code=404, detail="Produit non trouvé")
+        
+        catalog_cache.set(("slug", slug), product.id, tags=(product_tag(product.id),), since=since)
+        payload = _cache_product_detail(db, ("product", product.id), product, since)
     
-    return await get_product(product.id, db)
+    # ETag faible de la fiche en cache: le compteur de vues n'en fait pas partie
+    return conditional_json(request, _count_view(payload), CACHE_CATALOG_DETAIL, etag_source=payload)
 
 
 # Endpoints d'administration
@@ -365,6 +619,8 @@ async def create_product(
     db.commit()
     db.refresh(product)
     
+    product_saved(db, product)
+    
     return {"message": "Produit créé avec succès", "product_id": product.id}
 
 
@@ -414,6 +670,12 @@ async def update_product(
     
     db.commit()
     
+    product_saved(
+        db,
+        product,
+        reindex=name is not None or description is not None or short_description is not None
+    )
+    
     return {"message": "Produit mis à jour avec succès"}
 
 
@@ -451,6 +713,7 @@ async def delete_product(
         try:
             db.delete(product)
             db.commit()
+            product_deleted(db, product_id)
             return {"message": "Produit supprimé définitivement", "deleted": True}
         except Exception as e:
             db.rollback()
@@ -462,4 +725,5 @@ async def delete_product(
         # Soft delete - désactiver le produit
         product.is_active = False
         db.commit()
+        products_changed([product_id])
         return {"message": "Produit désactivé avec succès", "deleted": False, "deactivated": True}
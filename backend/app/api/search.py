@@ -0,0 +1,31 @@
+"""
+Endpoints de recherche transverses (produits et services)
+"""
+
+from typing import Any
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.services.suggest_service import get_suggest_service
+
+router = APIRouter()
+
+
+@router.get("/suggest")
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Suggestions d'autocomplétion pour la barre de recherche
+    
+    Correspondance par préfixe sur chaque mot du nom (sans accents),
+    classement par popularité. Servi depuis un index en mémoire.
+    """
+    
+    return {
+        "query": q,
+        "suggestions": get_suggest_service(db).suggest(q, limit)
+    }
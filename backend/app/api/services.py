@@ -5,17 +5,31 @@ Respecte le principe Open/Closed de SOLID
 
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
 from slugify import slugify
 from datetime import datetime
 
 from app.core.database import get_db
 from app.core.security import get_current_admin_user
 from app.models.service import Service, ServiceCategory, ServiceAvailability, ServiceAddon
+from app.services.catalog_cache import service_changed
+from app.services.view_counter import view_counter
 
 router = APIRouter()
 
 
+def _service_counts(active_only: bool = True):
+    """Sous-requête agrégée: nombre de services par catégorie"""
+    stmt = select(
+        Service.category_id.label("category_id"),
+        func.count(Service.id).label("service_count")
+    )
+    if active_only:
+        stmt = stmt.where(Service.is_active == True)
+    return stmt.group_by(Service.category_id).subquery()
+
+
 # =====================
 # PUBLIC ENDPOINTS
 # =====================
@@ -26,8 +40,10 @@ async def get_service_categories(
 ) -> Any:
     """Obtenir les catégories de services actives"""
     
-    categories = (
-        db.query(ServiceCategory)
+    counts = _service_counts()
+    rows = (
+        db.query(ServiceCategory, func.coalesce(counts.c.service_count, 0))
+        .outerjoin(counts, counts.c.category_id == ServiceCategory.id)
         .filter(ServiceCategory.is_active == True)
         .order_by(ServiceCategory.sort_order, ServiceCategory.name)
         .all()
@@ -42,9 +58,9 @@ async def get_service_categories(
                 "description": cat.description,
                 "icon": cat.icon,
                 "color": cat.color,
-                "service_count": len([s for s in cat.services if s.is_active])
+                "service_count": service_count
             }
-            for cat in categories
+            for cat, service_count in rows
         ]
     }
 
@@ -59,7 +75,7 @@ async def get_services(
 ) -> Any:
     """Obtenir la liste des services actifs"""
     
-    query = db.query(Service).filter(Service.is_active == True)
+    query = db.query(Service).options(joinedload(Service.category)).filter(Service.is_active == True)
     
     if category_id:
         query = query.filter(Service.category_id == category_id)
@@ -107,7 +123,7 @@ async def get_service(
 ) -> Any:
     """Obtenir les détails d'un service"""
     
-    service = db.query(Service).filter(
+    service = db.query(Service).options(joinedload(Service.category)).filter(
         Service.id == service_id,
         Service.is_active == True
     ).first()
@@ -115,9 +131,8 @@ async def get_service(
     if not service:
         raise HTTPException(status_code=404, detail="Service non trouvé")
     
-    # Incrémenter le compteur de vues
-    service.view_count += 1
-    db.commit()
+    # Compter la vue (écriture différée, la requête reste en lecture seule)
+    view_counter.increment("service", service.id)
     
     # Récupérer les add-ons
     addons = (
@@ -183,7 +198,7 @@ async def get_service(
             for avail in availabilities
         ],
         "booking_count": service.booking_count,
-        "view_count": service.view_count
+        "view_count": (service.view_count or 0) + view_counter.pending("service", service.id)
     }
 
 
@@ -201,7 +216,7 @@ async def get_all_services_admin(
 ) -> Any:
     """Obtenir tous les services (Admin)"""
     
-    query = db.query(Service)
+    query = db.query(Service).options(joinedload(Service.category))
     
     if category_id:
         query = query.filter(Service.category_id == category_id)
@@ -278,6 +293,7 @@ async def create_service(
     db.add(service)
     db.commit()
     db.refresh(service)
+    service_changed(service.id)
     
     return {
         "message": "Service créé avec succès",
@@ -349,6 +365,7 @@ async def update_service(
     
     service.updated_at = datetime.utcnow()
     db.commit()
+    service_changed(service_id)
     
     return {"message": "Service mis à jour avec succès"}
 
@@ -366,6 +383,7 @@ async def delete_service(
     
     service.is_active = False
     db.commit()
+    service_changed(service_id)
     
     return {"message": "Service désactivé avec succès"}
 
@@ -380,8 +398,10 @@ async def get_all_categories_admin(
 ) -> Any:
     """Obtenir toutes les catégories de services (Admin)"""
     
-    categories = (
-        db.query(ServiceCategory)
+    counts = _service_counts(active_only=False)
+    rows = (
+        db.query(ServiceCategory, func.coalesce(counts.c.service_count, 0))
+        .outerjoin(counts, counts.c.category_id == ServiceCategory.id)
         .order_by(ServiceCategory.sort_order, ServiceCategory.name)
         .all()
     )
@@ -397,9 +417,9 @@ async def get_all_categories_admin(
                 "color": cat.color,
                 "sort_order": cat.sort_order,
                 "is_active": cat.is_active,
-                "service_count": len(cat.services)
+                "service_count": service_count
             }
-            for cat in categories
+            for cat, service_count in rows
         ]
     }
 
@@ -10,6 +10,7 @@ from app.core.database import get_db
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.subscription import Subscription, SubscriptionStatus
 from app.models.user import User
+from app.services.stats_service import get_stats_service
 
 router = APIRouter()
 
@@ -265,33 +266,4 @@ async def get_subscription_stats(
 ) -> Any:
     """Obtenir les statistiques des abonnements (Admin)"""
     
-    from sqlalchemy import func
-    
-    total_subscriptions = db.query(Subscription).count()
-    active_subscriptions = db.query(Subscription).filter(
-        Subscription.status == SubscriptionStatus.ACTIVE
-    ).count()
-    
-    # Revenus récurrents mensuels (MRR)
-    monthly_revenue = db.query(func.sum(Subscription.amount)).filter(
-        Subscription.status == SubscriptionStatus.ACTIVE,
-        Subscription.billing_interval == "monthly"
-    ).scalar() or 0
-    
-    # Taux de rétention (approximatif)
-    cancelled_subscriptions = db.query(Subscription).filter(
-        Subscription.status == SubscriptionStatus.CANCELLED
-    ).count()
-    
-    retention_rate = (
-        (active_subscriptions / (active_subscriptions + cancelled_subscriptions)) * 100
-        if (active_subscriptions + cancelled_subscriptions) > 0 else 0
-    )
-    
-    return {
-        "total_subscriptions": total_subscriptions,
-        "active_subscriptions": active_subscriptions,
-        "cancelled_subscriptions": cancelled_subscriptions,
-        "monthly_recurring_revenue": monthly_revenue,
-        "retention_rate": round(retention_rate, 2)
-    }
+    return get_stats_service(db).subscription_stats()
@@ -0,0 +1,235 @@
+"""
+Cache mémoire LRU + TTL avec invalidation par tags versionnés
+
+Chaque entrée retient la version de ses tags au moment de l'écriture.
+Invalider un tag lui donne une nouvelle version (horloge globale croissante):
+toutes les entrées qui en dépendent deviennent invalides en O(1), sans
+parcourir le cache.
+
+Une invalidation peut arriver (depuis un autre thread) pendant que la valeur
+est lue en base: l'appelant prend snapshot() avant sa lecture et le passe à
+set(since=...), qui ignore l'écriture si l'un de ses tags a été invalidé
+entre-temps (la valeur lue est peut-être déjà périmée).
+
+get_or_set est "single-flight": pour une clé absente, un seul appelant
+calcule la valeur, les appelants concurrents attendent puis la relisent.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from app.core.responses import render_json
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, expires_at: float, size: int, tags: Tuple[Tuple[str, int], ...]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class TaggedCache:
+    """
+    Cache LRU borné en nombre d'entrées et en octets (estimation JSON)
+
+    Usage:
+        cache = TaggedCache(max_entries=1000, max_bytes=32 * 1024 * 1024, ttl=300)
+        since = cache.snapshot()
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, tags=("catalog", "product:12"), since=since)
+        cache.invalidate("product:12")
+
+    Les valeurs mises en cache sont partagées: les appelants ne doivent pas
+    les modifier (faire une copie avant d'ajouter des champs).
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024, ttl: float = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._tag_versions: Dict[str, int] = {}
+        # Horloge des invalidations: version donnée au dernier tag invalidé
+        self._clock = 0
+        self._bytes = 0
+        # Clé en cours de calcul -> [verrou, nombre d'appelants]
+        self._flights: Dict[Hashable, list] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "coalesced": 0,
+            "stale_writes": 0,
+        }
+
+    # ----- Lecture / écriture -----
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Lire une entrée valide (None si absente, expirée ou invalidée)"""
+        with self._lock:
+            value = self._read(key)
+            self._stats["hits" if value is not None else "misses"] += 1
+            return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+        since: Optional[int] = None
+    ) -> None:
+        """
+        Écrire une entrée rattachée à des tags d'invalidation
+
+        since: valeur de snapshot() prise avant de calculer la valeur; l'écriture
+        est ignorée si l'un des tags a été invalidé depuis.
+        """
+        tags = set(tags)
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if since is not None and any(self._tag_versions.get(tag, 0) > since for tag in tags):
+                self._stats["stale_writes"] += 1
+                return
+
+            if key in self._entries:
+                self._drop(key)
+
+            entry = _Entry(
+                value=value,
+                expires_at=time.monotonic() + (ttl if ttl is not None else self.ttl),
+                size=size,
+                tags=tuple((tag, self._tag_versions.get(tag, 0)) for tag in tags)
+            )
+            self._entries[key] = entry
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def get_or_set(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Lire une entrée ou la calculer avec loader() en cas d'absence
+
+        Un seul loader() par clé à la fois: les appelants arrivés pendant
+        le calcul attendent et reçoivent la valeur calculée.
+        """
+        since = self.snapshot()
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            flight = self._flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                # Relire: un calcul concurrent a pu remplir l'entrée entre-temps
+                with self._lock:
+                    value = self._read(key)
+                    if value is not None:
+                        self._stats["coalesced"] += 1
+                        return value
+                value = loader()
+                self.set(key, value, tags=tags, ttl=ttl, since=since)
+                return value
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[key]
+
+    # ----- Invalidation -----
+
+    def invalidate(self, *tags: str) -> None:
+        """Invalider toutes les entrées rattachées à l'un des tags"""
+        with self._lock:
+            for tag in tags:
+                self._clock += 1
+                self._tag_versions[tag] = self._clock
+            self._stats["invalidations"] += len(tags)
+
+    def snapshot(self) -> int:
+        """Position courante de l'horloge des invalidations (à prendre avant une lecture en base)"""
+        with self._lock:
+            return self._clock
+
+    def version(self, *tags: str) -> Tuple[int, ...]:
+        """Versions courantes des tags (utile pour dériver un ETag)"""
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def clear(self) -> None:
+        """Vider le cache (les versions de tags sont conservées)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ----- Statistiques -----
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques de dimensionnement (taux de succès, mémoire)"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+            }
+
+    # ----- Interne -----
+
+    def _read(self, key: Hashable) -> Optional[Any]:
+        """Entrée valide ou None (les entrées périmées sont retirées); appelé sous verrou"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._drop(key)
+            self._stats["expirations"] += 1
+            return None
+
+        for tag, version in entry.tags:
+            if self._tag_versions.get(tag, 0) != version:
+                self._drop(key)
+                return None
+
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(render_json(value))
+        except (TypeError, ValueError):
+            return 1024
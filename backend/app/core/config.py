@@ -45,6 +45,10 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     SMTP_TLS: bool = os.getenv("SMTP_TLS", "true").lower() == "true"
     
+    # Telegram (alertes admin: nouvelles commandes, stock faible)
+    TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN", "")
+    TELEGRAM_CHAT_ID: str = os.getenv("TELEGRAM_CHAT_ID", "")
+    
     # Upload de fichiers
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(5 * 1024 * 1024)))  # 5MB
@@ -54,6 +58,50 @@ class Settings(BaseSettings):
     CLOUDINARY_API_KEY: str = os.getenv("CLOUDINARY_API_KEY", "")
     CLOUDINARY_API_SECRET: str = os.getenv("CLOUDINARY_API_SECRET", "")
     
+    # Compteurs de vues (écriture différée, en secondes)
+    VIEW_COUNT_FLUSH_SECONDS: int = int(os.getenv("VIEW_COUNT_FLUSH_SECONDS", "10"))
+
+    # Cache mémoire du catalogue public
+    CATALOG_CACHE_TTL_SECONDS: int = int(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+    CATALOG_CACHE_MAX_ENTRIES: int = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "1000"))
+    CATALOG_CACHE_MAX_BYTES: int = int(os.getenv("CATALOG_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 32MB
+
+    # Recommandations "souvent achetés ensemble" (lift ou cosine)
+    RECOMMENDATION_METRIC: str = os.getenv("RECOMMENDATION_METRIC", "lift")
+    RECOMMENDATION_MIN_SUPPORT: int = int(os.getenv("RECOMMENDATION_MIN_SUPPORT", "2"))
+
+    # Réservations temporaires de stock (checkout WhatsApp)
+    STOCK_HOLD_TTL_SECONDS: int = int(os.getenv("STOCK_HOLD_TTL_SECONDS", "900"))
+    STOCK_HOLD_MAX_TTL_SECONDS: int = int(os.getenv("STOCK_HOLD_MAX_TTL_SECONDS", "3600"))
+    STOCK_HOLD_SWEEP_SECONDS: int = int(os.getenv("STOCK_HOLD_SWEEP_SECONDS", "30"))
+
+    # Clés d'idempotence des créations de commande (en-tête Idempotency-Key)
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_LOCK_SECONDS: int = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+    IDEMPOTENCY_WAIT_SECONDS: int = int(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", "1000"))
+    IDEMPOTENCY_SWEEP_SECONDS: int = int(os.getenv("IDEMPOTENCY_SWEEP_SECONDS", "600"))
+
+    # Numéros de commande et de facture: taille des blocs réservés par worker
+    NUMBER_BLOCK_SIZE: int = int(os.getenv("NUMBER_BLOCK_SIZE", "20"))
+
+    # Tâches en arrière-plan après commande (local: worker de l'API, celery: broker ci-dessous)
+    JOBS_BACKEND: str = os.getenv("JOBS_BACKEND", "local")
+    JOBS_POLL_SECONDS: int = int(os.getenv("JOBS_POLL_SECONDS", "5"))
+    JOBS_BATCH_SIZE: int = int(os.getenv("JOBS_BATCH_SIZE", "20"))
+    JOBS_MAX_ATTEMPTS: int = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+    JOBS_RETRY_BASE_SECONDS: int = int(os.getenv("JOBS_RETRY_BASE_SECONDS", "10"))
+    JOBS_RETRY_MAX_SECONDS: int = int(os.getenv("JOBS_RETRY_MAX_SECONDS", "3600"))
+    JOBS_LOCK_SECONDS: int = int(os.getenv("JOBS_LOCK_SECONDS", "300"))
+    JOBS_RETENTION_DAYS: int = int(os.getenv("JOBS_RETENTION_DAYS", "7"))
+    LOW_STOCK_THRESHOLD: int = int(os.getenv("LOW_STOCK_THRESHOLD", "5"))
+
+    # Statistiques des tableaux de bord admin: durée de cache (secondes)
+    ADMIN_STATS_TTL_SECONDS: int = int(os.getenv("ADMIN_STATS_TTL_SECONDS", "15"))
+
+    # Classements précalculés (meilleures ventes, mis en avant, top catégories)
+    LEADERBOARD_SIZE: int = int(os.getenv("LEADERBOARD_SIZE", "50"))
+
     # Celery
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
@@ -3,8 +3,10 @@ Configuration de la base de données PostgreSQL avec SQLAlchemy
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from app.core.config import settings
 
 # Moteur de base de données PostgreSQL
@@ -30,3 +32,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class explain(Executable, ClauseElement):
+    """
+    Construction EXPLAIN (FORMAT JSON) pour une requête SQLAlchemy (PostgreSQL)
+    
+    Usage: db.execute(explain(query.statement)).scalar()
+    """
+    
+    inherit_cache = False
+    
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    options = "ANALYZE, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) " + compiler.process(element.statement, **kw)
@@ -0,0 +1,64 @@
+"""
+Requêtes conditionnelles HTTP (ETag / If-None-Match) et en-têtes Cache-Control
+
+L'ETag est un hachage du contenu de la réponse: deux réponses identiques
+ont le même ETag, quel que soit le worker qui les sert. Combiné au cache
+du catalogue, un client à jour reçoit un 304 sans requête SQL ni corps.
+"""
+
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+from app.core.responses import render_json
+
+# Politiques Cache-Control par type de route
+CACHE_CATALOG_LIST = "public, max-age=60, stale-while-revalidate=300"
+CACHE_CATALOG_DETAIL = "public, max-age=60, stale-while-revalidate=600"
+CACHE_CATALOG_STATIC = "public, max-age=300, stale-while-revalidate=3600"
+
+
+def compute_etag(content: Any) -> str:
+    """ETag fort dérivé du contenu JSON (octets déjà rendus ou valeur à rendre)"""
+    body = content if isinstance(content, bytes) else render_json(content)
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Vérifier si l'en-tête If-None-Match correspond à l'ETag courant"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    # Comparaison faible (RFC 9110): W/"x" et "x" désignent la même version
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return opaque in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+
+def conditional_json(
+    request: Request,
+    payload: Any,
+    cache_control: str = CACHE_CATALOG_LIST,
+    etag_source: Any = None
+) -> Response:
+    """
+    Renvoyer payload en JSON avec ETag, ou 304 si le client est à jour
+
+    etag_source permet de dériver l'ETag d'une autre valeur que le corps
+    (ex: fiche produit en cache, sans le compteur de vues temps réel). Le
+    corps pouvant alors différer pour un même ETag, celui-ci est faible (W/).
+    """
+    body = render_json(payload)
+    if etag_source is not None:
+        etag = "W/" + compute_etag(etag_source)
+    else:
+        etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,159 @@
+"""
+Pagination par curseur (keyset) et comptage des résultats
+
+Le curseur encode la valeur de la colonne de tri et l'id de la dernière ligne
+de la page: la page suivante devient une recherche d'index
+(WHERE (col, id) < (:valeur, :id)) au lieu d'un OFFSET qui relit toutes
+les lignes précédentes.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query
+
+from app.core.database import explain
+
+# Modes de comptage acceptés par les endpoints paginés
+COUNT_MODES = "^(exact|estimate|none)$"
+
+
+def sort_key(sort_column, descending: bool = True) -> str:
+    """Tri auquel un curseur est lié (colonne et sens)"""
+    return f"{sort_column.key}:{'desc' if descending else 'asc'}"
+
+
+def encode_cursor(sort_value: Any, row_id: int, sort: Optional[str] = None) -> str:
+    """Encoder la position de la dernière ligne (et le tri utilisé) en curseur opaque"""
+    if isinstance(sort_value, datetime):
+        value = {"t": "dt", "v": sort_value.isoformat()}
+    elif isinstance(sort_value, date):
+        value = {"t": "d", "v": sort_value.isoformat()}
+    else:
+        value = {"t": "raw", "v": sort_value}
+    payload = json.dumps({"k": value, "id": row_id, "s": sort}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[str] = None) -> Tuple[Any, int]:
+    """
+    Décoder un curseur; lève une erreur 400 s'il est invalide
+
+    Un curseur créé pour un autre tri (ex: curseur de date rejoué avec un
+    tri par prix) est refusé: sa valeur ne peut pas être comparée à la
+    colonne de tri courante.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload.get("s") != sort:
+            raise ValueError("Curseur créé pour un autre tri")
+        value = payload["k"]
+        if value["t"] == "dt":
+            sort_value = datetime.fromisoformat(value["v"])
+        elif value["t"] == "d":
+            sort_value = date.fromisoformat(value["v"])
+        else:
+            sort_value = value["v"]
+        return sort_value, int(payload["id"])
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+
+def keyset_order(sort_column, id_column, descending: bool = True, nullable: bool = False) -> list:
+    """Clauses ORDER BY stables (colonne de tri puis id) compatibles avec le curseur"""
+    if descending:
+        order = [sort_column.desc(), id_column.desc()]
+    else:
+        order = [sort_column.asc(), id_column.asc()]
+    if nullable:
+        order[0] = order[0].nullslast()
+    return order
+
+
+def apply_cursor(
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: str,
+    descending: bool = True,
+    nullable: bool = False
+) -> Query:
+    """Restreindre la requête aux lignes situées après le curseur"""
+    sort_value, last_id = decode_cursor(cursor, sort_key(sort_column, descending))
+
+    if sort_value is None:
+        # Les NULL sont en fin de liste: on ne parcourt plus que ceux-ci
+        id_filter = id_column < last_id if descending else id_column > last_id
+        return query.filter(and_(sort_column.is_(None), id_filter))
+
+    position = tuple_(sort_column, id_column)
+    after = position < (sort_value, last_id) if descending else position > (sort_value, last_id)
+    if nullable:
+        after = or_(after, sort_column.is_(None))
+    return query.filter(after)
+
+
+def paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    nullable: bool = False
+) -> Tuple[List[Any], bool, Optional[str]]:
+    """
+    Paginer une requête par curseur (ou par offset si aucun curseur)
+
+    Retourne (lignes, has_more, next_cursor). Une ligne de plus que la limite
+    est lue pour savoir s'il reste des résultats sans COUNT(*).
+    """
+    query = query.order_by(*keyset_order(sort_column, id_column, descending, nullable))
+
+    if cursor:
+        query = apply_cursor(query, sort_column, id_column, cursor, descending, nullable)
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, sort_column.key),
+            getattr(last, id_column.key),
+            sort_key(sort_column, descending)
+        )
+
+    return rows, has_more, next_cursor
+
+
+def count_total(query: Query, mode: str = "exact") -> Optional[int]:
+    """
+    Compter les résultats d'une requête selon le mode demandé
+
+    - exact: COUNT(*) classique
+    - estimate: estimation du planificateur PostgreSQL (EXPLAIN), sans parcours
+    - none: pas de comptage (défilement infini)
+    """
+    if mode == "none":
+        return None
+
+    if mode == "estimate" and query.session.get_bind().dialect.name == "postgresql":
+        statement = query.enable_eagerloads(False).order_by(None).statement
+        plan = query.session.execute(explain(statement)).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    return query.order_by(None).count()
@@ -0,0 +1,47 @@
+"""
+Rendu JSON rapide des réponses (orjson)
+
+Les modèles Pydantic sont sérialisés par pydantic-core, les dictionnaires
+par orjson: dans les deux cas sans passer par jsonable_encoder, qui
+parcourt chaque valeur en Python.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Types non gérés nativement par orjson"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+
+def render_json(content: Any) -> bytes:
+    """Sérialiser un contenu de réponse en JSON (octets UTF-8)"""
+    if isinstance(content, BaseModel):
+        return pydantic_core.to_json(content)
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON par défaut de l'API
+
+    Une route qui renvoie directement FastJSONResponse(modele) évite aussi
+    la validation et l'encodage intermédiaires de FastAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
@@ -20,8 +20,18 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Configuration pour l'authentification JWT
 security = HTTPBearer()
 
+# Mot de passe inutilisable des clients invités (commandes WhatsApp):
+# aucun hash bcrypt ne commence par "!", aucune connexion n'est donc possible
+UNUSABLE_PASSWORD = "!guest"
+
+def has_usable_password(hashed_password: Optional[str]) -> bool:
+    """Le compte a-t-il un vrai mot de passe (et pas le marqueur des invités)"""
+    return bool(hashed_password) and not hashed_password.startswith("!")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifier un mot de passe en clair contre sa version hashée"""
+    if not has_usable_password(hashed_password):
+        return False
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
@@ -12,14 +12,32 @@ from fastapi.responses import HTMLResponse
 # Handle both direct execution and package import
 try:
     from .core.config import settings
-    from .core.database import engine, Base
-    from .api import auth, products, orders, subscriptions, appointments, chat, analytics, admin, banner, hero, suppliers, invoices, services, faq, uploads
+    from .core.database import engine, Base, SessionLocal
+    from .core.responses import FastJSONResponse
+    from .services.idempotency_service import idempotency_store
+    from .services.inventory_service import hold_sweeper
+    from .services.job_queue import job_worker
+    from .services.leaderboard_service import get_leaderboard_service
+    from .services.recommendation_service import get_recommendation_service
+    from .services.search_service import get_search_service
+    from .services.suggest_service import get_suggest_service
+    from .services.view_counter import view_counter
+    from .api import auth, products, orders, subscriptions, appointments, chat, analytics, admin, banner, hero, suppliers, invoices, services, faq, uploads, search
     from .websocket.chat_handler import router as chat_router
 except ImportError:
     # When running directly, use absolute imports
     from app.core.config import settings
-    from app.core.database import engine, Base
-    from app.api import auth, products, orders, subscriptions, appointments, chat, analytics, admin, banner, hero, suppliers, invoices, services, faq, uploads
+    from app.core.database import engine, Base, SessionLocal
+    from app.core.responses import FastJSONResponse
+    from app.services.idempotency_service import idempotency_store
+    from app.services.inventory_service import hold_sweeper
+    from app.services.job_queue import job_worker
+    from app.services.leaderboard_service import get_leaderboard_service
+    from app.services.recommendation_service import get_recommendation_service
+    from app.services.search_service import get_search_service
+    from app.services.suggest_service import get_suggest_service
+    from app.services.view_counter import view_counter
+    from app.api import auth, products, orders, subscriptions, appointments, chat, analytics, admin, banner, hero, suppliers, invoices, services, faq, uploads, search
     from app.websocket.chat_handler import router as chat_router
 
 # Création des tables
@@ -31,7 +49,8 @@ app = FastAPI(
     description="API pour boutique en ligne interactive avec chat temps réel",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # Configuration CORS - Autoriser le frontend Next.js
@@ -43,6 +62,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def build_search_index():
+    """Indexer les produits sans document de recherche et construire l'autocomplétion"""
+    db = SessionLocal()
+    try:
+        get_search_service(db).ensure_index()
+        get_suggest_service(db).rebuild()
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def build_recommendations():
+    """Construire la matrice de co-occurrence des commandes payées"""
+    db = SessionLocal()
+    try:
+        get_recommendation_service(db).rebuild()
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def build_leaderboards():
+    """Charger les classements (meilleures ventes, mis en avant, top catégories)"""
+    db = SessionLocal()
+    try:
+        get_leaderboard_service(db).rebuild()
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_view_counter():
+    """Démarrer l'écriture différée des compteurs de vues"""
+    view_counter.start()
+
+
+@app.on_event("shutdown")
+async def flush_view_counter():
+    """Écrire les dernières vues avant l'arrêt"""
+    await view_counter.stop()
+
+
+@app.on_event("startup")
+async def start_hold_sweeper():
+    """Démarrer la libération périodique des réservations de stock expirées"""
+    hold_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def stop_hold_sweeper():
+    await hold_sweeper.stop()
+
+
+@app.on_event("startup")
+async def start_idempotency_sweeper():
+    """Démarrer la purge périodique des clés d'idempotence expirées"""
+    idempotency_store.start()
+
+
+@app.on_event("shutdown")
+async def stop_idempotency_sweeper():
+    await idempotency_store.stop()
+
+
+@app.on_event("startup")
+async def start_job_worker():
+    """Démarrer l'exécution des tâches après commande (facture, notifications)"""
+    job_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_worker():
+    await job_worker.stop()
+
+
 # Health check
 @app.get("/health")
 async def health_check():
@@ -70,6 +165,7 @@ app.include_router(invoices.router, prefix="/api/invoices", tags=["Invoices"])
 app.include_router(services.router, prefix="/api/services", tags=["Services"])
 app.include_router(faq.router, prefix="/api/faq", tags=["FAQ"])
 app.include_router(uploads.router, prefix="/api/uploads", tags=["Uploads"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
 
 # WebSocket pour chat temps réel
 app.include_router(chat_router, prefix="/ws")
@@ -10,6 +10,12 @@ from app.models.supplier import Supplier, SupplierInvoice
 from app.models.invoice import CustomerInvoice, InvoiceStatus
 from app.models.hero_slider import HeroSlide, SiteSettings
 from app.models.service import Service, ServiceCategory, ServiceAvailability, ServiceAddon
+from app.models.search import ProductSearchDocument
+from app.models.sales import ProductSalesDaily
+from app.models.stock import StockHold
+from app.models.idempotency import IdempotencyKey
+from app.models.sequence import NumberSequence
+from app.models.job import BackgroundJob, JobStatus
 
 __all__ = [
     "Banner",
@@ -39,5 +45,12 @@ __all__ = [
     "Service",
     "ServiceCategory",
     "ServiceAvailability",
-    "ServiceAddon"
+    "ServiceAddon",
+    "ProductSearchDocument",
+    "ProductSalesDaily",
+    "StockHold",
+    "IdempotencyKey",
+    "NumberSequence",
+    "BackgroundJob",
+    "JobStatus"
 ]
@@ -4,7 +4,7 @@ Modèles pour la gestion des rendez-vous et services
 
 from datetime import datetime, timedelta
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -33,6 +33,13 @@ class Appointment(Base):
     """Modèle de rendez-vous"""
     
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Disponibilité d'un créneau et planning par période
+        Index("ix_appointments_scheduled_status", "scheduled_date", "status"),
+        # Liste admin filtrée par statut (clé de curseur: scheduled_date, id)
+        Index("ix_appointments_status_scheduled", "status", "scheduled_date", "id"),
+        Index("ix_appointments_user_scheduled", "user_id", "scheduled_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
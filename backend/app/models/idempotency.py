@@ -0,0 +1,42 @@
+"""
+Modèles pour les clés d'idempotence des créations de commande
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, UniqueConstraint
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Réponse enregistrée pour un en-tête Idempotency-Key
+
+    Une ligne sans status_code est une requête en cours: locked_until borne
+    son traitement (au-delà, une nouvelle tentative peut la reprendre).
+    Une fois la réponse enregistrée, les répétitions de la même clé la
+    rejouent jusqu'à expires_at.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(100), nullable=False)  # ex: "orders:user:12", "orders:whatsapp"
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 du corps de la requête
+
+    status_code = Column(Integer)
+    response_body = Column(Text)
+
+    locked_until = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+        # Purge des clés expirées
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.scope} {self.key}>"
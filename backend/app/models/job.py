@@ -0,0 +1,53 @@
+"""
+Modèles pour les tâches en arrière-plan (facture, notifications après commande)
+"""
+
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Column, DateTime, Enum as SQLEnum, Index, Integer, String, Text
+
+from app.core.database import Base
+
+
+class JobStatus(str, Enum):
+    """Statuts d'une tâche"""
+    PENDING = "pending"  # En attente (première exécution ou nouvel essai)
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"  # Nombre maximal d'essais atteint
+
+
+class BackgroundJob(Base):
+    """
+    Tâche durable exécutée après la validation d'une transaction
+
+    La ligne est écrite dans la transaction qui la déclenche (ex: commande):
+    la tâche existe si et seulement si la commande existe. Un worker la
+    prend (RUNNING, locked_until), l'exécute, puis la marque SUCCEEDED ou la
+    replanifie (run_at) avec un délai croissant.
+    """
+
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)  # ex: "invoice.create"
+    payload = Column(Text, nullable=False)  # JSON
+
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    last_error = Column(Text, nullable=True)
+
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Prochaine exécution
+    locked_until = Column(DateTime, nullable=True)  # Fin de la prise par un worker
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Sélection des tâches dues par les workers
+        Index("ix_background_jobs_status_run_at", "status", "run_at"),
+    )
+
+    def __repr__(self):
+        return f"<BackgroundJob {self.id} {self.name} {self.status}>"
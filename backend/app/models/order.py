@@ -4,7 +4,7 @@ Modèles pour les commandes et articles de commande
 
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -34,6 +34,14 @@ class Order(Base):
     """Modèle de commande"""
     
     __tablename__ = "orders"
+    __table_args__ = (
+        # Statistiques et analytics: commandes payées sur une période
+        Index("ix_orders_payment_status_created", "payment_status", "created_at"),
+        # Listes admin (filtre statut ou non) et historique client, tri par date
+        Index("ix_orders_status_created", "status", "created_at", "id"),
+        Index("ix_orders_created", "created_at", "id"),
+        Index("ix_orders_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), unique=True, index=True, nullable=False)
@@ -53,6 +61,12 @@ class Order(Base):
     discount_amount = Column(Float, default=0)
     total_amount = Column(Float, nullable=False)
     
+    # Résumé dénormalisé pour les listes, fixé à la création
+    # (NULL sur les anciennes commandes: voir backfill_order_summaries.py)
+    item_count = Column(Integer, nullable=True)
+    customer_name = Column(String(201), nullable=True)
+    customer_email = Column(String(255), nullable=True)
+    
     # Informations de livraison
     shipping_first_name = Column(String(100), nullable=False)
     shipping_last_name = Column(String(100), nullable=False)
@@ -100,6 +114,8 @@ class Order(Base):
     @property
     def total_items(self) -> int:
         """Nombre total d'articles dans la commande"""
+        if self.item_count is not None:
+            return self.item_count
         return sum(item.quantity for item in self.items)
     
     def __repr__(self):
@@ -110,6 +126,10 @@ class OrderItem(Base):
     """Article d'une commande"""
     
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_product_order", "product_id", "order_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
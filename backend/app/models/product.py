@@ -4,7 +4,8 @@ Implémentation du pattern Open/Closed (SOLID) avec héritage de table unique (S
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index, Table, func, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from abc import abstractmethod
 
@@ -153,10 +154,31 @@ class SkinCareCategory(Category):
         return self.get_custom_value("key_ingredients", [])
 
 
+# Index partiels: la boutique ne liste que les produits actifs
+ACTIVE_PRODUCTS_ONLY = {
+    "postgresql_where": text("is_active = true"),
+    "sqlite_where": text("is_active = 1"),
+}
+
+
 class Product(Base):
     """Modèle produit/service"""
     
     __tablename__ = "products"
+    __table_args__ = (
+        # Liste publique: tri par date, par prix, par ventes (clé de curseur: id)
+        Index("ix_products_active_created", "created_at", "id", **ACTIVE_PRODUCTS_ONLY),
+        Index("ix_products_active_category_created", "category_id", "created_at", "id", **ACTIVE_PRODUCTS_ONLY),
+        Index("ix_products_active_price", "price", "id", **ACTIVE_PRODUCTS_ONLY),
+        Index("ix_products_active_sales", "sales_count", "id", **ACTIVE_PRODUCTS_ONLY),
+        Index(
+            "ix_products_featured", "sales_count", "created_at",
+            postgresql_where=text("is_active = true AND is_featured = true"),
+            sqlite_where=text("is_active = 1 AND is_featured = 1")
+        ),
+        # Filtre catégorie de l'admin (inactifs compris) et jointures
+        Index("ix_products_category_id", "category_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -171,6 +193,8 @@ class Product(Base):
     
     # Gestion du stock
     stock_quantity = Column(Integer, default=0)
+    # Unités retenues par des paniers en cours (réservations StockHold non expirées)
+    reserved_quantity = Column(Integer, nullable=False, default=0, server_default="0")
     track_inventory = Column(Boolean, default=True)
     allow_backorder = Column(Boolean, default=False)
     
@@ -218,12 +242,21 @@ class Product(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @hybrid_property
+    def available_quantity(self) -> int:
+        """Stock disponible: stock physique moins les réservations en cours"""
+        return (self.stock_quantity or 0) - (self.reserved_quantity or 0)
+    
+    @available_quantity.expression
+    def available_quantity(cls):
+        return func.coalesce(cls.stock_quantity, 0) - func.coalesce(cls.reserved_quantity, 0)
+    
     @property
     def is_in_stock(self) -> bool:
-        """Vérifier si le produit est en stock"""
+        """Vérifier si le produit est en stock (hors unités réservées)"""
         if not self.track_inventory:
             return True
-        return self.stock_quantity > 0 or self.allow_backorder
+        return self.available_quantity > 0 or self.allow_backorder
     
     @property
     def discount_percentage(self) -> float:
@@ -0,0 +1,35 @@
+"""
+Modèles pour les agrégats de ventes (classements des meilleures ventes)
+"""
+
+from sqlalchemy import Column, Date, Float, Index, Integer
+
+from app.core.database import Base
+
+
+class ProductSalesDaily(Base):
+    """
+    Ventes payées d'un produit sur une journée
+
+    Alimentée à chaque commande payée (jour de création de la commande).
+    Sert d'instantané aux classements 7/30/90 jours: au démarrage, seules
+    ces lignes sont relues, pas l'historique des commandes.
+    Pas de clé étrangère: un produit supprimé garde son historique.
+    """
+
+    __tablename__ = "product_sales_daily"
+
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    # Nombre de lignes de commande (comme order_count des analytics)
+    line_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_product_sales_daily_day", "day"),
+    )
+
+    def __repr__(self):
+        return f"<ProductSalesDaily {self.product_id} {self.day}>"
@@ -0,0 +1,64 @@
+"""
+Modèles pour l'index de recherche plein texte du catalogue
+"""
+
+from datetime import datetime
+from sqlalchemy import DDL, Column, Integer, String, Text, DateTime, ForeignKey, Index, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.core.database import Base
+
+
+class ProductSearchDocument(Base):
+    """
+    Document de recherche d'un produit
+
+    Contient le texte normalisé (minuscules, sans accents) du produit.
+    Sur PostgreSQL, la colonne search_vector (tsvector pondéré) est indexée en GIN,
+    et le texte normalisé en GIN trigramme (pg_trgm) pour la recherche fuzzy.
+    Sur SQLite elle reste vide et la recherche passe par l'index inversé
+    en mémoire (voir app.services.search_service).
+    """
+
+    __tablename__ = "product_search_documents"
+
+    product_id = Column(
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # Texte normalisé
+    name_folded = Column(String(200), nullable=False, default="")
+    document = Column(Text, nullable=False, default="")
+
+    # Vecteur plein texte (tsvector sur PostgreSQL)
+    search_vector = Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "ix_product_search_documents_vector",
+            "search_vector",
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    def __repr__(self):
+        return f"<ProductSearchDocument {self.product_id}>"
+
+
+# Index trigramme de la recherche tolérante aux fautes (opérateurs % et %>)
+TRIGRAM_INDEX = Index(
+    "ix_product_search_documents_document_trgm",
+    ProductSearchDocument.document,
+    postgresql_using="gin",
+    postgresql_ops={"document": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    ProductSearchDocument.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
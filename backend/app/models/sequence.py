@@ -0,0 +1,25 @@
+"""
+Modèles pour la numérotation des commandes et des factures
+"""
+
+from sqlalchemy import Column, Date, Integer, String
+
+from app.core.database import Base
+
+
+class NumberSequence(Base):
+    """
+    Compteur journalier d'une série de numéros (WA, ST, INV)
+
+    last_value est le dernier numéro distribué: chaque worker réserve un
+    bloc de numéros consécutifs en une requête (voir NumberAllocator).
+    """
+
+    __tablename__ = "number_sequences"
+
+    series = Column(String(10), primary_key=True)
+    day = Column(Date, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<NumberSequence {self.series} {self.day} {self.last_value}>"
@@ -0,0 +1,39 @@
+"""
+Modèles pour les réservations temporaires de stock
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.core.database import Base
+
+
+class StockHold(Base):
+    """
+    Unités d'un produit retenues pour un panier pendant une durée limitée
+
+    Toutes les lignes d'un même panier partagent un token. La quantité est
+    aussi comptée dans Product.reserved_quantity: le stock disponible se lit
+    sans agrégation (stock_quantity - reserved_quantity).
+    Une réservation est confirmée par une commande (le stock physique est
+    alors décrémenté) ou libérée à expiration.
+    """
+
+    __tablename__ = "stock_holds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token = Column(String(36), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_stock_holds_token", "token"),
+        # Libération des réservations expirées (globale ou par produit)
+        Index("ix_stock_holds_expires_product", "expires_at", "product_id"),
+    )
+
+    def __repr__(self):
+        return f"<StockHold {self.token} {self.product_id}x{self.quantity}>"
@@ -18,7 +18,7 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
-    phone = Column(String(20), nullable=True)
+    phone = Column(String(20), nullable=True, index=True)  # Recherche des clients invités
     whatsapp_number = Column(String(20), nullable=True)
     whatsapp_consent = Column(Boolean, default=False)
     
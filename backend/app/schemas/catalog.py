@@ -0,0 +1,121 @@
+"""
+Schémas Pydantic des listes du catalogue (boutique et admin).
+"""
+from pydantic import Field, model_validator
+from datetime import datetime
+from typing import List, Optional
+
+from app.schemas.common import ORMModel, PageInfo
+
+
+class CategoryRef(ORMModel):
+    """Catégorie résumée dans une carte produit."""
+    id: int
+    name: str
+    slug: Optional[str] = None
+
+
+class CategoryListItem(ORMModel):
+    """Catégorie de la liste publique."""
+    id: int
+    name: str
+    description: Optional[str] = None
+    slug: Optional[str] = None
+    image_url: Optional[str] = None
+    product_count: int = 0
+
+
+class CategoryList(ORMModel):
+    categories: List[CategoryListItem]
+
+
+class ProductCard(ORMModel):
+    """Produit de la liste publique."""
+    id: int
+    name: str
+    description: Optional[str] = None
+    short_description: Optional[str] = None
+    slug: Optional[str] = None
+    price: float
+    compare_at_price: Optional[float] = None
+    discount_percentage: float = 0
+    main_image_url: Optional[str] = None
+    gallery_images: Optional[str] = None
+    is_in_stock: bool
+    is_active: bool
+    track_inventory: bool = Field(default=True, exclude=True)
+    stock_quantity: Optional[int] = Field(
+        None,
+        validation_alias="available_quantity",
+        description="Stock disponible, hors réservations (null si le stock n'est pas suivi)"
+    )
+    is_featured: bool
+    category: Optional[CategoryRef] = None
+    sales_count: int = 0
+    view_count: int = 0
+
+    @model_validator(mode="after")
+    def hide_untracked_stock(self):
+        if not self.track_inventory:
+            self.stock_quantity = None
+        return self
+
+
+class ProductPage(PageInfo):
+    products: List[ProductCard]
+    did_you_mean: Optional[str] = Field(None, description="Correction proposée pour la recherche")
+
+
+class FeaturedProduct(ORMModel):
+    id: int
+    name: str
+    short_description: Optional[str] = None
+    slug: Optional[str] = None
+    price: float
+    compare_at_price: Optional[float] = None
+    discount_percentage: float = 0
+    main_image_url: Optional[str] = None
+    is_in_stock: bool
+    sales_count: int = 0
+
+
+class FeaturedProductList(ORMModel):
+    featured_products: List[FeaturedProduct]
+
+
+class BestSeller(ORMModel):
+    id: int
+    name: str
+    slug: Optional[str] = None
+    price: float
+    main_image_url: Optional[str] = None
+    sales_count: int = 0
+    is_in_stock: bool
+
+
+class BestSellerList(ORMModel):
+    best_sellers: List[BestSeller]
+
+
+class AdminProductItem(ORMModel):
+    """Produit de la liste d'administration (inactifs compris)."""
+    id: int
+    name: str
+    slug: Optional[str] = None
+    description: Optional[str] = None
+    short_description: Optional[str] = None
+    price: float
+    compare_at_price: Optional[float] = None
+    stock_quantity: Optional[int] = None
+    reserved_quantity: int = Field(0, description="Unités retenues par des paniers en cours")
+    main_image_url: Optional[str] = None
+    is_active: bool
+    is_featured: bool
+    category: Optional[CategoryRef] = None
+    sales_count: int = 0
+    view_count: int = 0
+    created_at: Optional[datetime] = None
+
+
+class AdminProductPage(PageInfo):
+    products: List[AdminProductItem]
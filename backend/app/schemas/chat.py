@@ -0,0 +1,40 @@
+"""
+Schémas Pydantic des listes de conversations (client et admin).
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from app.models.chat import ChatStatus
+from app.schemas.common import ORMModel, PageInfo
+
+
+class ConversationSummary(ORMModel):
+    """Conversation de la liste client."""
+    id: int
+    subject: Optional[str] = None
+    status: ChatStatus
+    last_message_at: Optional[datetime] = None
+    message_count: int = 0
+    created_at: Optional[datetime] = None
+
+
+class ConversationList(ORMModel):
+    conversations: List[ConversationSummary]
+
+
+class AdminConversationItem(ORMModel):
+    """Conversation de la liste d'administration."""
+    id: int
+    participant_name: Optional[str] = None
+    participant_email: Optional[str] = None
+    subject: Optional[str] = None
+    status: ChatStatus
+    last_message_at: Optional[datetime] = None
+    message_count: int = 0
+    rating: Optional[int] = None
+    admin_assigned: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class AdminConversationPage(PageInfo):
+    conversations: List[AdminConversationItem]
@@ -0,0 +1,19 @@
+"""
+Schémas Pydantic communs aux réponses de liste.
+"""
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+
+
+class ORMModel(BaseModel):
+    """Schéma de réponse construit depuis les attributs d'un modèle SQLAlchemy."""
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PageInfo(BaseModel):
+    """Informations de pagination (offset ou curseur)."""
+    total: Optional[int] = None
+    skip: int = 0
+    limit: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
@@ -0,0 +1,44 @@
+"""
+Schémas Pydantic des listes de commandes (client et admin).
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from app.models.order import OrderStatus, PaymentStatus
+from app.schemas.common import ORMModel, PageInfo
+
+
+class OrderSummary(ORMModel):
+    """Commande de l'historique client."""
+    id: int
+    order_number: str
+    status: OrderStatus
+    payment_status: PaymentStatus
+    total_amount: float
+    total_items: int
+    created_at: Optional[datetime] = None
+    confirmed_at: Optional[datetime] = None
+    shipped_at: Optional[datetime] = None
+    tracking_number: Optional[str] = None
+
+
+class OrderList(ORMModel):
+    orders: List[OrderSummary]
+
+
+class AdminOrderItem(ORMModel):
+    """Commande de la liste d'administration."""
+    id: int
+    order_number: str
+    user_email: Optional[str] = None
+    user_name: Optional[str] = None
+    status: OrderStatus
+    payment_status: PaymentStatus
+    total_amount: float
+    total_items: int
+    created_at: Optional[datetime] = None
+    shipping_city: Optional[str] = None
+
+
+class AdminOrderPage(PageInfo):
+    orders: List[AdminOrderItem]
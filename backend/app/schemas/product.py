@@ -0,0 +1,61 @@
+"""
+Schémas Pydantic pour les modifications de produits en masse.
+"""
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+
+
+class ProductPatch(BaseModel):
+    """Champs à écraser (seuls les champs fournis sont appliqués, null compris)."""
+    price: Optional[float] = Field(None, ge=0, description="Nouveau prix")
+    compare_at_price: Optional[float] = Field(None, ge=0, description="Prix barré (null pour le retirer)")
+    stock_quantity: Optional[int] = Field(None, ge=0, description="Nouveau stock")
+    track_inventory: Optional[bool] = None
+    allow_backorder: Optional[bool] = None
+    is_active: Optional[bool] = None
+    is_featured: Optional[bool] = None
+    category_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_nullable(self):
+        for field in self.model_fields_set - {"compare_at_price", "category_id"}:
+            if getattr(self, field) is None:
+                raise ValueError(f"{field} ne peut pas être null")
+        return self
+
+
+class ProductBulkOperation(BaseModel):
+    """Une modification appliquée à un ensemble de produits."""
+    product_ids: List[int] = Field(..., min_length=1, max_length=10000)
+    patch: ProductPatch = Field(default_factory=ProductPatch)
+    price_adjustment_percent: Optional[float] = Field(
+        None, gt=-100, le=1000,
+        description="Variation du prix en % (ex: -20 pour une remise de 20 %)"
+    )
+    keep_original_price: bool = Field(
+        default=False,
+        description="Conserver le prix avant variation comme prix barré (lancement de promo)"
+    )
+    stock_adjustment: Optional[int] = Field(
+        None, description="Variation du stock (le stock ne descend pas sous 0)"
+    )
+
+    @model_validator(mode="after")
+    def check_consistency(self):
+        patch_fields = self.patch.model_fields_set
+        if "price" in patch_fields and self.price_adjustment_percent is not None:
+            raise ValueError("price et price_adjustment_percent sont incompatibles")
+        if "stock_quantity" in patch_fields and self.stock_adjustment is not None:
+            raise ValueError("stock_quantity et stock_adjustment sont incompatibles")
+        if self.keep_original_price and self.price_adjustment_percent is None:
+            raise ValueError("keep_original_price nécessite price_adjustment_percent")
+        if self.keep_original_price and "compare_at_price" in patch_fields:
+            raise ValueError("compare_at_price et keep_original_price sont incompatibles")
+        if not patch_fields and self.price_adjustment_percent is None and self.stock_adjustment is None:
+            raise ValueError("Aucune modification demandée")
+        return self
+
+
+class ProductBulkUpdate(BaseModel):
+    """Lot de modifications appliqué dans une seule transaction."""
+    operations: List[ProductBulkOperation] = Field(..., min_length=1, max_length=100)
@@ -0,0 +1,101 @@
+"""
+Cache du catalogue public et synchronisation après les écritures admin
+Principe Single Responsibility: Point unique à appeler quand le catalogue change
+
+Tags utilisés:
+- "catalog": toute liste de produits (appartenance et ordre peuvent changer)
+- "categories": listes et fiches de catégories
+- "product:<id>": toute entrée qui contient ce produit
+- "hero": slides du hero de la page d'accueil
+- "leaderboards": listes lues dans les classements (meilleures ventes, mis en avant)
+"""
+
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TaggedCache
+from app.core.config import settings
+from app.models.product import Product
+from app.services.leaderboard_service import leaderboards
+from app.services.search_service import get_search_service
+from app.services.suggest_service import PRODUCT, SERVICE, suggest_index
+
+CATALOG = "catalog"
+CATEGORIES = "categories"
+HERO = "hero"
+LEADERBOARDS = "leaderboards"
+
+
+def product_tag(product_id: int) -> str:
+    """Tag d'invalidation d'un produit"""
+    return f"product:{product_id}"
+
+
+def product_tags(product_ids: Iterable[int]) -> list:
+    """Tags de tous les produits contenus dans une réponse"""
+    return [product_tag(product_id) for product_id in product_ids]
+
+
+# Instance partagée par le processus
+catalog_cache = TaggedCache(
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    max_bytes=settings.CATALOG_CACHE_MAX_BYTES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+
+
+# ----- Événements du catalogue (à appeler après commit) -----
+
+def product_saved(db: Session, product: Product, reindex: bool = True) -> None:
+    """Un produit a été créé ou modifié par un admin"""
+    if reindex:
+        get_search_service(db).index_product(product)
+    suggest_index.mark_dirty(PRODUCT, [product.id])
+    leaderboards.mark_dirty([product.id])
+    catalog_cache.invalidate(CATALOG, CATEGORIES, LEADERBOARDS, product_tag(product.id))
+
+
+def product_deleted(db: Session, product_id: int) -> None:
+    """Un produit a été supprimé définitivement"""
+    get_search_service(db).remove_product(product_id)
+    suggest_index.remove(PRODUCT, product_id)
+    leaderboards.mark_dirty([product_id])
+    catalog_cache.invalidate(CATALOG, CATEGORIES, LEADERBOARDS, product_tag(product_id))
+
+
+def products_changed(product_ids: Iterable[int], listings: bool = True) -> None:
+    """
+    Des produits ont changé sans modification de leur texte
+
+    listings=False se limite aux entrées qui contiennent ces produits
+    (ex: stock décrémenté par une commande) et aux classements, que
+    sales_count peut réordonner.
+    """
+    product_ids = list(product_ids)
+    suggest_index.mark_dirty(PRODUCT, product_ids)
+    leaderboards.mark_dirty(product_ids)
+    tags = product_tags(product_ids) + [LEADERBOARDS]
+    if listings:
+        tags += [CATALOG, CATEGORIES]
+    catalog_cache.invalidate(*tags)
+
+
+def categories_changed() -> None:
+    """Une catégorie a été créée, modifiée ou désactivée"""
+    catalog_cache.invalidate(CATALOG, CATEGORIES)
+
+
+def sales_recorded() -> None:
+    """Une commande payée a modifié les classements de ventes par période"""
+    catalog_cache.invalidate(LEADERBOARDS)
+
+
+def hero_changed() -> None:
+    """Un slide du hero a été créé, modifié ou supprimé"""
+    catalog_cache.invalidate(HERO)
+
+
+def service_changed(service_id: int) -> None:
+    """Un service a été créé, modifié ou désactivé"""
+    suggest_index.mark_dirty(SERVICE, [service_id])
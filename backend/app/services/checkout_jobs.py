@@ -0,0 +1,134 @@
+"""
+Tâches après commande - Facture, notifications et alertes de stock
+Principe Single Responsibility: Définit le travail fait après la validation d'une commande
+
+La requête de commande ne fait que sa transaction: enqueue_post_checkout y
+ajoute ces tâches, exécutées ensuite par job_worker (ou Celery):
+- invoice.create: facture client (numéro attribué pendant la commande);
+- order.email_customer: email de confirmation au client;
+- order.alert_admin: alerte Telegram à l'admin;
+- stock.check_low: alerte pour les produits passés sous LOW_STOCK_THRESHOLD.
+
+Chaque envoi est une tâche distincte: un nouvel essai Telegram ne renvoie
+pas l'email. invoice.create est idempotente (numéro de facture unique).
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.invoice import CustomerInvoice, InvoiceStatus
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.services.customer_service import is_placeholder_email
+from app.services.job_queue import enqueue, job
+from app.services.notification_service import get_notification_service
+
+
+def enqueue_post_checkout(
+    db: Session,
+    order: Order,
+    product_ids: Iterable[int],
+    invoice_number: Optional[str] = None,
+    payment_method: Optional[str] = None,
+    invoice_notes: Optional[str] = None
+) -> None:
+    """Ajouter les tâches après commande à la transaction de la commande (order doit avoir un id)"""
+    if invoice_number:
+        enqueue(db, "invoice.create", {
+            "order_id": order.id,
+            "invoice_number": invoice_number,
+            "payment_method": payment_method,
+            "notes": invoice_notes,
+        })
+    enqueue(db, "order.email_customer", {"order_id": order.id})
+    enqueue(db, "order.alert_admin", {"order_id": order.id})
+
+    product_ids = sorted({product_id for product_id in product_ids if product_id})
+    if product_ids:
+        enqueue(db, "stock.check_low", {"product_ids": product_ids})
+
+
+def _order_data(db: Session, order_id: int) -> Optional[dict]:
+    """Données de commande attendues par NotificationService"""
+    order = db.get(Order, order_id)
+    if order is None:
+        return None
+
+    items_count = (
+        db.query(func.coalesce(func.sum(OrderItem.quantity), 0))
+        .filter(OrderItem.order_id == order_id)
+        .scalar()
+    )
+    return {
+        "order_number": order.order_number,
+        "customer_email": None if is_placeholder_email(order.shipping_email) else order.shipping_email,
+        "customer_name": f"{order.shipping_first_name or ''} {order.shipping_last_name or ''}".strip(),
+        "total_amount": order.total_amount or 0,
+        "items_count": items_count,
+    }
+
+
+@job("invoice.create")
+def create_invoice(db: Session, payload: dict) -> None:
+    """Créer la facture client d'une commande (une seule fois par numéro)"""
+    exists = (
+        db.query(CustomerInvoice.id)
+        .filter(CustomerInvoice.invoice_number == payload["invoice_number"])
+        .first()
+    )
+    order = db.get(Order, payload["order_id"])
+    if exists or order is None:
+        return
+
+    db.add(CustomerInvoice(
+        invoice_number=payload["invoice_number"],
+        order_id=order.id,
+        user_id=order.user_id,
+        subtotal=order.subtotal,
+        tax_amount=order.tax_amount,
+        discount_amount=0,
+        total_amount=order.total_amount,
+        status=InvoiceStatus.DRAFT,
+        is_paid=False,
+        payment_method=payload.get("payment_method"),
+        invoice_date=order.created_at or datetime.utcnow(),
+        notes=payload.get("notes")
+    ))
+
+
+@job("order.email_customer")
+def email_customer(db: Session, payload: dict) -> None:
+    """Email de confirmation de commande"""
+    order_data = _order_data(db, payload["order_id"])
+    if order_data and not get_notification_service().send_order_confirmation(order_data):
+        raise RuntimeError("Envoi de l'email de confirmation refusé")
+
+
+@job("order.alert_admin")
+def alert_admin(db: Session, payload: dict) -> None:
+    """Alerte Telegram à l'admin pour une nouvelle commande"""
+    order_data = _order_data(db, payload["order_id"])
+    if order_data and not get_notification_service().send_admin_order_alert(order_data):
+        raise RuntimeError("Envoi de l'alerte Telegram refusé")
+
+
+@job("stock.check_low")
+def check_low_stock(db: Session, payload: dict) -> None:
+    """Alerter pour les produits suivis dont le stock disponible est faible"""
+    products = (
+        db.query(Product.name, Product.available_quantity.label("available"))
+        .filter(
+            Product.id.in_(payload["product_ids"]),
+            Product.track_inventory == True,
+            Product.available_quantity <= settings.LOW_STOCK_THRESHOLD
+        )
+        .all()
+    )
+    notifications = get_notification_service()
+    for product in products:
+        if not notifications.notify_low_stock({"name": product.name, "stock_quantity": product.available}):
+            raise RuntimeError(f"Envoi de l'alerte de stock faible refusé ({product.name})")
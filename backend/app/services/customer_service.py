@@ -0,0 +1,106 @@
+"""
+Service Clients - Clients invités du checkout WhatsApp
+Principe Single Responsibility: Retrouve ou crée le client d'une commande passée sans compte
+
+Un client invité est un User sans mot de passe utilisable (UNUSABLE_PASSWORD):
+sa création ne calcule aucun hash bcrypt, un premier checkout ne coûte donc
+pas plus de CPU qu'un checkout suivant. Il est retrouvé par email, ou par
+téléphone quand la commande n'a pas d'email (colonnes indexées), en une
+requête.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.security import UNUSABLE_PASSWORD
+from app.models.user import User
+
+# Client partagé des commandes sans email ni téléphone
+GUEST_EMAIL = "guest@stelleworld.com"
+GUEST_NAME = "Client WhatsApp"
+
+# Domaine des emails techniques des invités sans email (non distribuables)
+GUEST_EMAIL_DOMAIN = "guest.stelleworld.com"
+
+
+def guest_email_for_phone(phone: str) -> str:
+    """Email technique (unique) d'un invité connu par son seul téléphone"""
+    digits = re.sub(r"\D", "", phone)
+    return f"whatsapp-{digits}@{GUEST_EMAIL_DOMAIN}"
+
+
+def is_placeholder_email(email: Optional[str]) -> bool:
+    """Email technique d'invité, à qui aucun email ne doit être envoyé"""
+    return not email or email == GUEST_EMAIL or email.endswith("@" + GUEST_EMAIL_DOMAIN)
+
+
+class GuestCustomerService:
+    """
+    Service métier pour les clients invités
+
+    Responsabilités:
+    - Retrouver un client par email, ou par téléphone à défaut d'email
+    - Créer un client invité sans hash de mot de passe
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_or_create(self, customer_info: Optional[dict] = None) -> User:
+        """Client d'une commande WhatsApp: {"name": "...", "email": "...", "phone": "..."}"""
+        customer_info = customer_info or {}
+        email = (customer_info.get("email") or "").strip()
+        phone = (customer_info.get("phone") or "").strip()
+        name = (customer_info.get("name") or "").strip() or GUEST_NAME
+
+        if email:
+            user = self.db.query(User).filter(User.email == email).first()
+        elif re.search(r"\d", phone):
+            # Sans email: même téléphone (client déjà connu) ou invité créé pour ce numéro
+            email = guest_email_for_phone(phone)
+            user = self.find_by_phone(phone, email)
+        else:
+            email = GUEST_EMAIL
+            user = self.db.query(User).filter(User.email == email).first()
+        if user:
+            return user
+
+        parts = name.split()
+        user = User(
+            email=email,
+            first_name=parts[0],
+            last_name=parts[-1] if len(parts) > 1 else "WhatsApp",
+            phone=phone or None,
+            hashed_password=UNUSABLE_PASSWORD,
+            is_active=True,
+            country="Canada"
+        )
+        try:
+            # Point de sauvegarde: un checkout concurrent peut créer le même email
+            with self.db.begin_nested():
+                self.db.add(user)
+        except IntegrityError:
+            return self.db.query(User).filter(User.email == email).first()
+        return user
+
+    def find_by_phone(self, phone: str, guest_email: str) -> Optional[User]:
+        """Client par téléphone ou email d'invité (une requête, deux index)"""
+        users = (
+            self.db.query(User)
+            .filter(or_(User.phone == phone, User.email == guest_email))
+            .order_by(User.id)
+            .limit(2)
+            .all()
+        )
+        # Un compte existant avec ce téléphone prime sur l'invité technique
+        return next((user for user in users if user.email != guest_email), users[0] if users else None)
+
+
+# Factory function pour l'injection de dépendances
+def get_guest_customer_service(db: Session) -> GuestCustomerService:
+    """Factory pour créer une instance de GuestCustomerService"""
+    return GuestCustomerService(db)
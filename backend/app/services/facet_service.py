@@ -0,0 +1,177 @@
+"""
+Service Facettes - Compteurs de la barre latérale du catalogue
+Principe Single Responsibility: Calcule les facettes d'une liste de produits
+
+Toutes les facettes sont dérivées d'une seule requête groupée par
+(catégorie, tranche de prix, en stock, en promo, dans la fourchette de prix).
+Le résultat compte au plus quelques centaines de lignes, agrégées ensuite
+en Python. Chaque facette ignore son propre filtre (facettes disjonctives):
+la liste des catégories reste complète quand une catégorie est sélectionnée.
+"""
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Float, Integer, and_, case, cast, func, literal_column, or_, true
+from sqlalchemy.orm import Session
+
+from app.models.product import Category, Product
+from app.services.search_service import get_search_service
+
+
+class ProductFacetService:
+    """
+    Facettes du catalogue pour un ensemble de filtres
+
+    Usage:
+        facets = get_facet_service(db).compute(category_id=3, in_stock_only=True)
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def compute(
+        self,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+        search_mode: str = "fulltext",
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        featured_only: bool = False,
+        in_stock_only: bool = False,
+        on_promo: bool = False,
+        buckets: int = 10
+    ) -> Dict[str, Any]:
+        """Calculer catégories, disponibilité, promotions et histogramme de prix"""
+
+        # Filtres communs à toutes les facettes
+        base = self.db.query(Product).filter(Product.is_active == True)
+        if search:
+            base, _ = get_search_service(self.db).apply(base, search, search_mode)
+        if featured_only:
+            base = base.filter(Product.is_featured == True)
+
+        # Bornes de l'histogramme (sous-requête de la même instruction)
+        bounds = base.with_entities(
+            func.min(Product.price).label("lo"),
+            func.max(Product.price).label("hi")
+        ).subquery()
+
+        in_stock = case(
+            (or_(Product.track_inventory == False, Product.available_quantity > 0), 1),
+            else_=0
+        )
+        promo = case((Product.compare_at_price != None, 1), else_=0)
+        in_range = case(
+            (and_(
+                Product.price >= min_price if min_price is not None else true(),
+                Product.price <= max_price if max_price is not None else true()
+            ), 1),
+            else_=0
+        )
+        # floor() explicite: PostgreSQL arrondit un float casté en entier, SQLite tronque
+        bucket = case(
+            (bounds.c.hi == bounds.c.lo, 0),
+            else_=cast(
+                func.floor(
+                    cast(Product.price - bounds.c.lo, Float) * buckets
+                    / cast(bounds.c.hi - bounds.c.lo, Float)
+                ),
+                Integer
+            )
+        )
+
+        rows = (
+            base.join(bounds, true())
+            .outerjoin(Category, Category.id == Product.category_id)
+            .with_entities(
+                Product.category_id,
+                Category.name,
+                Category.slug,
+                bucket.label("bucket"),
+                in_stock.label("in_stock"),
+                promo.label("promo"),
+                in_range.label("in_range"),
+                bounds.c.lo,
+                bounds.c.hi,
+                func.count(Product.id).label("count")
+            )
+            # Regroupement par alias: PostgreSQL ne reconnaît pas une expression
+            # paramétrée répétée dans GROUP BY (paramètres distincts)
+            .group_by(
+                Product.category_id, Category.name, Category.slug,
+                literal_column("bucket"), literal_column("in_stock"),
+                literal_column("promo"), literal_column("in_range"),
+                bounds.c.lo, bounds.c.hi
+            )
+            .all()
+        )
+
+        return self._aggregate(rows, category_id, in_stock_only, on_promo, buckets)
+
+    # ----- Interne -----
+
+    @staticmethod
+    def _aggregate(rows, category_id, in_stock_only, on_promo, buckets) -> Dict[str, Any]:
+        lo = rows[0].lo if rows else None
+        hi = rows[0].hi if rows else None
+
+        total = 0
+        categories: Dict[int, Dict[str, Any]] = {}
+        stock_counts = {"in_stock": 0, "out_of_stock": 0}
+        promo_count = 0
+        histogram = [0] * buckets
+
+        for row in rows:
+            match_category = category_id is None or row.category_id == category_id
+            match_stock = not in_stock_only or row.in_stock
+            match_promo = not on_promo or row.promo
+            match_price = bool(row.in_range)
+
+            if match_category and match_stock and match_promo and match_price:
+                total += row.count
+
+            if match_stock and match_promo and match_price and row.category_id is not None:
+                entry = categories.setdefault(row.category_id, {
+                    "id": row.category_id,
+                    "name": row.name,
+                    "slug": row.slug,
+                    "count": 0
+                })
+                entry["count"] += row.count
+
+            if match_category and match_promo and match_price:
+                stock_counts["in_stock" if row.in_stock else "out_of_stock"] += row.count
+
+            if match_category and match_stock and match_price and row.promo:
+                promo_count += row.count
+
+            if match_category and match_stock and match_promo:
+                histogram[min(row.bucket, buckets - 1)] += row.count
+
+        width = (hi - lo) / buckets if rows and hi > lo else 0
+
+        return {
+            "total": total,
+            "categories": sorted(categories.values(), key=lambda c: (-c["count"], c["name"] or "")),
+            "availability": stock_counts,
+            "on_promo": promo_count,
+            "price": {
+                "min": lo,
+                "max": hi,
+                "histogram": [
+                    {
+                        "min": round(lo + i * width, 2),
+                        "max": round(lo + (i + 1) * width, 2) if width else hi,
+                        "count": count
+                    }
+                    for i, count in enumerate(histogram)
+                    if width or i == 0
+                ] if rows else []
+            }
+        }
+
+
+# Factory function pour l'injection de dépendances
+def get_facet_service(db: Session) -> ProductFacetService:
+    """Factory pour créer une instance de ProductFacetService"""
+    return ProductFacetService(db)
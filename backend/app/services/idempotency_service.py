@@ -0,0 +1,321 @@
+"""
+Service Idempotence - Rejeu des créations de commande répétées
+Principe Single Responsibility: Exécute une seule fois une requête portant un en-tête Idempotency-Key
+
+Les clients mobiles répètent POST /api/orders/ et /whatsapp sur un réseau
+instable. Chaque clé est enregistrée, par portée, dans idempotency_keys:
+1. la première requête insère la ligne "en cours": la contrainte
+   d'unicité (scope, key) désigne un seul gagnant, sur tous les workers.
+   Le traitement écrit sa réponse sur cette ligne dans sa propre
+   transaction (IdempotencyClaim.record avant db.commit()): commande et
+   réponse sont validées ensemble, ou pas du tout;
+2. une répétition rejoue la réponse enregistrée (en-tête
+   Idempotent-Replayed), sans requête SQL si elle est dans le cache LRU
+   du processus;
+3. une répétition concurrente attend la fin de la première (sondage de la
+   ligne) au lieu de la doubler, puis rejoue sa réponse.
+
+Une clé réutilisée avec un autre corps de requête est refusée (422). Une
+requête en échec avant sa validation libère sa clé: sa transaction est
+annulée, le client peut réessayer. Après la validation, la réponse est
+enregistrée: une erreur ultérieure ou un arrêt du worker ne permet plus de
+rejouer le traitement. Les accès à la base (clé et traitement) sont faits
+dans le pool de threads, hors de la boucle d'événements. Les clés expirent après IDEMPOTENCY_TTL_SECONDS et sont purgées
+périodiquement.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+from fastapi import Response
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TaggedCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.responses import render_json
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# En-tête ajouté aux réponses rejouées
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyError(ValueError):
+    """Clé d'idempotence inutilisable (autre corps de requête, traitement trop long)"""
+
+    def __init__(self, message: str, status_code: int = 409):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Empreinte SHA-256 du corps de requête (clés triées: indépendante de leur ordre)"""
+    body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.sha256(body).hexdigest()
+
+
+class IdempotencyClaim:
+    """Clé détenue par la requête en cours, passée au traitement"""
+
+    def __init__(self, scope: str, key: str, fingerprint: str):
+        self.scope = scope
+        self.key = key
+        self.fingerprint = fingerprint
+        self.stored: Optional[Dict[str, Any]] = None
+
+    def record(self, db: Session, result: Any) -> None:
+        """
+        Enregistrer la réponse dans la transaction du traitement (avant son commit)
+
+        Lève IdempotencyError si la clé n'est plus détenue (reprise par une
+        autre requête après locked_until): le traitement doit alors être annulé.
+        """
+        stored = {"fingerprint": self.fingerprint, "status_code": 200, "body": render_json(result).decode()}
+        updated = db.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == self.scope,
+            IdempotencyKey.key == self.key,
+            IdempotencyKey.fingerprint == self.fingerprint,
+            IdempotencyKey.status_code.is_(None)
+        ).update(
+            {IdempotencyKey.status_code: stored["status_code"], IdempotencyKey.response_body: stored["body"]},
+            synchronize_session=False
+        )
+        if not updated:
+            raise IdempotencyError("Une requête avec cette Idempotency-Key a déjà été traitée")
+        self.stored = stored
+
+
+class IdempotencyStore:
+    """
+    Clés d'idempotence: table idempotency_keys + cache LRU des réponses
+
+    Usage:
+        def create_order(claim):
+            ...
+            if claim is not None:
+                claim.record(db, response)
+            db.commit()
+            return response
+
+        result = await idempotency_store.execute("orders:whatsapp", idempotency_key, payload, create_order)
+
+    execute retourne le résultat de handler(claim) pour la première requête
+    (claim vaut None sans en-tête), une Response JSON (réponse enregistrée)
+    pour ses répétitions. handler est exécuté dans le pool de threads.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86400,
+        lock_seconds: float = 60,
+        wait_seconds: float = 30,
+        max_entries: int = 1000,
+        sweep_interval: float = 600
+    ):
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.sweep_interval = sweep_interval
+        # Réponses terminées uniquement: une entrée ne change plus jamais
+        self._responses = TaggedCache(max_entries=max_entries, ttl=ttl)
+        self._task: Optional[asyncio.Task] = None
+
+    # ----- Exécution -----
+
+    async def execute(
+        self,
+        scope: str,
+        key: Optional[str],
+        payload: Any,
+        handler: Callable[[Optional[IdempotencyClaim]], Any]
+    ) -> Any:
+        """Exécuter handler(claim) une seule fois par (scope, key); sans clé, l'exécuter directement"""
+        if not key:
+            return await asyncio.to_thread(handler, None)
+
+        fingerprint = request_fingerprint(payload)
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.05
+        while True:
+            stored = self._responses.get((scope, key)) or await asyncio.to_thread(self._claim, scope, key, fingerprint)
+            if stored is None:
+                break
+            if stored["fingerprint"] != fingerprint:
+                raise IdempotencyError(
+                    "Idempotency-Key déjà utilisée pour une autre requête",
+                    status_code=422
+                )
+            if stored["status_code"] is not None:
+                return self._replay(stored)
+
+            # Même requête en cours de traitement (ce worker ou un autre): attendre sa réponse
+            if time.monotonic() >= deadline:
+                raise IdempotencyError("Une requête avec cette Idempotency-Key est toujours en cours")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+        claim = IdempotencyClaim(scope, key, fingerprint)
+        try:
+            result = await asyncio.to_thread(handler, claim)
+        except BaseException:
+            # Sans effet si la réponse a été validée avec la commande (status_code renseigné)
+            await asyncio.to_thread(self._release, scope, key)
+            raise
+
+        if claim.stored is not None:
+            self._responses.set((scope, key), claim.stored)
+        return result
+
+    # ----- Interne -----
+
+    def _claim(self, scope: str, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Prendre la clé (None) ou retourner son état enregistré
+
+        La ligne est validée dans sa propre transaction, indépendante de
+        celle de la requête: les autres workers la voient immédiatement.
+        """
+        db = SessionLocal()
+        try:
+            for _ in range(3):
+                now = datetime.utcnow()
+                db.add(IdempotencyKey(
+                    scope=scope,
+                    key=key,
+                    fingerprint=fingerprint,
+                    locked_until=now + timedelta(seconds=self.lock_seconds),
+                    expires_at=now + timedelta(seconds=self.ttl)
+                ))
+                try:
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+
+                row = (
+                    db.query(IdempotencyKey)
+                    .filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                    .first()
+                )
+                if row is None:
+                    continue  # Purgée entre-temps
+
+                if row.expires_at <= now:
+                    # Expirée mais pas encore purgée: la clé est de nouveau libre
+                    db.query(IdempotencyKey).filter(
+                        IdempotencyKey.id == row.id,
+                        IdempotencyKey.expires_at <= now
+                    ).delete(synchronize_session=False)
+                    db.commit()
+                    continue
+
+                if row.status_code is None and row.locked_until <= now and row.fingerprint == fingerprint:
+                    # Traitement abandonné avant sa validation (worker arrêté): le reprendre
+                    taken = db.query(IdempotencyKey).filter(
+                        IdempotencyKey.id == row.id,
+                        IdempotencyKey.status_code.is_(None),
+                        IdempotencyKey.locked_until <= now
+                    ).update(
+                        {IdempotencyKey.locked_until: now + timedelta(seconds=self.lock_seconds)},
+                        synchronize_session=False
+                    )
+                    db.commit()
+                    if taken:
+                        return None
+                    continue
+
+                stored = {
+                    "fingerprint": row.fingerprint,
+                    "status_code": row.status_code,
+                    "body": row.response_body,
+                }
+                if row.status_code is not None:
+                    self._responses.set((scope, key), stored, ttl=(row.expires_at - now).total_seconds())
+                return stored
+
+            # Clé disputée à chaque tentative: la considérer en cours
+            return {"fingerprint": fingerprint, "status_code": None, "body": None}
+        finally:
+            db.close()
+
+    def _release(self, scope: str, key: str) -> None:
+        """Libérer la clé d'une requête en échec avant sa validation (le client peut réessayer)"""
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None)
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Échec de la libération de la clé d'idempotence {key}: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _replay(stored: Dict[str, Any]) -> Response:
+        return Response(
+            content=stored["body"],
+            status_code=stored["status_code"],
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"}
+        )
+
+    # ----- Purge des clés expirées -----
+
+    def sweep(self) -> int:
+        """Supprimer les clés expirées; retourne le nombre de lignes supprimées"""
+        db = SessionLocal()
+        try:
+            deleted = db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())
+            ).rowcount
+            db.commit()
+            return deleted
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Échec de la purge des clés d'idempotence: {e}")
+            return 0
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        """Boucle de purge périodique"""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await asyncio.to_thread(self.sweep)
+
+    def start(self) -> None:
+        """Démarrer la boucle (au démarrage de l'application)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instance partagée par le processus
+idempotency_store = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    max_entries=settings.IDEMPOTENCY_CACHE_MAX_ENTRIES,
+    sweep_interval=settings.IDEMPOTENCY_SWEEP_SECONDS
+)
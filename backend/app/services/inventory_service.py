@@ -0,0 +1,396 @@
+"""
+Service Stock - Réservation du stock des paniers et des commandes
+Principe Single Responsibility: Vérifie, retient et décrémente le stock d'un panier
+
+Le panier entier est traité en quelques requêtes, quel que soit son
+nombre de lignes:
+1. SELECT ... WHERE id IN (...) ORDER BY id FOR UPDATE: les produits sont
+   verrouillés dans l'ordre des id, deux paniers qui partagent des
+   produits ne peuvent donc pas s'interbloquer;
+2. un seul UPDATE conditionnel (stock disponible >= quantité demandée)
+   dont le nombre de lignes modifiées confirme la réservation.
+
+Le stock ne peut ni devenir négatif ni être vendu deux fois, y compris sur
+une base sans FOR UPDATE (SQLite): la condition de l'UPDATE suffit.
+
+Réservations temporaires (StockHold): un panier peut retenir du stock
+pendant une durée limitée (checkout WhatsApp) sans créer de commande.
+Les unités retenues sont comptées dans Product.reserved_quantity, le
+stock disponible (stock_quantity - reserved_quantity) se lit donc sans
+agrégation. Une réservation est confirmée par la commande (token passé à
+reserve) ou libérée à expiration par hold_sweeper, ou à la demande quand
+un panier manque de stock.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.product import Product
+from app.models.stock import StockHold
+from app.services.catalog_cache import products_changed
+
+logger = logging.getLogger(__name__)
+
+
+class StockError(ValueError):
+    """Panier impossible à réserver (produit introuvable, inactif ou stock insuffisant)"""
+
+    def __init__(self, message: str, product_id: int = None, status_code: int = 400):
+        super().__init__(message)
+        self.product_id = product_id
+        self.status_code = status_code
+
+
+def cart_quantities(items: Iterable[dict], key: str = "product_id") -> Dict[int, int]:
+    """Quantité totale par produit (un produit peut figurer sur plusieurs lignes)"""
+    quantities: Dict[int, int] = {}
+    for item in items:
+        product_id = item.get(key)
+        if product_id is None:
+            continue
+        quantities[product_id] = quantities.get(product_id, 0) + item.get("quantity", 1)
+    return quantities
+
+
+def _limited(product: Product) -> bool:
+    """Stock suivi et sans précommande: la quantité disponible fait foi"""
+    return bool(product.track_inventory) and not product.allow_backorder
+
+
+class InventoryService:
+    """Verrouillage, vérification, réservation temporaire et décrément du stock"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock_products(self, product_ids: Iterable[int]) -> Dict[int, Product]:
+        """Charger et verrouiller les produits, dans l'ordre des id (une requête)"""
+        ids = sorted(set(product_ids))
+        if not ids:
+            return {}
+        products = (
+            self.db.query(Product)
+            .filter(Product.id.in_(ids))
+            .order_by(Product.id)
+            .with_for_update()
+            .all()
+        )
+        return {product.id: product for product in products}
+
+    # ----- Commandes -----
+
+    def reserve(
+        self,
+        quantities: Dict[int, int],
+        count_sales: bool = True,
+        require_active: bool = True,
+        skip_missing: bool = False,
+        hold_token: Optional[str] = None
+    ) -> Dict[int, Product]:
+        """
+        Réserver le stock d'un panier dans la transaction en cours
+
+        Retourne les produits verrouillés (prix, nom...). Lève StockError sans
+        rien modifier si un produit manque, est inactif ou n'a pas assez de
+        stock; l'appelant annule alors la transaction.
+
+        skip_missing: ignorer les produits inconnus au lieu de refuser le panier.
+        hold_token: réservation temporaire convertie en commande; ses unités
+        redeviennent disponibles pour ce panier avant la vérification.
+        """
+        self._check_quantities(quantities)
+
+        released = self._take_hold(hold_token) if hold_token else {}
+        products = self.lock_products(set(quantities) | set(released))
+        if released:
+            self._release(released)
+
+        found = {}
+        for product_id in sorted(quantities):
+            product = products.get(product_id)
+            if product is None or (require_active and not product.is_active):
+                if product is None and skip_missing:
+                    continue
+                raise StockError(f"Produit {product_id} non trouvé", product_id, status_code=404)
+            found[product_id] = quantities[product_id]
+
+        self._ensure_available(products, found, released)
+
+        if found:
+            self._decrement(found, count_sales)
+        # Valeurs calculées par la base: relues au prochain accès
+        for product in products.values():
+            self.db.expire(product, ["stock_quantity", "reserved_quantity", "sales_count"])
+        return products
+
+    def _decrement(self, quantities: Dict[int, int], count_sales: bool) -> None:
+        """UPDATE conditionnel unique pour toutes les lignes du panier"""
+        quantity = case(quantities, value=Product.id)
+        values = {
+            # Précommande (allow_backorder): le stock s'arrête à zéro
+            Product.stock_quantity: case(
+                (Product.track_inventory == False, Product.stock_quantity),
+                (Product.stock_quantity >= quantity, Product.stock_quantity - quantity),
+                else_=0
+            )
+        }
+        if count_sales:
+            values[Product.sales_count] = Product.sales_count + quantity
+
+        result = self.db.execute(
+            update(Product)
+            .where(
+                Product.id.in_(list(quantities)),
+                or_(
+                    Product.track_inventory == False,
+                    Product.allow_backorder == True,
+                    Product.available_quantity >= quantity
+                )
+            )
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(quantities):
+            # Stock pris entre la lecture et l'écriture (base sans verrou de ligne)
+            raise StockError("Stock insuffisant: le panier a été modifié, veuillez réessayer", status_code=409)
+
+    # ----- Réservations temporaires -----
+
+    def create_hold(
+        self,
+        quantities: Dict[int, int],
+        ttl_seconds: int = settings.STOCK_HOLD_TTL_SECONDS
+    ) -> Tuple[str, datetime, Dict[int, int]]:
+        """
+        Retenir le stock d'un panier pendant ttl_seconds
+
+        Seuls les produits à stock limité sont retenus (les autres sont
+        toujours disponibles). Retourne (token, expiration, quantités
+        retenues). Lève StockError comme reserve().
+        """
+        self._check_quantities(quantities)
+        products = self.lock_products(quantities)
+        for product_id in sorted(quantities):
+            product = products.get(product_id)
+            if product is None or not product.is_active:
+                raise StockError(f"Produit {product_id} non trouvé", product_id, status_code=404)
+
+        held = {
+            product_id: quantity for product_id, quantity in quantities.items()
+            if _limited(products[product_id])
+        }
+        self._ensure_available(products, held)
+
+        token = str(uuid.uuid4())
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        if held:
+            quantity = case(held, value=Product.id)
+            result = self.db.execute(
+                update(Product)
+                .where(Product.id.in_(list(held)), Product.available_quantity >= quantity)
+                .values({Product.reserved_quantity: Product.reserved_quantity + quantity})
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(held):
+                raise StockError("Stock insuffisant: le panier a été modifié, veuillez réessayer", status_code=409)
+            self.db.add_all([
+                StockHold(token=token, product_id=product_id, quantity=quantity, expires_at=expires_at)
+                for product_id, quantity in held.items()
+            ])
+        for product in products.values():
+            self.db.expire(product, ["reserved_quantity"])
+        return token, expires_at, held
+
+    def get_hold(self, token: str) -> Dict[int, Tuple[int, datetime]]:
+        """Lignes d'une réservation: produit -> (quantité, expiration)"""
+        rows = self.db.query(StockHold.product_id, StockHold.quantity, StockHold.expires_at).filter(
+            StockHold.token == token
+        )
+        return {product_id: (quantity, expires_at) for product_id, quantity, expires_at in rows}
+
+    def release_hold(self, token: str) -> Dict[int, int]:
+        """Libérer une réservation (panier abandonné); retourne les quantités rendues"""
+        released = self._take_hold(token)
+        if released:
+            self.lock_products(released)
+            self._release(released)
+        return released
+
+    def release_expired(self, product_ids: Optional[Iterable[int]] = None, limit: int = 1000) -> Dict[int, int]:
+        """
+        Libérer les réservations expirées (toutes ou celles de certains produits)
+
+        Les lignes verrouillées par une autre transaction sont ignorées
+        (SKIP LOCKED): elles sont déjà en cours de libération.
+        """
+        query = self.db.query(StockHold.id, StockHold.product_id, StockHold.quantity).filter(
+            StockHold.expires_at <= datetime.utcnow()
+        )
+        if product_ids is not None:
+            query = query.filter(StockHold.product_id.in_(list(product_ids)))
+        rows = query.order_by(StockHold.expires_at).limit(limit).with_for_update(skip_locked=True).all()
+        if not rows:
+            return {}
+
+        released: Dict[int, int] = {}
+        for _, product_id, quantity in rows:
+            released[product_id] = released.get(product_id, 0) + quantity
+        self.db.execute(
+            delete(StockHold)
+            .where(StockHold.id.in_([row.id for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        self._release(released)
+        return released
+
+    def _take_hold(self, token: str) -> Dict[int, int]:
+        """Supprimer les lignes d'une réservation (expirées comprises) et retourner leurs quantités"""
+        rows = (
+            self.db.query(StockHold.id, StockHold.product_id, StockHold.quantity)
+            .filter(StockHold.token == token)
+            .with_for_update()
+            .all()
+        )
+        if not rows:
+            return {}
+        self.db.execute(
+            delete(StockHold)
+            .where(StockHold.id.in_([row.id for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        released: Dict[int, int] = {}
+        for _, product_id, quantity in rows:
+            released[product_id] = released.get(product_id, 0) + quantity
+        return released
+
+    def _release(self, quantities: Dict[int, int]) -> None:
+        """Rendre des unités réservées au stock disponible (produits déjà verrouillés)"""
+        quantity = case(quantities, value=Product.id)
+        self.db.execute(
+            update(Product)
+            .where(Product.id.in_(list(quantities)))
+            .values({
+                Product.reserved_quantity: case(
+                    (Product.reserved_quantity >= quantity, Product.reserved_quantity - quantity),
+                    else_=0
+                )
+            })
+            .execution_options(synchronize_session=False)
+        )
+
+    # ----- Vérifications -----
+
+    @staticmethod
+    def _check_quantities(quantities: Dict[int, int]) -> None:
+        for product_id, quantity in quantities.items():
+            if quantity <= 0:
+                raise StockError(f"Quantité invalide pour le produit {product_id}", product_id)
+
+    def _ensure_available(
+        self,
+        products: Dict[int, Product],
+        quantities: Dict[int, int],
+        released: Optional[Dict[int, int]] = None
+    ) -> None:
+        """
+        Vérifier le stock disponible des produits verrouillés
+
+        released: unités rendues dans cette transaction, pas encore visibles
+        sur les objets chargés. En cas de manque, les réservations expirées
+        de ces produits sont libérées avant de conclure.
+        """
+        pending = dict(released or {})
+
+        def shortages() -> list:
+            return [
+                product_id for product_id in sorted(quantities)
+                if _limited(products[product_id])
+                and products[product_id].available_quantity + pending.get(product_id, 0) < quantities[product_id]
+            ]
+
+        missing = shortages()
+        if missing and self.release_expired(missing):
+            for product_id in missing:
+                # Relu depuis la base: les unités rendues y sont déjà comptées
+                self.db.refresh(products[product_id], ["stock_quantity", "reserved_quantity"])
+                pending.pop(product_id, None)
+            missing = shortages()
+        if missing:
+            product = products[missing[0]]
+            raise StockError(f"Stock insuffisant pour {product.name}", product.id)
+
+
+class StockHoldSweeper:
+    """
+    Libération périodique des réservations expirées
+
+    Usage:
+        hold_sweeper.start()    # au démarrage
+        await hold_sweeper.stop()
+    """
+
+    def __init__(self, interval: float = 30.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def sweep(self) -> int:
+        """Libérer les réservations expirées; retourne le nombre de produits concernés"""
+        db = SessionLocal()
+        try:
+            service = InventoryService(db)
+            released = {}
+            # Verrouillage des produits dans l'ordre des id avant leur mise à jour
+            expired = db.query(StockHold.product_id).filter(StockHold.expires_at <= datetime.utcnow()).distinct()
+            product_ids = [row.product_id for row in expired]
+            if product_ids:
+                service.lock_products(product_ids)
+                released = service.release_expired(product_ids)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Échec de la libération des réservations expirées: {e}")
+            return 0
+        finally:
+            db.close()
+
+        if released:
+            products_changed(released, listings=False)
+        return len(released)
+
+    async def run(self) -> None:
+        """Boucle de libération périodique"""
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.sweep)
+
+    def start(self) -> None:
+        """Démarrer la boucle (au démarrage de l'application)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instance partagée par le processus
+hold_sweeper = StockHoldSweeper(interval=settings.STOCK_HOLD_SWEEP_SECONDS)
+
+
+# Factory function pour l'injection de dépendances
+def get_inventory_service(db: Session) -> InventoryService:
+    """Factory pour créer une instance de InventoryService"""
+    return InventoryService(db)
@@ -0,0 +1,378 @@
+"""
+Service Tâches - File de tâches durables en arrière-plan
+Principe Single Responsibility: Planifie, exécute et réessaie les tâches enregistrées en base
+
+Une tâche est une ligne de background_jobs écrite dans la transaction qui
+la déclenche (enqueue): elle est validée avec la commande, ou annulée avec
+elle. La requête ne fait rien de plus, le travail est fait ensuite par:
+- le worker de l'application (job_worker, par défaut): il prend les tâches
+  dues (FOR UPDATE SKIP LOCKED, plusieurs workers ne prennent jamais la
+  même) et les exécute dans un thread;
+- ou Celery (JOBS_BACKEND=celery, voir app/worker.py): job_worker prend
+  les tâches de la même façon et les envoie au broker déjà configuré.
+
+Une tâche est exécutée avec sa propre session: ses écritures et son statut
+SUCCEEDED sont validés ensemble. En cas d'échec, elle est replanifiée avec
+un délai exponentiel (JOBS_RETRY_BASE_SECONDS, 2x, 4x...) jusqu'à
+max_attempts, puis passe en FAILED (visible dans /api/admin/jobs, relançable).
+Une tâche prise par un worker arrêté est reprise après JOBS_LOCK_SECONDS.
+Les tâches réussies sont supprimées après JOBS_RETENTION_DAYS jours.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import BackgroundJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Tâches connues: nom -> fonction(db, payload)
+JOB_HANDLERS: Dict[str, Callable[[Session, dict], None]] = {}
+
+
+def job(name: str) -> Callable:
+    """
+    Enregistrer une fonction comme tâche
+
+    La fonction reçoit la session de la tâche et son payload. Elle ne valide
+    pas la transaction elle-même; une exception déclenche un nouvel essai.
+    """
+    def register(handler: Callable[[Session, dict], None]) -> Callable[[Session, dict], None]:
+        JOB_HANDLERS[name] = handler
+        return handler
+    return register
+
+
+def enqueue(
+    db: Session,
+    name: str,
+    payload: Dict[str, Any],
+    delay_seconds: float = 0,
+    max_attempts: Optional[int] = None
+) -> BackgroundJob:
+    """Ajouter une tâche à la transaction en cours (exécutée après sa validation)"""
+    background_job = BackgroundJob(
+        name=name,
+        payload=json.dumps(payload),
+        status=JobStatus.PENDING,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        run_at=datetime.utcnow() + timedelta(seconds=delay_seconds)
+    )
+    db.add(background_job)
+    return background_job
+
+
+def retry_delay(attempts: int) -> float:
+    """Délai avant le prochain essai: exponentiel, plafonné, avec 10% d'aléa"""
+    delay = min(settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOBS_RETRY_MAX_SECONDS)
+    return delay * (1 + random.random() / 10)
+
+
+def execute_job(job_id: int) -> bool:
+    """Exécuter une tâche prise par un worker; retourne True si elle a réussi"""
+    db = SessionLocal()
+    try:
+        background_job = db.get(BackgroundJob, job_id)
+        if background_job is None or background_job.status != JobStatus.RUNNING:
+            return False
+        name = background_job.name
+
+        try:
+            handler = JOB_HANDLERS.get(name)
+            if handler is None:
+                raise LookupError(f"Tâche inconnue: {name}")
+            handler(db, json.loads(background_job.payload))
+
+            background_job.status = JobStatus.SUCCEEDED
+            background_job.last_error = None
+            background_job.locked_until = None
+            background_job.finished_at = datetime.utcnow()
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            background_job = db.get(BackgroundJob, job_id)
+            now = datetime.utcnow()
+            background_job.last_error = f"{type(e).__name__}: {e}"[:2000]
+            background_job.locked_until = None
+            if background_job.attempts >= background_job.max_attempts:
+                background_job.status = JobStatus.FAILED
+                background_job.finished_at = now
+                logger.error(f"Tâche {name} #{job_id} abandonnée après {background_job.attempts} essais: {e}")
+            else:
+                background_job.status = JobStatus.PENDING
+                background_job.run_at = now + timedelta(seconds=retry_delay(background_job.attempts))
+                logger.warning(f"Tâche {name} #{job_id} en échec (essai {background_job.attempts}): {e}")
+            db.commit()
+            return False
+    finally:
+        db.close()
+
+
+class JobQueueService:
+    """
+    Consultation et administration de la file de tâches
+
+    Responsabilités:
+    - Prendre les tâches dues pour un worker
+    - Statistiques et liste des tâches (observabilité)
+    - Relancer une tâche en échec
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim(self, limit: int, lock_seconds: float) -> List[int]:
+        """Prendre jusqu'à limit tâches dues (ou abandonnées par un worker arrêté)"""
+        now = datetime.utcnow()
+        due = (
+            self.db.query(BackgroundJob.id)
+            .filter(or_(
+                and_(BackgroundJob.status == JobStatus.PENDING, BackgroundJob.run_at <= now),
+                and_(BackgroundJob.status == JobStatus.RUNNING, BackgroundJob.locked_until <= now)
+            ))
+            .order_by(BackgroundJob.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        job_ids = [row.id for row in due]
+        if job_ids:
+            self.db.query(BackgroundJob).filter(BackgroundJob.id.in_(job_ids)).update(
+                {
+                    BackgroundJob.status: JobStatus.RUNNING,
+                    BackgroundJob.locked_until: now + timedelta(seconds=lock_seconds),
+                    BackgroundJob.attempts: BackgroundJob.attempts + 1,
+                },
+                synchronize_session=False
+            )
+        self.db.commit()
+        return job_ids
+
+    def stats(self) -> Dict[str, Any]:
+        """Nombre de tâches par statut et par nom, retard de la plus ancienne tâche due"""
+        now = datetime.utcnow()
+        by_status: Dict[str, int] = {status.value: 0 for status in JobStatus}
+        by_name: Dict[str, Dict[str, int]] = {}
+        rows = (
+            self.db.query(BackgroundJob.name, BackgroundJob.status, func.count(BackgroundJob.id))
+            .group_by(BackgroundJob.name, BackgroundJob.status)
+            .all()
+        )
+        for name, status, count in rows:
+            by_status[status.value] += count
+            by_name.setdefault(name, {})[status.value] = count
+
+        oldest_due = (
+            self.db.query(func.min(BackgroundJob.run_at))
+            .filter(BackgroundJob.status == JobStatus.PENDING, BackgroundJob.run_at <= now)
+            .scalar()
+        )
+        return {
+            "by_status": by_status,
+            "by_name": by_name,
+            "oldest_due_seconds": round((now - oldest_due).total_seconds(), 1) if oldest_due else 0,
+            "backend": settings.JOBS_BACKEND,
+        }
+
+    def list_jobs(
+        self,
+        status: Optional[JobStatus] = None,
+        name: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Dernières tâches (les plus récentes d'abord)"""
+        query = self.db.query(BackgroundJob)
+        if status:
+            query = query.filter(BackgroundJob.status == status)
+        if name:
+            query = query.filter(BackgroundJob.name == name)
+        return [
+            {
+                "id": background_job.id,
+                "name": background_job.name,
+                "payload": json.loads(background_job.payload),
+                "status": background_job.status,
+                "attempts": background_job.attempts,
+                "max_attempts": background_job.max_attempts,
+                "last_error": background_job.last_error,
+                "run_at": background_job.run_at,
+                "created_at": background_job.created_at,
+                "finished_at": background_job.finished_at,
+            }
+            for background_job in query.order_by(BackgroundJob.id.desc()).limit(limit)
+        ]
+
+    def purge(self, retention_days: int) -> int:
+        """Supprimer les tâches réussies depuis plus de retention_days jours"""
+        deleted = self.db.query(BackgroundJob).filter(
+            BackgroundJob.status == JobStatus.SUCCEEDED,
+            BackgroundJob.finished_at < datetime.utcnow() - timedelta(days=retention_days)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+    def retry(self, job_id: int) -> bool:
+        """Relancer immédiatement une tâche en échec (avec un nouveau quota d'essais)"""
+        updated = self.db.query(BackgroundJob).filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == JobStatus.FAILED
+        ).update(
+            {
+                BackgroundJob.status: JobStatus.PENDING,
+                BackgroundJob.attempts: 0,
+                BackgroundJob.run_at: datetime.utcnow(),
+                BackgroundJob.finished_at: None,
+            },
+            synchronize_session=False
+        )
+        self.db.commit()
+        return bool(updated)
+
+
+class JobWorker:
+    """
+    Boucle de prise et d'exécution des tâches dues
+
+    Usage:
+        job_worker.start()    # au démarrage
+        job_worker.wake()     # après la validation d'une transaction qui a ajouté des tâches
+        await job_worker.stop()
+    """
+
+    def __init__(
+        self,
+        interval: float = 5.0,
+        batch_size: int = 20,
+        lock_seconds: float = 300,
+        backend: str = "local",
+        retention_days: int = 7
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lock_seconds = lock_seconds
+        self.backend = backend
+        self.retention_days = retention_days
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def claim(self) -> List[int]:
+        """Prendre un lot de tâches dues"""
+        db = SessionLocal()
+        try:
+            return JobQueueService(db).claim(self.batch_size, self.lock_seconds)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Échec de la prise des tâches en attente: {e}")
+            return []
+        finally:
+            db.close()
+
+    def purge(self) -> int:
+        """Supprimer les anciennes tâches réussies (les échecs restent consultables)"""
+        db = SessionLocal()
+        try:
+            return JobQueueService(db).purge(self.retention_days)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Échec de la purge des tâches terminées: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def run_pending(self) -> int:
+        """Prendre et exécuter (ou envoyer à Celery) les tâches dues; retourne leur nombre"""
+        total = 0
+        while True:
+            job_ids = self.claim()
+            if not job_ids:
+                return total
+            total += len(job_ids)
+            if self.backend == "celery":
+                job_ids = self._dispatch(job_ids)
+            for job_id in job_ids:
+                execute_job(job_id)
+
+    def _dispatch(self, job_ids: List[int]) -> List[int]:
+        """Envoyer les tâches au worker Celery; retourne celles à exécuter localement (non envoyées)"""
+        try:
+            from app.worker import celery_app
+        except ImportError:
+            logger.error("JOBS_BACKEND=celery mais le module celery n'est pas installé: exécution locale")
+            return job_ids
+        for index, job_id in enumerate(job_ids):
+            try:
+                celery_app.send_task("stelleworld.run_job", args=[job_id])
+            except Exception as e:
+                # Broker injoignable: les tâches non envoyées sont exécutées ici
+                logger.error(f"Envoi au broker Celery impossible ({e}): exécution locale")
+                return job_ids[index:]
+        return []
+
+    def wake(self) -> None:
+        """Traiter les tâches sans attendre le prochain intervalle"""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self) -> None:
+        """Boucle de traitement: à chaque réveil ou intervalle (purge une fois par heure)"""
+        next_purge = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.run_pending)
+                if time.monotonic() >= next_purge:
+                    await asyncio.to_thread(self.purge)
+                    next_purge = time.monotonic() + 3600
+            except Exception:
+                # Base ou broker indisponible: la boucle continue, les tâches
+                # prises sont reprises après JOBS_LOCK_SECONDS
+                logger.exception("Erreur du worker de tâches")
+
+    def start(self) -> None:
+        """Démarrer la boucle (au démarrage de l'application)"""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+
+
+# Instance partagée par le processus
+job_worker = JobWorker(
+    interval=settings.JOBS_POLL_SECONDS,
+    batch_size=settings.JOBS_BATCH_SIZE,
+    lock_seconds=settings.JOBS_LOCK_SECONDS,
+    backend=settings.JOBS_BACKEND,
+    retention_days=settings.JOBS_RETENTION_DAYS
+)
+
+
+# Factory function pour l'injection de dépendances
+def get_job_queue_service(db: Session) -> JobQueueService:
+    """Factory pour créer une instance de JobQueueService"""
+    return JobQueueService(db)
@@ -0,0 +1,615 @@
+"""
+Service Classements - Meilleures ventes, produits mis en avant, top catégories
+Principe Single Responsibility: Tient à jour les classements précalculés
+
+Les classements sont gardés en mémoire et lus sans tri ni agrégation SQL:
+- tous temps: produits actifs par sales_count (global et par catégorie),
+  produits mis en avant par sales_count puis date de création;
+- 7, 30 et 90 jours: produits par quantité vendue sur les commandes payées
+  (global et par catégorie) et catégories par chiffre d'affaires.
+
+Les ventes payées sont agrégées par produit et par jour dans la table
+product_sales_daily: c'est l'instantané relu au démarrage (au plus 90
+lignes par produit) au lieu de l'historique des commandes. Chaque paiement
+met à jour cette table et les classements concernés, sans relecture.
+
+Les modifications du catalogue (stock, ventes, activation, catégorie)
+marquent les produits à relire avant la lecture suivante, comme pour
+l'index de suggestions. Au changement de jour, les fenêtres glissantes
+sont recalculées depuis les agrégats quotidiens en mémoire.
+"""
+
+import heapq
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.order import Order, OrderItem, PaymentStatus
+from app.models.product import Product
+from app.models.sales import ProductSalesDaily
+
+logger = logging.getLogger(__name__)
+
+# Périodes glissantes (en jours) des classements de ventes
+PERIODS = (7, 30, 90)
+WINDOW_DAYS = max(PERIODS)
+
+
+class ProductState(NamedTuple):
+    category_id: Optional[int]
+    is_active: bool
+    is_featured: bool
+    sales_count: int
+    created: float
+
+
+def _accumulate(target: Dict[int, List[float]], key: int, values: Iterable[float]) -> List[float]:
+    row = target.get(key)
+    if row is None:
+        row = target[key] = list(values)
+    else:
+        for i, value in enumerate(values):
+            row[i] += value
+    return row
+
+
+class Ranking:
+    """
+    Top-N d'un classement: score de chaque élément et N meilleurs triés
+
+    Une hausse de score se répercute par simple insertion dans le top;
+    seules une baisse ou une sortie d'un élément du top imposent de le
+    recalculer (désactivation d'un produit, changement de jour).
+    Les scores sont des tuples terminés par l'id: aucun ex aequo.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.scores: Dict[int, tuple] = {}
+        self.top: List[int] = []
+
+    def load(self, scores: Dict[int, tuple]) -> None:
+        self.scores = scores
+        self._rebuild()
+
+    def set(self, item_id: int, score: Optional[tuple]) -> None:
+        old = self.scores.get(item_id)
+        if score is None:
+            if old is None:
+                return
+            del self.scores[item_id]
+        else:
+            self.scores[item_id] = score
+
+        if old is not None and item_id in self.top:
+            if score is None or score < old:
+                self._rebuild()
+            else:
+                self.top.sort(key=self.scores.__getitem__, reverse=True)
+        elif score is not None and (
+            len(self.top) < self.size or score > self.scores[self.top[-1]]
+        ):
+            self.top.append(item_id)
+            self.top.sort(key=self.scores.__getitem__, reverse=True)
+            del self.top[self.size:]
+
+    def head(self, limit: int) -> List[int]:
+        return self.top[:limit]
+
+    def _rebuild(self) -> None:
+        self.top = heapq.nlargest(self.size, self.scores, key=self.scores.__getitem__)
+
+
+class Board:
+    """Classement global et par catégorie d'un même score"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.overall = Ranking(size)
+        self.by_category: Dict[int, Ranking] = {}
+
+    def load(self, items: Iterable[Tuple[int, Optional[int], tuple]]) -> None:
+        overall: Dict[int, tuple] = {}
+        by_category: Dict[int, Dict[int, tuple]] = {}
+        for item_id, category_id, score in items:
+            overall[item_id] = score
+            if category_id is not None:
+                by_category.setdefault(category_id, {})[item_id] = score
+        self.overall.load(overall)
+        self.by_category = {}
+        for category_id, scores in by_category.items():
+            self.by_category[category_id] = ranking = Ranking(self.size)
+            ranking.load(scores)
+
+    def set(
+        self,
+        item_id: int,
+        category_id: Optional[int],
+        score: Optional[tuple],
+        old_category_id: Optional[int] = None
+    ) -> None:
+        self.overall.set(item_id, score)
+        if old_category_id is not None and old_category_id != category_id:
+            ranking = self.by_category.get(old_category_id)
+            if ranking is not None:
+                ranking.set(item_id, None)
+        if category_id is not None:
+            self.by_category.setdefault(category_id, Ranking(self.size)).set(item_id, score)
+
+    def head(self, limit: int, category_id: Optional[int] = None) -> List[int]:
+        if category_id is None:
+            return self.overall.head(limit)
+        ranking = self.by_category.get(category_id)
+        return ranking.head(limit) if ranking else []
+
+
+class Leaderboards:
+    """
+    Classements précalculés du catalogue
+
+    Usage:
+        leaderboards.best_sellers(10)                 -> [product_id, ...]
+        leaderboards.best_sellers(10, period=30, category_id=2)
+        leaderboards.product_sales(30, 10)            -> [(product_id, quantité, CA, lignes), ...]
+        leaderboards.top_categories(30, 5)            -> [(category_id, CA, quantité), ...]
+    """
+
+    def __init__(self, size: int = 50):
+        self.size = size
+        self._lock = threading.RLock()
+        self._dirty: Set[int] = set()
+        self.loaded = False
+        self.today = date.today()
+        self.products: Dict[int, ProductState] = {}
+        self.daily: Dict[date, Dict[int, List[float]]] = {}
+        self._clear_rankings()
+
+    def _clear_rankings(self) -> None:
+        # produit -> [quantité, CA, lignes] et catégorie -> [CA, quantité], par période
+        self.totals: Dict[int, Dict[int, List[float]]] = {period: {} for period in PERIODS}
+        self.category_totals: Dict[int, Dict[int, List[float]]] = {period: {} for period in PERIODS}
+        self.all_time = Board(self.size)
+        self.featured = Ranking(self.size)
+        self.period_products = {period: Board(self.size) for period in PERIODS}
+        self.period_categories = {period: Ranking(self.size) for period in PERIODS}
+
+    # ----- Lecture -----
+
+    def best_sellers(self, limit: int, period: Optional[int] = None, category_id: Optional[int] = None) -> List[int]:
+        with self._lock:
+            board = self.all_time if period is None else self.period_products[period]
+            return board.head(limit, category_id)
+
+    def featured_products(self, limit: int) -> List[int]:
+        with self._lock:
+            return self.featured.head(limit)
+
+    def product_sales(self, period: int, limit: int, category_id: Optional[int] = None) -> List[Tuple[int, int, float, int]]:
+        with self._lock:
+            totals = self.totals[period]
+            return [
+                (product_id, int(totals[product_id][0]), round(totals[product_id][1], 2), int(totals[product_id][2]))
+                for product_id in self.period_products[period].head(limit, category_id)
+            ]
+
+    def top_categories(self, period: int, limit: int) -> List[Tuple[int, float, int]]:
+        with self._lock:
+            totals = self.category_totals[period]
+            return [
+                (category_id, round(totals[category_id][0], 2), int(totals[category_id][1]))
+                for category_id in self.period_categories[period].head(limit)
+            ]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "day": self.today.isoformat(),
+                "products": len(self.products),
+                "days": len(self.daily),
+                "size": self.size,
+                "periods": {
+                    period: {
+                        "products_sold": len(self.totals[period]),
+                        "categories": len(self.category_totals[period]),
+                    }
+                    for period in PERIODS
+                },
+            }
+
+    # ----- Construction -----
+
+    def load(
+        self,
+        products: Iterable[Tuple[int, ProductState]],
+        daily: Iterable[Tuple[int, date, int, float, int]],
+        today: date
+    ) -> None:
+        """Charger les produits et les agrégats quotidiens (construction complète)"""
+        with self._lock:
+            self.today = today
+            self.products = dict(products)
+            self.daily = {}
+            for product_id, day, quantity, revenue, line_count in daily:
+                self.daily.setdefault(day, {})[product_id] = [quantity or 0, revenue or 0.0, line_count or 0]
+            self._recompute()
+            self.loaded = True
+
+    def roll(self, today: date) -> None:
+        """Faire glisser les fenêtres au changement de jour"""
+        with self._lock:
+            if today != self.today:
+                self.today = today
+                self._recompute()
+
+    def _recompute(self) -> None:
+        self._clear_rankings()
+        start = self.today - timedelta(days=WINDOW_DAYS - 1)
+        for day in [day for day in self.daily if day < start]:
+            del self.daily[day]
+
+        for day, rows in self.daily.items():
+            age = (self.today - day).days
+            for period in PERIODS:
+                if age < period:
+                    for product_id, values in rows.items():
+                        _accumulate(self.totals[period], product_id, values)
+
+        for period in PERIODS:
+            for product_id, (quantity, revenue, _) in self.totals[period].items():
+                state = self.products.get(product_id)
+                if state is not None and state.category_id is not None:
+                    _accumulate(self.category_totals[period], state.category_id, (revenue, quantity))
+
+        products = self.products.items()
+        self.all_time.load(
+            (product_id, state.category_id, self._all_time_score(product_id, state))
+            for product_id, state in products if state.is_active
+        )
+        self.featured.load({
+            product_id: self._featured_score(product_id, state)
+            for product_id, state in products if state.is_active and state.is_featured
+        })
+        for period in PERIODS:
+            totals = self.totals[period]
+            self.period_products[period].load(
+                (product_id, self.products[product_id].category_id, score)
+                for product_id in totals
+                for score in (self._period_score(product_id, self.products.get(product_id), totals),)
+                if score is not None
+            )
+            self.period_categories[period].load({
+                category_id: self._category_score(category_id, values)
+                for category_id, values in self.category_totals[period].items()
+            })
+
+    # ----- Mises à jour incrémentales -----
+
+    def add_sales(self, day: date, lines: Iterable[Tuple[int, int, float, int]]) -> bool:
+        """
+        Ajouter les ventes payées d'une commande (jour de la commande)
+
+        lines: (product_id, quantité, CA, lignes). Retourne False si la
+        journée est hors des fenêtres.
+        """
+        with self._lock:
+            age = (self.today - day).days
+            if age >= WINDOW_DAYS:
+                return False
+
+            rows = self.daily.setdefault(day, {})
+            for product_id, quantity, revenue, line_count in lines:
+                _accumulate(rows, product_id, (quantity, revenue, line_count))
+                state = self.products.get(product_id)
+                category_id = state.category_id if state else None
+                for period in PERIODS:
+                    if age >= period:
+                        continue
+                    totals = self.totals[period]
+                    _accumulate(totals, product_id, (quantity, revenue, line_count))
+                    self.period_products[period].set(
+                        product_id, category_id, self._period_score(product_id, state, totals)
+                    )
+                    if category_id is not None:
+                        values = _accumulate(self.category_totals[period], category_id, (revenue, quantity))
+                        self.period_categories[period].set(category_id, self._category_score(category_id, values))
+            return True
+
+    def update_product(self, product_id: int, state: Optional[ProductState]) -> None:
+        """Prendre en compte un produit modifié (state=None: supprimé)"""
+        with self._lock:
+            old = self.products.pop(product_id, None)
+            if state is not None:
+                self.products[product_id] = state
+            old_category = old.category_id if old else None
+            category_id = state.category_id if state else None
+
+            self.all_time.set(product_id, category_id, self._all_time_score(product_id, state), old_category)
+            self.featured.set(product_id, self._featured_score(product_id, state))
+
+            for period in PERIODS:
+                totals = self.totals[period]
+                self.period_products[period].set(
+                    product_id, category_id, self._period_score(product_id, state, totals), old_category
+                )
+                values = totals.get(product_id)
+                if values is None or old_category == category_id:
+                    continue
+                # Les ventes du produit passent d'une catégorie à l'autre
+                quantity, revenue = values[0], values[1]
+                if old_category is not None:
+                    moved = _accumulate(self.category_totals[period], old_category, (-revenue, -quantity))
+                    self.period_categories[period].set(
+                        old_category,
+                        self._category_score(old_category, moved) if moved[1] > 0 else None
+                    )
+                if category_id is not None:
+                    moved = _accumulate(self.category_totals[period], category_id, (revenue, quantity))
+                    self.period_categories[period].set(category_id, self._category_score(category_id, moved))
+
+    def mark_dirty(self, product_ids: Iterable[int]) -> None:
+        """Signaler des produits à relire avant la prochaine lecture"""
+        with self._lock:
+            self._dirty.update(product_ids)
+
+    def take_dirty(self) -> Set[int]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+
+    # ----- Scores -----
+
+    @staticmethod
+    def _all_time_score(product_id: int, state: Optional[ProductState]) -> Optional[tuple]:
+        if state is None or not state.is_active:
+            return None
+        return (state.sales_count, -product_id)
+
+    @staticmethod
+    def _featured_score(product_id: int, state: Optional[ProductState]) -> Optional[tuple]:
+        if state is None or not (state.is_active and state.is_featured):
+            return None
+        # Plus récent d'abord, y compris à date de création égale
+        return (state.sales_count, state.created, product_id)
+
+    @staticmethod
+    def _period_score(product_id: int, state: Optional[ProductState], totals: Dict[int, List[float]]) -> Optional[tuple]:
+        values = totals.get(product_id)
+        if state is None or not state.is_active or values is None or values[0] <= 0:
+            return None
+        return (values[0], values[1], -product_id)
+
+    @staticmethod
+    def _category_score(category_id: int, values: List[float]) -> tuple:
+        return (round(values[0], 2), values[1], -category_id)
+
+
+class LeaderboardService:
+    """Construction des classements depuis la base et mise à jour à chaque paiement"""
+
+    def __init__(self, db: Session, boards: Optional[Leaderboards] = None):
+        self.db = db
+        self.boards = boards or leaderboards
+
+    # ----- Construction -----
+
+    def rebuild(self, backfill: bool = False) -> Dict[str, object]:
+        """
+        Reconstruire les classements depuis product_sales_daily
+
+        La table est remplie depuis les commandes payées si elle est vide
+        (premier démarrage) ou si backfill=True.
+        """
+        self.boards.take_dirty()
+        today = datetime.utcnow().date()
+        start = today - timedelta(days=WINDOW_DAYS - 1)
+
+        if backfill or self.db.query(ProductSalesDaily.product_id).first() is None:
+            self._backfill(start)
+
+        products = self.db.query(*self._product_columns())
+        daily = (
+            self.db.query(
+                ProductSalesDaily.product_id,
+                ProductSalesDaily.day,
+                ProductSalesDaily.quantity,
+                ProductSalesDaily.revenue,
+                ProductSalesDaily.line_count
+            )
+            .filter(ProductSalesDaily.day >= start)
+        )
+        self.boards.load(((row.id, self._state(row)) for row in products), daily, today)
+
+        stats = self.boards.stats()
+        logger.info(f"Classements reconstruits: {stats}")
+        return stats
+
+    def _backfill(self, start: date) -> None:
+        """Agréger les commandes payées de la fenêtre par produit et par jour"""
+        day = func.date(Order.created_at)
+        rows = (
+            self.db.query(
+                OrderItem.product_id,
+                day,
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.total_price),
+                func.count(OrderItem.id)
+            )
+            .join(Order, OrderItem.order_id == Order.id)
+            .filter(
+                Order.payment_status == PaymentStatus.PAID,
+                Order.created_at >= datetime.combine(start, time.min),
+                OrderItem.product_id != None
+            )
+            .group_by(OrderItem.product_id, day)
+            .all()
+        )
+
+        self.db.query(ProductSalesDaily).filter(ProductSalesDaily.day >= start).delete(synchronize_session=False)
+        self.db.bulk_insert_mappings(ProductSalesDaily, [
+            {
+                "product_id": product_id,
+                # SQLite renvoie date() sous forme de texte
+                "day": date.fromisoformat(value) if isinstance(value, str) else value,
+                "quantity": int(quantity or 0),
+                "revenue": float(revenue or 0),
+                "line_count": int(line_count or 0)
+            }
+            for product_id, value, quantity, revenue, line_count in rows
+        ])
+        self.db.commit()
+
+    def ensure_loaded(self) -> None:
+        if not self.boards.loaded:
+            self.rebuild()
+
+    # ----- Mises à jour -----
+
+    def record_paid_order(self, order_id: int) -> bool:
+        """
+        Intégrer une commande qui vient d'être payée
+
+        Retourne True si des classements ont pu changer.
+        """
+        created_at = self.db.query(Order.created_at).filter(Order.id == order_id).scalar()
+        if created_at is None:
+            return False
+
+        lines = [
+            (row[0], int(row[1] or 0), float(row[2] or 0), int(row[3] or 0))
+            for row in
+            self.db.query(
+                OrderItem.product_id,
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.total_price),
+                func.count(OrderItem.id)
+            )
+            .filter(OrderItem.order_id == order_id, OrderItem.product_id != None)
+            .group_by(OrderItem.product_id)
+        ]
+        if not lines:
+            return False
+
+        day = created_at.date()
+        self._upsert_daily(day, lines)
+        self.db.commit()
+
+        if not self.boards.loaded:
+            self.rebuild()
+            return True
+        self.boards.roll(datetime.utcnow().date())
+        return self.boards.add_sales(day, lines)
+
+    def _upsert_daily(self, day: date, lines: List[Tuple[int, int, float, int]]) -> None:
+        """Ajouter des ventes aux agrégats du jour (une requête sur PostgreSQL/SQLite)"""
+        values = [
+            {"product_id": product_id, "day": day, "quantity": quantity, "revenue": revenue, "line_count": line_count}
+            for product_id, quantity, revenue, line_count in lines
+        ]
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = insert(ProductSalesDaily).values(values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[ProductSalesDaily.product_id, ProductSalesDaily.day],
+                set_={
+                    "quantity": ProductSalesDaily.quantity + statement.excluded.quantity,
+                    "revenue": ProductSalesDaily.revenue + statement.excluded.revenue,
+                    "line_count": ProductSalesDaily.line_count + statement.excluded.line_count,
+                }
+            )
+            self.db.execute(statement)
+            return
+
+        for value in values:
+            row = self.db.get(ProductSalesDaily, (value["product_id"], day))
+            if row is None:
+                self.db.add(ProductSalesDaily(**value))
+            else:
+                row.quantity += value["quantity"]
+                row.revenue += value["revenue"]
+                row.line_count += value["line_count"]
+
+    def _refresh(self) -> None:
+        """Charger les classements, faire glisser les fenêtres et relire les produits modifiés"""
+        if not self.boards.loaded:
+            self.rebuild()
+            return
+
+        self.boards.roll(datetime.utcnow().date())
+        dirty = self.boards.take_dirty()
+        if not dirty:
+            return
+
+        found = set()
+        for row in self.db.query(*self._product_columns()).filter(Product.id.in_(dirty)):
+            found.add(row.id)
+            self.boards.update_product(row.id, self._state(row))
+        for missing in dirty - found:
+            self.boards.update_product(missing, None)
+
+    # ----- Lecture -----
+
+    def best_sellers(self, limit: int, period: Optional[int] = None, category_id: Optional[int] = None) -> List[int]:
+        self._refresh()
+        return self.boards.best_sellers(limit, period, category_id)
+
+    def featured(self, limit: int) -> List[int]:
+        self._refresh()
+        return self.boards.featured_products(limit)
+
+    def product_sales(self, period: int, limit: int, category_id: Optional[int] = None) -> List[Tuple[int, int, float, int]]:
+        self._refresh()
+        return self.boards.product_sales(period, limit, category_id)
+
+    def top_categories(self, period: int, limit: int) -> List[Tuple[int, float, int]]:
+        self._refresh()
+        return self.boards.top_categories(period, limit)
+
+    def load_products(self, product_ids: List[int], *options) -> List[Product]:
+        """Produits d'un classement, dans l'ordre du classement (lecture par clé primaire)"""
+        if not product_ids:
+            return []
+        products = {
+            product.id: product for product in
+            self.db.query(Product).options(*options).filter(Product.id.in_(product_ids))
+        }
+        return [products[product_id] for product_id in product_ids if product_id in products]
+
+    # ----- Utilitaires -----
+
+    @staticmethod
+    def _product_columns():
+        return (
+            Product.id,
+            Product.category_id,
+            Product.is_active,
+            Product.is_featured,
+            Product.sales_count,
+            Product.created_at
+        )
+
+    @staticmethod
+    def _state(row) -> ProductState:
+        return ProductState(
+            row.category_id,
+            bool(row.is_active),
+            bool(row.is_featured),
+            row.sales_count or 0,
+            row.created_at.timestamp() if row.created_at else 0.0
+        )
+
+
+# Instance partagée par le processus
+leaderboards = Leaderboards(size=settings.LEADERBOARD_SIZE)
+
+
+# Factory function pour l'injection de dépendances
+def get_leaderboard_service(db: Session) -> LeaderboardService:
+    """Factory pour créer une instance de LeaderboardService"""
+    return LeaderboardService(db)
@@ -94,21 +94,30 @@ class NotificationService:
     def notify_order_created(self, order_data: Dict[str, Any]) -> bool:
         """Notifier qu'une commande a été créée"""
         
-        # Notification email au client
-        if order_data.get("customer_email"):
-            message = self._format_order_confirmation(order_data)
-            self.email_sender.send(
-                recipient=order_data["customer_email"],
-                message=message,
-                subject=f"Confirmation de commande {order_data.get('order_number')}"
-            )
+        sent = self.send_order_confirmation(order_data)
+        return self.send_admin_order_alert(order_data) and sent
+    
+    def send_order_confirmation(self, order_data: Dict[str, Any]) -> bool:
+        """Email de confirmation au client"""
         
-        # Notification Telegram à l'admin
-        if self.telegram_sender:
-            admin_message = self._format_admin_order_notification(order_data)
-            self.telegram_sender.send("admin", admin_message)
+        if not order_data.get("customer_email"):
+            return True
         
-        return True
+        message = self._format_order_confirmation(order_data)
+        return self.email_sender.send(
+            recipient=order_data["customer_email"],
+            message=message,
+            subject=f"Confirmation de commande {order_data.get('order_number')}"
+        )
+    
+    def send_admin_order_alert(self, order_data: Dict[str, Any]) -> bool:
+        """Alerte Telegram à l'admin pour une nouvelle commande"""
+        
+        if not self.telegram_sender:
+            return True
+        
+        admin_message = self._format_admin_order_notification(order_data)
+        return self.telegram_sender.send("admin", admin_message)
     
     def notify_order_shipped(self, order_data: Dict[str, Any]) -> bool:
         """Notifier qu'une commande a été expédiée"""
@@ -151,7 +160,7 @@ class NotificationService:
         if self.telegram_sender:
             message = f"⚠️ Stock faible: {product_data.get('name')}\n"
             message += f"Quantité restante: {product_data.get('stock_quantity')}"
-            self.telegram_sender.send("admin", message)
+            return self.telegram_sender.send("admin", message)
         
         return True
     
@@ -223,9 +232,9 @@ def get_notification_service() -> NotificationService:
     ) if hasattr(settings, 'WHATSAPP_NUMBER') else None
     
     telegram_sender = TelegramNotificationSender(
-        bot_token=getattr(settings, 'TELEGRAM_BOT_TOKEN', ''),
-        chat_id=getattr(settings, 'TELEGRAM_CHAT_ID', '')
-    ) if hasattr(settings, 'TELEGRAM_BOT_TOKEN') else None
+        bot_token=settings.TELEGRAM_BOT_TOKEN,
+        chat_id=settings.TELEGRAM_CHAT_ID
+    ) if settings.TELEGRAM_BOT_TOKEN else None
     
     return NotificationService(
         whatsapp_sender=whatsapp_sender,
@@ -0,0 +1,119 @@
+"""
+Service Numérotation - Numéros de commande et de facture
+Principe Single Responsibility: Distribue des numéros uniques et croissants par série et par jour
+
+Format inchangé: SERIE-AAAAMMJJ-NNNNNN (ex: WA-20250630-000042), avec un
+compteur journalier au lieu d'un suffixe aléatoire (uuid4):
+- les numéros d'une série croissent au fil de la journée, les insertions
+  dans l'index unique se font en fin d'index au lieu de pages aléatoires;
+- aucune collision possible, donc aucune boucle de nouvel essai.
+
+Chaque worker réserve un bloc de NUMBER_BLOCK_SIZE numéros en une seule
+requête (INSERT ... ON CONFLICT DO UPDATE ... RETURNING), validée dans sa
+propre transaction, puis les distribue depuis la mémoire. Les numéros d'un
+bloc non utilisés (arrêt du worker, commande annulée) sont perdus: la
+numérotation tolère les trous. Avec plusieurs workers, les blocs sont
+distribués en parallèle: les numéros sont uniques et croissants par
+worker, pas strictement chronologiques entre workers.
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Dict, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.sequence import NumberSequence
+
+# Séries de numéros
+ORDER_SERIES_WHATSAPP = "WA"
+ORDER_SERIES_STORE = "ST"
+INVOICE_SERIES = "INV"
+
+
+def format_number(series: str, day: date, value: int) -> str:
+    """Numéro affiché: SERIE-AAAAMMJJ-NNNNNN"""
+    return f"{series}-{day:%Y%m%d}-{value:06d}"
+
+
+class NumberAllocator:
+    """
+    Distribution des numéros par blocs réservés en base
+
+    Usage:
+        order_number = number_allocator.next_number("WA")
+
+    Appeler next_number avant les écritures de la requête: le bloc est
+    réservé sur une autre connexion (sous SQLite, elle attendrait le
+    verrou d'écriture de la requête en cours).
+    """
+
+    def __init__(self, block_size: int = 20):
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        # (série, jour) -> (prochain numéro, dernier numéro du bloc)
+        self._blocks: Dict[Tuple[str, date], Tuple[int, int]] = {}
+
+    def next_number(self, series: str) -> str:
+        """Prochain numéro de la série pour aujourd'hui"""
+        day = datetime.now().date()
+        with self._lock:
+            if any(block_day != day for _, block_day in self._blocks):
+                # Nouveau jour: les blocs de la veille ne serviront plus
+                self._blocks = {key: block for key, block in self._blocks.items() if key[1] == day}
+
+            value, last = self._blocks.get((series, day), (1, 0))
+            if value > last:
+                last = self._reserve_block(series, day)
+                value = last - self.block_size + 1
+            self._blocks[(series, day)] = (value + 1, last)
+
+        return format_number(series, day, value)
+
+    def _reserve_block(self, series: str, day: date) -> int:
+        """Réserver les block_size numéros suivants; retourne le dernier du bloc"""
+        db = SessionLocal()
+        try:
+            dialect = db.get_bind().dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                statement = insert(NumberSequence).values(series=series, day=day, last_value=self.block_size)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[NumberSequence.series, NumberSequence.day],
+                    set_={"last_value": NumberSequence.last_value + self.block_size}
+                ).returning(NumberSequence.last_value)
+                last = db.execute(statement).scalar_one()
+            else:
+                last = db.execute(
+                    update(NumberSequence)
+                    .where(NumberSequence.series == series, NumberSequence.day == day)
+                    .values(last_value=NumberSequence.last_value + self.block_size)
+                    .returning(NumberSequence.last_value)
+                ).scalar()
+                if last is None:
+                    db.add(NumberSequence(series=series, day=day, last_value=self.block_size))
+                    last = self.block_size
+            db.commit()
+            return last
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Instance partagée par le processus
+number_allocator = NumberAllocator(block_size=settings.NUMBER_BLOCK_SIZE)
+
+
+def next_order_number(series: str = ORDER_SERIES_STORE) -> str:
+    """Numéro de commande (WA- pour WhatsApp, ST- pour la boutique)"""
+    return number_allocator.next_number(series)
+
+
+def next_invoice_number() -> str:
+    """Numéro de facture client (INV-)"""
+    return number_allocator.next_number(INVOICE_SERIES)
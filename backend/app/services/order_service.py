@@ -5,14 +5,18 @@ Principe Single Responsibility: Gère uniquement la logique des commandes
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app.services.base import BaseService, IPriceCalculator
 from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
-from app.models.product import Product
 from app.models.user import User
+from app.services.catalog_cache import products_changed
+from app.services.checkout_jobs import enqueue_post_checkout
+from app.services.customer_service import GuestCustomerService
+from app.services.inventory_service import InventoryService, StockError, cart_quantities
+from app.services.job_queue import job_worker
+from app.services.numbering_service import next_order_number
+from app.services.stats_service import get_stats_service
 
 
 class CanadianPriceCalculator(IPriceCalculator):
@@ -63,12 +67,14 @@ class OrderService(BaseService):
     - Création et gestion des commandes
     - Calcul des totaux (délégué au PriceCalculator)
     - Gestion des statuts
-    - Validation des commandes
+    - Validation des commandes (réservation du stock déléguée à InventoryService)
     """
     
     def __init__(self, db: Session):
         super().__init__(db)
         self.price_calculator = CanadianPriceCalculator()
+        self.inventory = InventoryService(db)
+        self.customers = GuestCustomerService(db)
     
     def create_order(
         self,
@@ -80,10 +86,18 @@ class OrderService(BaseService):
     ) -> Dict[str, Any]:
         """Créer une nouvelle commande"""
         
-        # Valider les items du panier
-        validated_items = self._validate_cart_items(cart_items)
-        if not validated_items["valid"]:
-            return {"success": False, "error": validated_items["error"]}
+        if not cart_items:
+            return {"success": False, "error": "Panier vide"}
+        
+        # Numéro de commande (avant les écritures de la transaction)
+        order_number = self._generate_order_number()
+        
+        # Verrouiller les produits et réserver le stock (2 requêtes pour tout le panier)
+        try:
+            self.inventory.reserve(cart_quantities(cart_items, key="id"))
+        except StockError as error:
+            self.db.rollback()
+            return {"success": False, "error": str(error)}
         
         # Calculer les montants
         subtotal = self.price_calculator.calculate_total(cart_items)
@@ -91,9 +105,6 @@ class OrderService(BaseService):
         shipping_amount = self.price_calculator.calculate_shipping(subtotal)
         total_amount = subtotal + tax_amount + shipping_amount
         
-        # Générer le numéro de commande
-        order_number = self._generate_order_number()
-        
         # Adresse de facturation par défaut
         if not billing_address:
             billing_address = shipping_address
@@ -106,6 +117,9 @@ class OrderService(BaseService):
             tax_amount=tax_amount,
             shipping_amount=shipping_amount,
             total_amount=total_amount,
+            item_count=sum(item.get("quantity", 1) for item in cart_items),
+            customer_name=user.full_name,
+            customer_email=user.email,
             status=OrderStatus.PENDING,
             payment_status=PaymentStatus.PENDING,
             shipping_first_name=shipping_address.get("first_name"),
@@ -143,12 +157,17 @@ class OrderService(BaseService):
                 total_price=item.get("price") * item.get("quantity", 1)
             )
             self.db.add(order_item)
-            
-            # Mettre à jour le stock
-            self._update_product_stock(item.get("id"), item.get("quantity", 1))
+        
+        # Email, alerte admin et stock faible: tâches validées avec la commande
+        product_ids = [item.get("id") for item in cart_items]
+        enqueue_post_checkout(self.db, order, product_ids)
         
         self.db.commit()
         self.db.refresh(order)
+        job_worker.wake()
+        
+        # Le stock a changé: invalider les fiches en cache de ces produits
+        products_changed(product_ids, listings=False)
         
         self._log_action("CREATE", "Order", order.id)
         
@@ -166,23 +185,8 @@ class OrderService(BaseService):
     ) -> Dict[str, Any]:
         """Créer une commande WhatsApp (sans authentification complète)"""
         
-        # Récupérer ou créer l'utilisateur guest
-        customer_email = customer_info.get("email", "guest@stelleworld.com") if customer_info else "guest@stelleworld.com"
-        customer_name = customer_info.get("name", "Client WhatsApp") if customer_info else "Client WhatsApp"
-        
-        user = self.db.query(User).filter(User.email == customer_email).first()
-        if not user:
-            from app.core.security import get_password_hash
-            user = User(
-                email=customer_email,
-                first_name=customer_name.split()[0] if customer_name else "Client",
-                last_name=customer_name.split()[-1] if len(customer_name.split()) > 1 else "WhatsApp",
-                hashed_password=get_password_hash("whatsapp_guest"),
-                is_active=True,
-                country="Canada"
-            )
-            self.db.add(user)
-            self.db.flush()
+        # Client existant (email, sinon téléphone) ou invité sans mot de passe
+        user = self.customers.get_or_create(customer_info)
         
         # Créer la commande avec adresse par défaut
         shipping_address = {
@@ -249,26 +253,14 @@ class OrderService(BaseService):
     def get_order_stats(self) -> Dict[str, Any]:
         """Récupérer les statistiques des commandes"""
         
-        total_orders = self.db.query(Order).count()
-        
-        total_revenue = self.db.query(func.sum(Order.total_amount)).filter(
-            Order.payment_status == PaymentStatus.PAID
-        ).scalar() or 0
-        
-        pending_orders = self.db.query(Order).filter(
-            Order.status == OrderStatus.PENDING
-        ).count()
-        
-        today = datetime.utcnow().date()
-        today_orders = self.db.query(Order).filter(
-            func.date(Order.created_at) == today
-        ).count()
+        # Requête agrégée unique et cache court partagés avec /api/orders/admin/stats
+        stats = get_stats_service(self.db).order_stats()
         
         return {
-            "total_orders": total_orders,
-            "total_revenue": float(total_revenue),
-            "pending_orders": pending_orders,
-            "today_orders": today_orders
+            "total_orders": stats["total_orders"],
+            "total_revenue": float(stats["total_revenue"]),
+            "pending_orders": stats["pending_orders"],
+            "today_orders": stats["today_orders"]
         }
     
     def validate(self, data: dict) -> bool:
@@ -283,40 +275,9 @@ class OrderService(BaseService):
         
         return True
     
-    def _validate_cart_items(self, cart_items: List[dict]) -> Dict[str, Any]:
-        """Valider les items du panier"""
-        if not cart_items:
-            return {"valid": False, "error": "Panier vide"}
-        
-        for item in cart_items:
-            product_id = item.get("id")
-            quantity = item.get("quantity", 1)
-            
-            product = self.db.query(Product).filter(Product.id == product_id).first()
-            if not product:
-                return {"valid": False, "error": f"Produit {product_id} non trouvé"}
-            
-            if not product.is_active:
-                return {"valid": False, "error": f"Produit {product.name} indisponible"}
-            
-            if product.track_inventory and product.stock_quantity < quantity:
-                if not product.allow_backorder:
-                    return {"valid": False, "error": f"Stock insuffisant pour {product.name}"}
-        
-        return {"valid": True}
-    
-    def _update_product_stock(self, product_id: int, quantity: int):
-        """Mettre à jour le stock d'un produit"""
-        product = self.db.query(Product).filter(Product.id == product_id).first()
-        if product and product.track_inventory:
-            product.stock_quantity = max(0, product.stock_quantity - quantity)
-            product.sales_count += quantity
-    
     def _generate_order_number(self, prefix: str = "ST") -> str:
-        """Générer un numéro de commande unique"""
-        date_part = datetime.now().strftime('%Y%m%d')
-        unique_part = str(uuid.uuid4())[:8].upper()
-        return f"{prefix}-{date_part}-{unique_part}"
+        """Générer un numéro de commande unique (compteur journalier de la série)"""
+        return next_order_number(prefix)
 
 
 # Factory function pour l'injection de dépendances
@@ -0,0 +1,409 @@
+"""
+Service Import/Export - Chargement et extraction du catalogue en masse
+Principe Single Responsibility: Gère uniquement les transferts de produits par fichier
+
+Import: le fichier (CSV ou NDJSON) est lu ligne à ligne depuis le fichier
+temporaire de l'upload, puis appliqué par lots: une requête pour retrouver
+les produits existants, un INSERT multi-lignes pour les nouveaux et un
+UPDATE groupé par clé primaire pour les autres. Chaque ligne invalide est
+rapportée sans interrompre l'import.
+
+Export: les produits sont lus avec un curseur côté serveur (yield_per) et
+écrits au fil de l'eau, sans charger le catalogue en mémoire.
+"""
+
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from slugify import slugify
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.product import Category, Product, ProductVariant
+from app.services.catalog_cache import products_changed
+from app.services.search_service import get_search_service
+
+# Colonnes importables / exportables et leur type
+PRODUCT_FIELDS = {
+    "slug": str,
+    "name": str,
+    "description": str,
+    "short_description": str,
+    "price": float,
+    "compare_at_price": float,
+    "cost_price": float,
+    "stock_quantity": int,
+    "track_inventory": bool,
+    "allow_backorder": bool,
+    "product_type": str,
+    "is_subscription": bool,
+    "is_active": bool,
+    "is_featured": bool,
+    "main_image_url": str,
+    "gallery_images": str,
+    "meta_title": str,
+    "meta_description": str,
+}
+
+# Colonnes dont la modification impose une réindexation de la recherche
+SEARCH_FIELDS = {"name", "description", "short_description"}
+
+# Colonnes exportées (réimportables telles quelles: id est ignoré à l'import)
+EXPORT_FIELDS = ["id", "category", *PRODUCT_FIELDS]
+
+TRUE_VALUES = {"1", "true", "yes", "oui", "vrai", "y", "o"}
+FALSE_VALUES = {"0", "false", "no", "non", "faux", "n"}
+
+# Nombre maximal d'erreurs détaillées renvoyées
+MAX_REPORTED_ERRORS = 200
+
+
+class RowError(ValueError):
+    """Ligne d'import invalide"""
+
+
+class ProductImportService:
+    """
+    Import en masse de produits, identifiés par slug (ou SKU de variante)
+
+    Usage:
+        report = get_product_import_service(db).import_file(upload.file, "csv")
+    """
+
+    def __init__(self, db: Session, batch_size: int = 500):
+        self.db = db
+        self.batch_size = batch_size
+        self._categories: Optional[Dict[str, int]] = None
+
+    def import_file(self, stream: BinaryIO, file_format: str) -> Dict[str, Any]:
+        """Importer un fichier CSV ou NDJSON; retourne le rapport d'import"""
+        started = time.perf_counter()
+        report = {"processed": 0, "created": 0, "updated": 0, "error_count": 0, "errors": []}
+        changed_ids: List[int] = []
+        reindex_ids: List[int] = []
+
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        rows = self._read_csv(text) if file_format == "csv" else self._read_ndjson(text)
+
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        for line, raw in rows:
+            report["processed"] += 1
+            try:
+                batch.append((line, self._normalize(raw)))
+            except RowError as e:
+                self._add_error(report, line, raw, str(e))
+
+            if len(batch) >= self.batch_size:
+                self._apply_batch(batch, report, changed_ids, reindex_ids)
+                batch = []
+
+        if batch:
+            self._apply_batch(batch, report, changed_ids, reindex_ids)
+
+        # Synchronisation unique en fin d'import
+        if reindex_ids:
+            self._reindex(reindex_ids)
+        if changed_ids:
+            products_changed(changed_ids)
+
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return report
+
+    # ----- Lecture -----
+
+    @staticmethod
+    def _read_csv(text: io.TextIOBase) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(text, dialect=dialect)
+        for row in reader:
+            yield reader.line_num, row
+
+    @staticmethod
+    def _read_ndjson(text: io.TextIOBase) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for line_num, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = {"_error": f"JSON invalide: {e.msg}"}
+            if not isinstance(row, dict):
+                row = {"_error": "Chaque ligne doit être un objet JSON"}
+            yield line_num, row
+
+    # ----- Validation -----
+
+    def _normalize(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Convertir une ligne brute en valeurs de colonnes Product"""
+        if "_error" in raw:
+            raise RowError(raw["_error"])
+
+        values: Dict[str, Any] = {}
+        for field, kind in PRODUCT_FIELDS.items():
+            if field not in raw or raw[field] is None:
+                continue
+            value = raw[field]
+            if isinstance(value, str):
+                value = value.strip()
+                # Cellule vide: la valeur existante est conservée
+                if value == "":
+                    continue
+            values[field] = self._convert(field, kind, value)
+
+        category = raw.get("category")
+        category_id = raw.get("category_id")
+        if (category or category_id) not in (None, ""):
+            values["category_id"] = self._resolve_category(category, category_id)
+
+        sku = (raw.get("sku") or "").strip() if isinstance(raw.get("sku"), str) else raw.get("sku")
+        if "slug" not in values:
+            if sku:
+                values["_sku"] = str(sku)
+            elif values.get("name"):
+                values["slug"] = slugify(values["name"])
+            else:
+                raise RowError("Colonne slug, sku ou name requise")
+
+        if values.get("price") is not None and values["price"] < 0:
+            raise RowError("Le prix ne peut pas être négatif")
+
+        return values
+
+    @staticmethod
+    def _convert(field: str, kind: type, value: Any) -> Any:
+        try:
+            if kind is bool:
+                if isinstance(value, bool):
+                    return value
+                text = str(value).strip().lower()
+                if text in TRUE_VALUES:
+                    return True
+                if text in FALSE_VALUES:
+                    return False
+                raise ValueError
+            if kind is float:
+                return float(str(value).replace(",", ".")) if isinstance(value, str) else float(value)
+            if kind is int:
+                return int(float(str(value).replace(",", "."))) if isinstance(value, str) else int(value)
+            return str(value)
+        except (TypeError, ValueError):
+            raise RowError(f"Valeur invalide pour {field}: {value!r}")
+
+    def _resolve_category(self, slug: Any, category_id: Any) -> Optional[int]:
+        if self._categories is None:
+            self._categories = {
+                row.slug: row.id for row in self.db.query(Category.id, Category.slug).all()
+            }
+        if slug:
+            slug = str(slug).strip()
+            if slug not in self._categories:
+                raise RowError(f"Catégorie inconnue: {slug}")
+            return self._categories[slug]
+        if category_id not in (None, ""):
+            try:
+                category_id = int(category_id)
+            except (TypeError, ValueError):
+                raise RowError(f"Valeur invalide pour category_id: {category_id!r}")
+            if category_id not in set(self._categories.values()):
+                raise RowError(f"Catégorie inconnue: {category_id}")
+            return category_id
+        return None
+
+    # ----- Écriture -----
+
+    def _apply_batch(
+        self,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        report: Dict[str, Any],
+        changed_ids: List[int],
+        reindex_ids: List[int]
+    ) -> None:
+        """Appliquer un lot: INSERT des nouveaux produits, UPDATE des existants"""
+        batch = self._resolve_targets(batch, report)
+        if not batch:
+            return
+
+        inserts: List[Tuple[int, Dict[str, Any]]] = []
+        updates: List[Tuple[int, Dict[str, Any]]] = []
+        for line, values in batch:
+            (updates if "id" in values else inserts).append((line, values))
+
+        for line, values in inserts:
+            if not values.get("name") or values.get("price") is None:
+                self._add_error(report, line, values, "name et price sont requis pour un nouveau produit")
+        inserts = [(line, values) for line, values in inserts if values.get("name") and values.get("price") is not None]
+
+        try:
+            self._write(inserts, updates)
+            self.db.commit()
+        except IntegrityError:
+            # Conflit dans le lot (ex: slug créé entre-temps): ligne par ligne
+            self.db.rollback()
+            inserts, updates = self._write_one_by_one(inserts, updates, report)
+
+        report["created"] += len(inserts)
+        report["updated"] += len(updates)
+
+        slugs = [values["slug"] for _, values in inserts]
+        new_ids = [row.id for row in self.db.query(Product.id).filter(Product.slug.in_(slugs))] if slugs else []
+        changed_ids.extend(new_ids)
+        changed_ids.extend(values["id"] for _, values in updates)
+        reindex_ids.extend(new_ids)
+        reindex_ids.extend(values["id"] for _, values in updates if SEARCH_FIELDS & values.keys())
+
+    def _resolve_targets(
+        self,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        report: Dict[str, Any]
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """Associer chaque ligne à son produit existant (une requête par clé)"""
+        slugs = {values["slug"] for _, values in batch if "slug" in values}
+        skus = {values["_sku"] for _, values in batch if "_sku" in values}
+
+        by_slug = dict(
+            self.db.query(Product.slug, Product.id).filter(Product.slug.in_(slugs)).all()
+        ) if slugs else {}
+        by_sku = dict(
+            self.db.query(ProductVariant.sku, ProductVariant.product_id)
+            .filter(ProductVariant.sku.in_(skus)).all()
+        ) if skus else {}
+
+        resolved: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+        for line, values in batch:
+            sku = values.pop("_sku", None)
+            if sku is not None:
+                if sku not in by_sku:
+                    self._add_error(report, line, values, f"SKU inconnu: {sku}")
+                    continue
+                values["id"] = by_sku[sku]
+            elif values["slug"] in by_slug:
+                values["id"] = by_slug[values["slug"]]
+
+            # Dernière occurrence gagnante si une clé est répétée dans le lot
+            key = values.get("id") or values["slug"]
+            if key in resolved:
+                resolved[key][1].update(values)
+            else:
+                resolved[key] = (line, values)
+
+        return list(resolved.values())
+
+    def _write(self, inserts, updates) -> None:
+        now = datetime.utcnow()
+        if inserts:
+            self.db.execute(insert(Product), [
+                {**values, "created_at": now, "updated_at": now} for _, values in inserts
+            ])
+        if updates:
+            # UPDATE groupé par clé primaire (executemany)
+            self.db.execute(update(Product), [
+                {**values, "updated_at": now} for _, values in updates
+            ])
+
+    def _write_one_by_one(self, inserts, updates, report):
+        """Réécrire un lot en échec ligne par ligne (SAVEPOINT par ligne)"""
+        written_inserts = [row for row in inserts if self._try_write([row], [], report)]
+        written_updates = [row for row in updates if self._try_write([], [row], report)]
+        self.db.commit()
+        return written_inserts, written_updates
+
+    def _try_write(self, inserts, updates, report) -> bool:
+        line, values = (inserts or updates)[0]
+        try:
+            with self.db.begin_nested():
+                self._write(inserts, updates)
+            return True
+        except IntegrityError as e:
+            self._add_error(report, line, values, f"Conflit d'intégrité: {e.orig}")
+            return False
+
+    def _reindex(self, product_ids: List[int]) -> None:
+        search = get_search_service(self.db)
+        for start in range(0, len(product_ids), self.batch_size):
+            chunk = product_ids[start:start + self.batch_size]
+            search.index_products(self.db.query(Product).filter(Product.id.in_(chunk)).all())
+
+    @staticmethod
+    def _add_error(report: Dict[str, Any], line: int, row: Dict[str, Any], message: str) -> None:
+        report["error_count"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({
+                "line": line,
+                "key": row.get("slug") or row.get("sku") or row.get("_sku") or row.get("name"),
+                "error": message
+            })
+
+
+class ProductExportService:
+    """
+    Export du catalogue en flux (CSV ou NDJSON)
+
+    Le générateur ouvre sa propre session: la session de la requête est
+    fermée avant l'envoi d'une StreamingResponse.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    def stream(self, file_format: str, include_inactive: bool = True) -> Iterator[str]:
+        rows = self._rows(include_inactive)
+        if file_format == "csv":
+            return self._to_csv(rows)
+        return (json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows)
+
+    def _rows(self, include_inactive: bool) -> Iterator[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            stmt = (
+                select(
+                    Product.id,
+                    Category.slug.label("category"),
+                    *(getattr(Product, field) for field in PRODUCT_FIELDS)
+                )
+                .outerjoin(Category, Category.id == Product.category_id)
+                .order_by(Product.id)
+            )
+            if not include_inactive:
+                stmt = stmt.where(Product.is_active == True)
+
+            # Curseur côté serveur sur PostgreSQL, lecture par paquets ailleurs
+            result = db.execute(stmt.execution_options(yield_per=self.batch_size))
+            for row in result:
+                yield row._asdict()
+        finally:
+            db.close()
+
+    def _to_csv(self, rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if count % self.batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+
+# Factory functions pour l'injection de dépendances
+def get_product_import_service(db: Session) -> ProductImportService:
+    """Factory pour créer une instance de ProductImportService"""
+    return ProductImportService(db)
+
+
+def get_product_export_service() -> ProductExportService:
+    """Factory pour créer une instance de ProductExportService"""
+    return ProductExportService()
@@ -0,0 +1,106 @@
+"""
+Projections des listes de produits (?view= et ?fields=)
+Principe Single Responsibility: Choisit les colonnes chargées et les champs renvoyés
+
+Une vue de liste ne lit que les colonnes nécessaires aux champs demandés
+(load_only): la description et la galerie d'images ne sont ni lues en base
+ni sérialisées pour une grille de cartes.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import joinedload, load_only
+
+from app.models.product import Category, Product
+
+
+def _category(product: Product) -> Optional[Dict[str, Any]]:
+    category = product.category
+    if category is None:
+        return None
+    return {"id": category.id, "name": category.name, "slug": category.slug}
+
+
+# Champ exposé -> (colonnes à charger, lecture de la valeur)
+PRODUCT_FIELDS: Dict[str, Tuple[Tuple[Any, ...], Callable[[Product], Any]]] = {
+    "id": ((Product.id,), lambda p: p.id),
+    "name": ((Product.name,), lambda p: p.name),
+    "description": ((Product.description,), lambda p: p.description),
+    "short_description": ((Product.short_description,), lambda p: p.short_description),
+    "slug": ((Product.slug,), lambda p: p.slug),
+    "price": ((Product.price,), lambda p: p.price),
+    "compare_at_price": ((Product.compare_at_price,), lambda p: p.compare_at_price),
+    "discount_percentage": (
+        (Product.price, Product.compare_at_price),
+        lambda p: p.discount_percentage
+    ),
+    "main_image_url": ((Product.main_image_url,), lambda p: p.main_image_url),
+    "gallery_images": ((Product.gallery_images,), lambda p: p.gallery_images),
+    "is_in_stock": (
+        (Product.track_inventory, Product.stock_quantity, Product.reserved_quantity, Product.allow_backorder),
+        lambda p: p.is_in_stock
+    ),
+    "is_active": ((Product.is_active,), lambda p: p.is_active),
+    # Stock disponible (hors unités réservées par des paniers en cours)
+    "stock_quantity": (
+        (Product.track_inventory, Product.stock_quantity, Product.reserved_quantity),
+        lambda p: p.available_quantity if p.track_inventory else None
+    ),
+    "is_featured": ((Product.is_featured,), lambda p: p.is_featured),
+    "category": ((Product.category_id,), _category),
+    "sales_count": ((Product.sales_count,), lambda p: p.sales_count),
+    "view_count": ((Product.view_count,), lambda p: p.view_count),
+}
+
+# Vues nommées: card pour les grilles, detail pour la liste complète (par défaut)
+PRODUCT_VIEWS: Dict[str, Tuple[str, ...]] = {
+    "card": ("id", "name", "slug", "price", "main_image_url", "is_in_stock"),
+    "detail": tuple(PRODUCT_FIELDS),
+}
+
+PRODUCT_VIEW_PATTERN = "^(" + "|".join(PRODUCT_VIEWS) + ")$"
+
+
+def resolve_fields(view: str = "detail", fields: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Champs à renvoyer: la liste fields (séparée par des virgules) si fournie,
+    sinon ceux de la vue. L'id est toujours inclus.
+
+    Lève ValueError pour un champ inconnu.
+    """
+    if not fields:
+        return PRODUCT_VIEWS[view]
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Champ(s) inconnu(s): {', '.join(unknown)}. "
+            f"Champs disponibles: {', '.join(PRODUCT_FIELDS)}"
+        )
+    # Ordre canonique: deux listes équivalentes partagent la même entrée de cache
+    selected = set(requested) | {"id"}
+    return tuple(name for name in PRODUCT_FIELDS if name in selected)
+
+
+def projection_options(fields: Iterable[str], extra_columns: Iterable[Any] = ()) -> List[Any]:
+    """
+    Options de chargement limitant le SELECT aux colonnes des champs demandés
+
+    extra_columns: colonnes lues en dehors de la projection (ex: clé de tri
+    du curseur de pagination).
+    """
+    fields = tuple(fields)
+    columns = {column for name in fields for column in PRODUCT_FIELDS[name][0]}
+    columns.update(extra_columns)
+    options = [load_only(*columns)]
+    if "category" in fields:
+        options.append(
+            joinedload(Product.category).load_only(Category.id, Category.name, Category.slug)
+        )
+    return options
+
+
+def project(product: Product, fields: Iterable[str]) -> Dict[str, Any]:
+    """Représentation d'un produit limitée aux champs demandés"""
+    return {name: PRODUCT_FIELDS[name][1](product) for name in fields}
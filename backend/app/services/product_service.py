@@ -3,12 +3,41 @@ Service Produits - Logique métier pour les produits
 Principe Single Responsibility: Gère uniquement la logique des produits
 """
 
+from datetime import datetime
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Numeric, or_, and_, case, cast, func, select, update
 
 from app.services.base import BaseService, BaseRepository
 from app.models.product import Product, Category
+from app.schemas.product import ProductBulkOperation
+from app.services.catalog_cache import products_changed
+from app.services.search_service import SearchService
+from app.services.view_counter import view_counter
+
+
+# Stratégies de chargement par usage (évite le N+1 lors de la sérialisation)
+# - listes: la catégorie est jointe dans la même requête
+# - fiche: catégorie et produits associés joints dans la même requête
+#   (quelques produits associés: la multiplication des lignes reste négligeable)
+PRODUCT_LIST_OPTIONS = (joinedload(Product.category),)
+PRODUCT_DETAIL_OPTIONS = (
+    joinedload(Product.category),
+    joinedload(Product.related_products),
+)
+
+
+def active_product_counts():
+    """Sous-requête agrégée: nombre de produits actifs par catégorie"""
+    return (
+        select(
+            Product.category_id.label("category_id"),
+            func.count(Product.id).label("product_count")
+        )
+        .where(Product.is_active == True)
+        .group_by(Product.category_id)
+        .subquery()
+    )
 
 
 class ProductRepository(BaseRepository[Product]):
@@ -18,10 +47,15 @@ class ProductRepository(BaseRepository[Product]):
         super().__init__(db, Product)
     
     def get_by_slug(self, slug: str) -> Optional[Product]:
-        return self.db.query(Product).filter(
+        return self.db.query(Product).options(*PRODUCT_DETAIL_OPTIONS).filter(
             and_(Product.slug == slug, Product.is_active == True)
         ).first()
     
+    def get_detail(self, product_id: int) -> Optional[Product]:
+        return self.db.query(Product).options(*PRODUCT_DETAIL_OPTIONS).filter(
+            Product.id == product_id
+        ).first()
+    
     def get_active(self, skip: int = 0, limit: int = 100) -> List[Product]:
         return self.db.query(Product).filter(
             Product.is_active == True
@@ -33,21 +67,15 @@ class ProductRepository(BaseRepository[Product]):
         ).all()
     
     def get_featured(self, limit: int = 8) -> List[Product]:
-        return self.db.query(Product).filter(
+        return self.db.query(Product).options(*PRODUCT_LIST_OPTIONS).filter(
             and_(Product.is_active == True, Product.is_featured == True)
         ).order_by(Product.sales_count.desc()).limit(limit).all()
     
     def search(self, query: str) -> List[Product]:
-        search_term = f"%{query}%"
-        return self.db.query(Product).filter(
-            and_(
-                Product.is_active == True,
-                or_(
-                    Product.name.ilike(search_term),
-                    Product.description.ilike(search_term)
-                )
-            )
-        ).all()
+        """Recherche plein texte, résultats triés par pertinence"""
+        products = self.db.query(Product).filter(Product.is_active == True)
+        products, rank = SearchService(self.db).apply(products, query)
+        return products.order_by(rank.desc(), Product.id.desc()).all()
     
     def get_low_stock(self, threshold: int = 10) -> List[Product]:
         return self.db.query(Product).filter(
@@ -76,13 +104,12 @@ class ProductService(BaseService):
     
     def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
         """Récupérer un produit avec ses détails"""
-        product = self.repository.get_by_id(product_id)
+        product = self.repository.get_detail(product_id)
         if not product or not product.is_active:
             return None
         
-        # Incrémenter le compteur de vues
-        product.view_count += 1
-        self.db.commit()
+        # Compter la vue (écriture différée)
+        view_counter.increment("product", product.id)
         
         return self._serialize_product(product, full=True)
     
@@ -92,9 +119,8 @@ class ProductService(BaseService):
         if not product:
             return None
         
-        # Incrémenter le compteur de vues
-        product.view_count += 1
-        self.db.commit()
+        # Compter la vue (écriture différée)
+        view_counter.increment("product", product.id)
         
         return self._serialize_product(product, full=True)
     
@@ -111,17 +137,14 @@ class ProductService(BaseService):
     ) -> Dict[str, Any]:
         """Récupérer les produits avec filtres"""
         
-        query = self.db.query(Product).filter(Product.is_active == True)
+        query = self.db.query(Product).options(*PRODUCT_LIST_OPTIONS).filter(Product.is_active == True)
+        rank = None
         
         if category_id:
             query = query.filter(Product.category_id == category_id)
         
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(or_(
-                Product.name.ilike(search_term),
-                Product.description.ilike(search_term)
-            ))
+            query, rank = SearchService(self.db).apply(query, search)
         
         if min_price is not None:
             query = query.filter(Product.price >= min_price)
@@ -136,10 +159,13 @@ class ProductService(BaseService):
             query = query.filter(
                 or_(
                     Product.track_inventory == False,
-                    Product.stock_quantity > 0
+                    Product.available_quantity > 0
                 )
             )
         
+        if rank is not None:
+            query = query.order_by(rank.desc(), Product.id.desc())
+        
         total = query.count()
         products = query.offset(skip).limit(limit).all()
         
@@ -168,23 +194,23 @@ class ProductService(BaseService):
         if not product.track_inventory:
             return {"available": True, "quantity_available": 999}
         
-        if product.stock_quantity >= quantity:
+        if product.available_quantity >= quantity:
             return {
                 "available": True,
-                "quantity_available": product.stock_quantity
+                "quantity_available": product.available_quantity
             }
         
         if product.allow_backorder:
             return {
                 "available": True,
                 "backorder": True,
-                "quantity_available": product.stock_quantity
+                "quantity_available": product.available_quantity
             }
         
         return {
             "available": False,
             "reason": "Stock insuffisant",
-            "quantity_available": product.stock_quantity
+            "quantity_available": product.available_quantity
         }
     
     def update_stock(self, product_id: int, quantity_change: int) -> bool:
@@ -213,6 +239,72 @@ class ProductService(BaseService):
         self.db.commit()
         return True
     
+    def bulk_update(self, operations: List[ProductBulkOperation]) -> Dict[str, Any]:
+        """
+        Appliquer des modifications en masse dans une seule transaction
+        
+        Chaque opération devient un UPDATE ... WHERE id IN (...) ensembliste
+        (les variations de prix et de stock sont calculées par la base).
+        Le cache du catalogue est invalidé une seule fois après le commit.
+        """
+        requested = {product_id for operation in operations for product_id in operation.product_ids}
+        existing = {
+            row.id for row in self.db.query(Product.id).filter(Product.id.in_(requested)).all()
+        }
+        
+        category_ids = {
+            operation.patch.category_id for operation in operations
+            if operation.patch.category_id is not None
+        }
+        if category_ids:
+            found = self.db.query(func.count(Category.id)).filter(Category.id.in_(category_ids)).scalar()
+            if found != len(category_ids):
+                raise ValueError("Catégorie inconnue dans les modifications")
+        
+        now = datetime.utcnow()
+        updated_rows = 0
+        try:
+            for operation in operations:
+                product_ids = [product_id for product_id in operation.product_ids if product_id in existing]
+                if not product_ids:
+                    continue
+                
+                values = operation.patch.model_dump(exclude_unset=True)
+                
+                if operation.price_adjustment_percent is not None:
+                    factor = 1 + operation.price_adjustment_percent / 100
+                    values["price"] = func.round(cast(Product.price * factor, Numeric), 2)
+                    if operation.keep_original_price:
+                        # Prix barré = prix d'origine (conservé si une promo est déjà en cours)
+                        values["compare_at_price"] = func.coalesce(Product.compare_at_price, Product.price)
+                
+                if operation.stock_adjustment is not None:
+                    new_stock = func.coalesce(Product.stock_quantity, 0) + operation.stock_adjustment
+                    values["stock_quantity"] = case((new_stock < 0, 0), else_=new_stock)
+                
+                values["updated_at"] = now
+                result = self.db.execute(
+                    update(Product)
+                    .where(Product.id.in_(product_ids))
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                updated_rows += result.rowcount
+            
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        if existing:
+            products_changed(existing)
+        
+        return {
+            "products": len(existing),
+            "updated_rows": updated_rows,
+            "not_found": sorted(requested - existing)
+        }
+    
     def calculate_discount(self, product: Product) -> float:
         """Calculer le pourcentage de remise"""
         if product.compare_at_price and product.compare_at_price > product.price:
@@ -258,12 +350,12 @@ class ProductService(BaseService):
         if full:
             data.update({
                 "description": product.description,
-                "stock_quantity": product.stock_quantity if product.track_inventory else None,
+                "stock_quantity": product.available_quantity if product.track_inventory else None,
                 "track_inventory": product.track_inventory,
                 "allow_backorder": product.allow_backorder,
                 "product_type": product.product_type,
                 "gallery_images": product.gallery_images,
-                "view_count": product.view_count,
+                "view_count": (product.view_count or 0) + view_counter.pending("product", product.id),
                 "related_products": [
                     {
                         "id": r.id,
@@ -0,0 +1,242 @@
+"""
+Service Recommandations - "Souvent achetés ensemble" par co-occurrence
+Principe Single Responsibility: Calcule et sert les voisins de chaque produit
+
+Matrice creuse produit × produit construite à partir des commandes payées:
+- les comptages de paires sont agrégés par la base (une seule requête
+  groupée) lors de la construction, puis tenus à jour en mémoire à chaque
+  commande payée, sans relire l'historique;
+- le score d'un voisin est le lift (co-achats observés / co-achats attendus
+  si les produits étaient indépendants) ou la similarité cosinus;
+- le top-k de chaque produit est précalculé: une fiche produit le lit en O(1).
+"""
+
+import heapq
+import logging
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.models.order import Order, OrderItem, PaymentStatus
+from app.services.catalog_cache import products_changed
+
+logger = logging.getLogger(__name__)
+
+# Nombre de voisins précalculés par produit
+TOP_K = 20
+
+
+class CooccurrenceModel:
+    """
+    Matrice de co-occurrence et voisins précalculés
+
+    Usage:
+        recommendation_model.neighbours(product_id, limit=5)
+        -> [(related_id, score, co_count), ...]
+    """
+
+    def __init__(self, metric: str = "lift", min_support: int = 2, top_k: int = TOP_K):
+        self.metric = metric
+        self.min_support = min_support
+        self.top_k = top_k
+        self._lock = threading.RLock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self.order_count = 0
+        self.item_counts: Dict[int, int] = {}
+        self.pair_counts: Dict[int, Dict[int, int]] = {}
+        self.orders: Set[int] = set()
+        self._top: Dict[int, List[Tuple[int, float, int]]] = {}
+
+    # ----- Lecture -----
+
+    def neighbours(self, product_id: int, limit: int = 5, min_count: int = 0) -> List[Tuple[int, float, int]]:
+        """Voisins précalculés d'un produit, du plus au moins pertinent"""
+        top = self._top.get(product_id, ())
+        if min_count:
+            top = [entry for entry in top if entry[2] >= min_count]
+        return list(top[:limit])
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "metric": self.metric,
+                "min_support": self.min_support,
+                "orders": self.order_count,
+                "products": len(self.item_counts),
+                "pairs": sum(len(row) for row in self.pair_counts.values()) // 2,
+                "products_with_neighbours": len(self._top),
+            }
+
+    # ----- Construction -----
+
+    def load(
+        self,
+        order_ids: Iterable[int],
+        item_counts: Iterable[Tuple[int, int]],
+        pair_counts: Iterable[Tuple[int, int, int]]
+    ) -> None:
+        """Charger des comptages agrégés (construction complète)"""
+        with self._lock:
+            self._reset()
+            self.orders = set(order_ids)
+            self.order_count = len(self.orders)
+            self.item_counts = dict(item_counts)
+            for left, right, count in pair_counts:
+                self.pair_counts.setdefault(left, {})[right] = count
+                self.pair_counts.setdefault(right, {})[left] = count
+            for product_id in self.pair_counts:
+                self._rank(product_id)
+            self.loaded = True
+
+    def add_order(self, order_id: int, product_ids: Iterable[int]) -> Set[int]:
+        """
+        Ajouter une commande payée (idempotent)
+
+        Retourne les produits dont les voisins ont été recalculés.
+        """
+        basket = sorted(set(product_ids))
+        with self._lock:
+            if order_id in self.orders:
+                return set()
+            self.orders.add(order_id)
+            self.order_count += 1
+
+            for product_id in basket:
+                self.item_counts[product_id] = self.item_counts.get(product_id, 0) + 1
+            for i, left in enumerate(basket):
+                for right in basket[i + 1:]:
+                    row = self.pair_counts.setdefault(left, {})
+                    row[right] = row.get(right, 0) + 1
+                    row = self.pair_counts.setdefault(right, {})
+                    row[left] = row.get(left, 0) + 1
+
+            # Le lift dépend du nombre total de commandes: seuls les produits
+            # du panier et leurs voisins directs voient leur classement changer
+            # de façon significative; les autres sont rafraîchis au prochain build
+            affected = set(basket)
+            for product_id in basket:
+                affected.update(self.pair_counts.get(product_id, ()))
+            for product_id in affected:
+                self._rank(product_id)
+            return affected
+
+    # ----- Scores -----
+
+    def score(self, left: int, right: int) -> float:
+        co_count = self.pair_counts.get(left, {}).get(right, 0)
+        if not co_count:
+            return 0.0
+        left_count = self.item_counts.get(left, 0)
+        right_count = self.item_counts.get(right, 0)
+        if not left_count or not right_count:
+            return 0.0
+        if self.metric == "cosine":
+            return co_count / math.sqrt(left_count * right_count)
+        return co_count * self.order_count / (left_count * right_count)
+
+    def _rank(self, product_id: int) -> None:
+        candidates = (
+            (self.score(product_id, other), count, other)
+            for other, count in self.pair_counts.get(product_id, {}).items()
+            if count >= self.min_support
+        )
+        # Départage par nombre de co-achats puis par id (ordre stable)
+        best = heapq.nlargest(self.top_k, candidates, key=lambda c: (c[0], c[1], -c[2]))
+        if best:
+            self._top[product_id] = [(other, round(score, 4), count) for score, count, other in best]
+        else:
+            self._top.pop(product_id, None)
+
+
+class RecommendationService:
+    """Construction du modèle depuis la base et mise à jour à chaque paiement"""
+
+    def __init__(self, db: Session, model: Optional[CooccurrenceModel] = None):
+        self.db = db
+        self.model = model or recommendation_model
+
+    def rebuild(self) -> Dict[str, object]:
+        """Reconstruire la matrice (comptages agrégés par la base)"""
+        paid_orders = (
+            self.db.query(Order.id)
+            .filter(Order.payment_status == PaymentStatus.PAID)
+            .subquery()
+        )
+
+        order_ids = [
+            row.order_id for row in
+            self.db.query(OrderItem.order_id)
+            .join(paid_orders, paid_orders.c.id == OrderItem.order_id)
+            .filter(OrderItem.product_id != None)
+            .distinct()
+        ]
+
+        item_counts = (
+            self.db.query(OrderItem.product_id, func.count(func.distinct(OrderItem.order_id)))
+            .join(paid_orders, paid_orders.c.id == OrderItem.order_id)
+            .filter(OrderItem.product_id != None)
+            .group_by(OrderItem.product_id)
+            .all()
+        )
+
+        other = aliased(OrderItem)
+        pair_counts = (
+            self.db.query(
+                OrderItem.product_id,
+                other.product_id,
+                func.count(func.distinct(OrderItem.order_id))
+            )
+            .join(other, (other.order_id == OrderItem.order_id) & (other.product_id > OrderItem.product_id))
+            .join(paid_orders, paid_orders.c.id == OrderItem.order_id)
+            .group_by(OrderItem.product_id, other.product_id)
+            .all()
+        )
+
+        self.model.load(order_ids, item_counts, pair_counts)
+        stats = self.model.stats()
+        logger.info(f"Recommandations reconstruites: {stats}")
+        return stats
+
+    def ensure_loaded(self) -> None:
+        if not self.model.loaded:
+            self.rebuild()
+
+    def record_paid_order(self, order_id: int) -> None:
+        """Intégrer une commande qui vient d'être payée"""
+        if not self.model.loaded:
+            self.rebuild()
+            return
+
+        product_ids = [
+            row.product_id for row in
+            self.db.query(OrderItem.product_id)
+            .filter(OrderItem.order_id == order_id, OrderItem.product_id != None)
+            .distinct()
+        ]
+        affected = self.model.add_order(order_id, product_ids)
+        if affected:
+            products_changed(affected, listings=False)
+
+    def neighbours(self, product_id: int, limit: int = 5, min_count: int = 0) -> List[Tuple[int, float, int]]:
+        self.ensure_loaded()
+        return self.model.neighbours(product_id, limit, min_count)
+
+
+# Instance partagée par le processus
+recommendation_model = CooccurrenceModel(
+    metric=settings.RECOMMENDATION_METRIC,
+    min_support=settings.RECOMMENDATION_MIN_SUPPORT
+)
+
+
+# Factory function pour l'injection de dépendances
+def get_recommendation_service(db: Session) -> RecommendationService:
+    """Factory pour créer une instance de RecommendationService"""
+    return RecommendationService(db)
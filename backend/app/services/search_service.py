@@ -0,0 +1,537 @@
+"""
+Service Recherche - Index plein texte du catalogue
+Principe Single Responsibility: Gère uniquement l'indexation et la recherche des produits
+
+Deux modes de recherche:
+- fulltext: tous les termes doivent apparaître (le dernier en préfixe);
+- fuzzy: tolérant aux fautes de frappe, par similarité de trigrammes
+  (pg_trgm et index GIN sur PostgreSQL, index de trigrammes du vocabulaire
+  en mémoire ailleurs). Le mode fuzzy propose aussi une correction
+  ("Vouliez-vous dire ...").
+"""
+
+import logging
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, false, func, literal, select, text
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models.product import Product
+from app.models.search import ProductSearchDocument, TRIGRAM_INDEX
+
+logger = logging.getLogger(__name__)
+
+# Configuration plein texte PostgreSQL (pas de stemming: les accents sont déjà retirés)
+TS_CONFIG = "simple"
+
+# Pondération des champs (A > B > C sur PostgreSQL)
+FIELD_WEIGHTS = {
+    "name": ("A", 3.0),
+    "short_description": ("B", 2.0),
+    "description": ("C", 1.0),
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+SEARCH_MODE_PATTERN = "^(fulltext|fuzzy)$"
+
+# Seuil de similarité d'un terme avec un mot du catalogue (mode fuzzy)
+FUZZY_THRESHOLD = 0.5
+
+# Seuil pour proposer une correction, et nombre maximal de termes corrigés
+CORRECTION_THRESHOLD = 0.3
+MAX_CORRECTED_TERMS = 5
+
+
+def fold_accents(text: Optional[str]) -> str:
+    """Normaliser un texte: minuscules et suppression des accents ("Mèches" -> "meches")"""
+    if not text:
+        return ""
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in normalized if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Découper un texte normalisé en termes"""
+    return _TOKEN_RE.findall(fold_accents(text))
+
+
+def trigrams(word: str) -> Set[str]:
+    """Trigrammes d'un mot, avec le même bourrage que pg_trgm ("  m", " me", ...)"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(left: str, right: str) -> float:
+    """Similarité de trigrammes (équivalent de similarity() de pg_trgm)"""
+    left_grams, right_grams = trigrams(left), trigrams(right)
+    return len(left_grams & right_grams) / len(left_grams | right_grams)
+
+
+class InMemorySearchIndex:
+    """
+    Index inversé en mémoire
+
+    Utilisé quand la base n'est pas PostgreSQL (SQLite en développement).
+    Chaque terme pointe vers {product_id: poids}; le dernier terme de la
+    requête est traité comme un préfixe, comme sur PostgreSQL.
+    Un second index trigramme -> termes du vocabulaire sert à la recherche
+    tolérante aux fautes et aux corrections.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._terms_by_product: Dict[int, List[str]] = {}
+        self._sorted_terms: List[str] = []
+        self._terms_dirty = False
+        self.loaded = False
+
+    def add(self, product_id: int, fields: Dict[str, Optional[str]]) -> None:
+        """Indexer (ou réindexer) un produit"""
+        with self._lock:
+            self._remove_unlocked(product_id)
+            weights: Dict[str, float] = {}
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS.get(field, ("D", 1.0))[1]
+                for term in tokenize(text):
+                    weights[term] = weights.get(term, 0) + weight
+            for term, weight in weights.items():
+                if term not in self._postings:
+                    self._postings[term] = {}
+                    self._terms_dirty = True
+                    for gram in trigrams(term):
+                        self._grams.setdefault(gram, set()).add(term)
+                self._postings[term][product_id] = weight
+            self._terms_by_product[product_id] = list(weights)
+
+    def remove(self, product_id: int) -> None:
+        """Retirer un produit de l'index"""
+        with self._lock:
+            self._remove_unlocked(product_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._grams.clear()
+            self._terms_by_product.clear()
+            self._sorted_terms = []
+            self._terms_dirty = False
+            self.loaded = False
+
+    def search(self, query: str) -> Dict[int, float]:
+        """Rechercher les produits contenant tous les termes, avec leur score"""
+        terms = tokenize(query)
+        return self._score(
+            terms,
+            lambda position, term: [
+                (candidate, 1.0)
+                for candidate in self._expand(term, position == len(terms) - 1)
+            ]
+        )
+
+    def fuzzy_search(self, query: str, threshold: float = FUZZY_THRESHOLD) -> Dict[int, float]:
+        """
+        Rechercher en tolérant les fautes: chaque terme doit être proche
+        d'au moins un mot du produit; le score est pondéré par la similarité
+        """
+        return self._score(
+            tokenize(query),
+            lambda position, term: self.similar_terms(term, threshold)
+        )
+
+    def similar_terms(self, term: str, threshold: float) -> List[Tuple[str, float]]:
+        """
+        Termes du vocabulaire proches d'un terme saisi
+
+        Le score est la part des trigrammes du terme présents dans le mot
+        (approximation de word_similarity de pg_trgm): "vit" est proche de
+        "vitamine", "bresilienne" de "bresiliennes".
+        """
+        grams = trigrams(term)
+        with self._lock:
+            shared: Counter = Counter()
+            for gram in grams:
+                shared.update(self._grams.get(gram, ()))
+        return [
+            (candidate, count / len(grams))
+            for candidate, count in shared.items()
+            if count / len(grams) >= threshold
+        ]
+
+    def correct(self, query: str, threshold: float = CORRECTION_THRESHOLD) -> Optional[str]:
+        """Requête corrigée terme à terme, ou None si tous les termes sont connus"""
+        terms = tokenize(query)
+        corrected = []
+        with self._lock:
+            for position, term in enumerate(terms):
+                if term in self._postings or position >= MAX_CORRECTED_TERMS:
+                    corrected.append(term)
+                    continue
+                candidates = [
+                    (similarity(term, candidate), len(self._postings[candidate]), candidate)
+                    for candidate, _ in self.similar_terms(term, threshold)
+                ]
+                best = max(candidates, default=None)
+                corrected.append(best[2] if best and best[0] >= threshold else term)
+        return " ".join(corrected) if corrected != terms else None
+
+    def _score(
+        self,
+        terms: List[str],
+        expand: Callable[[int, str], List[Tuple[str, float]]]
+    ) -> Dict[int, float]:
+        """Produits correspondant à tous les termes, score tf-idf pondéré"""
+        if not terms:
+            return {}
+
+        with self._lock:
+            total = max(len(self._terms_by_product), 1)
+            scores: Optional[Dict[int, float]] = None
+
+            for position, term in enumerate(terms):
+                term_scores: Dict[int, float] = {}
+                for candidate, factor in expand(position, term):
+                    postings = self._postings[candidate]
+                    idf = math.log(1 + total / len(postings))
+                    for product_id, weight in postings.items():
+                        term_scores[product_id] = max(
+                            term_scores.get(product_id, 0), weight * idf * factor
+                        )
+
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        product_id: score + term_scores[product_id]
+                        for product_id, score in scores.items()
+                        if product_id in term_scores
+                    }
+                if not scores:
+                    return {}
+
+            return scores or {}
+
+    def _expand(self, term: str, is_prefix: bool) -> List[str]:
+        """Termes de l'index correspondant à un terme de requête"""
+        if not is_prefix:
+            return [term] if term in self._postings else []
+
+        if self._terms_dirty:
+            self._sorted_terms = sorted(self._postings)
+            self._terms_dirty = False
+
+        matches = []
+        start = bisect_left(self._sorted_terms, term)
+        for candidate in self._sorted_terms[start:]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def _remove_unlocked(self, product_id: int) -> None:
+        for term in self._terms_by_product.pop(product_id, []):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+                for gram in trigrams(term):
+                    terms = self._grams.get(gram)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._grams[gram]
+
+
+# Index partagé par le processus (repli hors PostgreSQL)
+memory_index = InMemorySearchIndex()
+
+
+class SearchService:
+    """
+    Service de recherche plein texte des produits
+
+    Responsabilités:
+    - Maintenir les documents de recherche (texte sans accents, tsvector pondéré)
+    - Traduire une saisie utilisateur en filtre et en score de pertinence
+
+    Principe: Open/Closed
+    PostgreSQL utilise un tsvector indexé en GIN (et pg_trgm pour le mode
+    fuzzy); les autres bases utilisent l'index inversé en mémoire, sans
+    changer l'interface des appelants.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.is_postgres = db.get_bind().dialect.name == "postgresql"
+
+    # ----- Indexation -----
+
+    def index_product(self, product: Product) -> None:
+        """Indexer un produit après création ou modification"""
+        self.index_products([product])
+
+    def index_products(self, products: Iterable[Product]) -> int:
+        """Indexer un lot de produits en une seule requête d'upsert"""
+        products = list(products)
+        rows = [self._build_row(product) for product in products]
+        if not rows:
+            return 0
+
+        # Champs lus avant le commit (qui expire les objets de la session)
+        fields = [(product.id, self._fields(product)) for product in products]
+
+        insert = pg_insert if self.is_postgres else sqlite_insert
+        stmt = insert(ProductSearchDocument).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProductSearchDocument.product_id],
+            set_={
+                "name_folded": stmt.excluded.name_folded,
+                "document": stmt.excluded.document,
+                "search_vector": stmt.excluded.search_vector,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+
+        if not self.is_postgres and memory_index.loaded:
+            for product_id, product_fields in fields:
+                memory_index.add(product_id, product_fields)
+
+        return len(rows)
+
+    def remove_product(self, product_id: int) -> None:
+        """Retirer un produit de l'index (suppression définitive)"""
+        self.db.query(ProductSearchDocument).filter(
+            ProductSearchDocument.product_id == product_id
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        memory_index.remove(product_id)
+
+    def ensure_index(self, rebuild: bool = False, batch_size: int = 500) -> int:
+        """
+        Indexer les produits qui n'ont pas encore de document
+
+        Appelé au démarrage: les produits insérés par les scripts de fixtures
+        sont ainsi rattrapés. rebuild=True réindexe tout le catalogue.
+        """
+        query = self.db.query(Product.id)
+        if not rebuild:
+            query = query.outerjoin(
+                ProductSearchDocument,
+                ProductSearchDocument.product_id == Product.id
+            ).filter(ProductSearchDocument.product_id.is_(None))
+        product_ids = [row.id for row in query.order_by(Product.id).all()]
+
+        indexed = 0
+        for start in range(0, len(product_ids), batch_size):
+            batch = self.db.query(Product).filter(
+                Product.id.in_(product_ids[start:start + batch_size])
+            ).all()
+            indexed += self.index_products(batch)
+
+        if self.is_postgres:
+            self._ensure_trigram_index()
+        else:
+            self._load_memory_index()
+
+        return indexed
+
+    # ----- Recherche -----
+
+    def apply(self, query: Query, term: str, mode: str = "fulltext") -> Tuple[Query, object]:
+        """
+        Filtrer une requête Product sur une saisie utilisateur
+
+        Retourne la requête filtrée et l'expression de score de pertinence
+        à utiliser dans ORDER BY.
+        """
+        if mode == "fuzzy":
+            return self._apply_fuzzy(query, term)
+
+        if self.is_postgres:
+            tsquery = self._tsquery(term)
+            if tsquery is None:
+                return query.filter(false()), literal(0)
+            query = query.join(
+                ProductSearchDocument,
+                ProductSearchDocument.product_id == Product.id
+            ).filter(ProductSearchDocument.search_vector.op("@@")(tsquery))
+            return query, func.ts_rank_cd(ProductSearchDocument.search_vector, tsquery)
+
+        scores = self.score(term)
+        if not scores:
+            return query.filter(false()), literal(0)
+        rank = case(scores, value=Product.id, else_=0)
+        return query.filter(Product.id.in_(list(scores))), rank
+
+    def score(self, term: str) -> Dict[int, float]:
+        """Scores de pertinence calculés par l'index en mémoire"""
+        if not memory_index.loaded:
+            self._load_memory_index()
+        return memory_index.search(term)
+
+    def search_ids(self, term: str, limit: int = 50, mode: str = "fulltext") -> List[int]:
+        """Identifiants des produits actifs les plus pertinents"""
+        query = self.db.query(Product.id).filter(Product.is_active == True)
+        query, rank = self.apply(query, term, mode)
+        return [row.id for row in query.order_by(rank.desc(), Product.id).limit(limit).all()]
+
+    def did_you_mean(self, term: str) -> Optional[str]:
+        """
+        Correction proposée pour une saisie ("serun vitamin" -> "serum vitamine")
+
+        Chaque terme inconnu du catalogue est remplacé par le mot le plus
+        proche; None si la saisie ne contient aucun terme à corriger.
+        """
+        if not self.is_postgres:
+            if not memory_index.loaded:
+                self._load_memory_index()
+            return memory_index.correct(term)
+
+        terms = tokenize(term)
+        if not terms:
+            return None
+
+        self._set_word_similarity_threshold(CORRECTION_THRESHOLD)
+        corrected = []
+        for position, word in enumerate(terms):
+            if position >= MAX_CORRECTED_TERMS:
+                corrected.append(word)
+                continue
+            # Documents les plus proches (filtre %> servi par l'index GIN trigramme)
+            documents = self.db.query(ProductSearchDocument.document).filter(
+                ProductSearchDocument.document.op("%>")(word)
+            ).order_by(
+                func.word_similarity(word, ProductSearchDocument.document).desc()
+            ).limit(5).all()
+
+            vocabulary = {token for row in documents for token in tokenize(row.document)}
+            if word in vocabulary or not vocabulary:
+                corrected.append(word)
+                continue
+            score, best = max((similarity(word, token), token) for token in vocabulary)
+            corrected.append(best if score >= CORRECTION_THRESHOLD else word)
+
+        return " ".join(corrected) if corrected != terms else None
+
+    # ----- Interne -----
+
+    def _apply_fuzzy(self, query: Query, term: str) -> Tuple[Query, object]:
+        """Recherche tolérante aux fautes (similarité de trigrammes)"""
+        terms = tokenize(term)
+        if not terms:
+            return query.filter(false()), literal(0)
+
+        if self.is_postgres:
+            # Chaque terme doit être proche d'un mot du document: les
+            # conditions %> sont combinées par l'index GIN trigramme, le nom
+            # compte double dans le score
+            self._set_word_similarity_threshold(FUZZY_THRESHOLD)
+            query = query.join(
+                ProductSearchDocument,
+                ProductSearchDocument.product_id == Product.id
+            )
+            rank = None
+            for word in terms:
+                query = query.filter(ProductSearchDocument.document.op("%>")(word))
+                score = (
+                    2 * func.word_similarity(word, ProductSearchDocument.name_folded)
+                    + func.word_similarity(word, ProductSearchDocument.document)
+                )
+                rank = score if rank is None else rank + score
+            return query, rank
+
+        if not memory_index.loaded:
+            self._load_memory_index()
+        scores = memory_index.fuzzy_search(term)
+        if not scores:
+            return query.filter(false()), literal(0)
+        rank = case(scores, value=Product.id, else_=0)
+        return query.filter(Product.id.in_(list(scores))), rank
+
+    def _set_word_similarity_threshold(self, threshold: float) -> None:
+        """Seuil de l'opérateur %> pour la transaction en cours"""
+        self.db.execute(select(
+            func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True)
+        ))
+
+    def _ensure_trigram_index(self) -> None:
+        """
+        Activer pg_trgm et créer l'index trigramme sur une base existante
+
+        create_all ne crée pas les index des tables déjà présentes.
+        """
+        try:
+            self.db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            self.db.commit()
+            TRIGRAM_INDEX.create(self.db.get_bind(), checkfirst=True)
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Index trigramme indisponible (recherche fuzzy désactivée): {e}")
+
+    def _tsquery(self, term: str):
+        terms = tokenize(term)
+        if not terms:
+            return None
+        # Les termes ne contiennent que [a-z0-9]: pas d'échappement nécessaire
+        parts = terms[:-1] + [f"{terms[-1]}:*"]
+        return func.to_tsquery(TS_CONFIG, " & ".join(parts))
+
+    def _fields(self, product: Product) -> Dict[str, Optional[str]]:
+        return {field: getattr(product, field) for field in FIELD_WEIGHTS}
+
+    def _build_row(self, product: Product) -> dict:
+        fields = self._fields(product)
+        document = " ".join(fold_accents(text) for text in fields.values() if text)
+
+        search_vector = None
+        if self.is_postgres:
+            for field, (weight, _) in FIELD_WEIGHTS.items():
+                part = func.setweight(
+                    func.to_tsvector(TS_CONFIG, fold_accents(fields[field])),
+                    weight
+                )
+                search_vector = part if search_vector is None else search_vector.op("||")(part)
+
+        return {
+            "product_id": product.id,
+            "name_folded": fold_accents(product.name)[:200],
+            "document": document,
+            "search_vector": search_vector,
+            "updated_at": datetime.utcnow(),
+        }
+
+    def _load_memory_index(self) -> None:
+        """Construire l'index en mémoire à partir du catalogue"""
+        memory_index.clear()
+        rows = self.db.query(
+            Product.id, Product.name, Product.short_description, Product.description
+        ).all()
+        for row in rows:
+            memory_index.add(row.id, {
+                "name": row.name,
+                "short_description": row.short_description,
+                "description": row.description,
+            })
+        memory_index.loaded = True
+
+
+# Factory function pour l'injection de dépendances
+def get_search_service(db: Session) -> SearchService:
+    """Factory pour créer une instance de SearchService"""
+    return SearchService(db)
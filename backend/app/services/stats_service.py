@@ -0,0 +1,182 @@
+"""
+Service Statistiques - Compteurs des tableaux de bord admin
+Principe Single Responsibility: Calcule les statistiques agrégées de chaque module
+
+Chaque statistique est une seule requête d'agrégation conditionnelle
+(COUNT(*) FILTER (WHERE ...), SUM(...) FILTER (WHERE ...)) au lieu d'un
+COUNT par compteur. "Aujourd'hui" est un intervalle [minuit, minuit + 1 jour[
+sur la colonne brute (utilisable par un index), jamais func.date(colonne).
+
+Les résultats sont gardés ADMIN_STATS_TTL_SECONDS dans stats_cache: un
+tableau de bord ouvert par plusieurs admins coûte une requête par TTL et
+par statistique (calcul single-flight, voir TaggedCache.get_or_set).
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Tuple
+
+from sqlalchemy import func, true
+from sqlalchemy.orm import Session
+
+from app.core.cache import TaggedCache
+from app.core.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.chat import ChatConversation, ChatStatus
+from app.models.invoice import CustomerInvoice
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.subscription import BillingInterval, Subscription, SubscriptionStatus
+from app.models.supplier import SupplierInvoice
+
+# Instance partagée par le processus (quelques entrées: une par statistique)
+stats_cache = TaggedCache(max_entries=32, ttl=settings.ADMIN_STATS_TTL_SECONDS)
+
+
+def today_range() -> Tuple[datetime, datetime]:
+    """Début et fin (exclue) de la journée UTC en cours"""
+    start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def _count(condition=None):
+    """COUNT(*), filtré si une condition est donnée"""
+    count = func.count()
+    return count.filter(condition) if condition is not None else count
+
+
+def _sum(column, condition):
+    """SUM(colonne) FILTER (WHERE condition), 0 si aucune ligne"""
+    return func.coalesce(func.sum(column).filter(condition), 0)
+
+
+def _rate(part: int, other: int) -> float:
+    """Pourcentage part / (part + other), arrondi à 2 décimales"""
+    return round(part / (part + other) * 100, 2) if part + other else 0
+
+
+class StatsService:
+    """
+    Service métier des statistiques admin
+
+    Responsabilités:
+    - Une requête par statistique (commandes, chat, rendez-vous, abonnements, factures)
+    - Mise en cache courte des résultats
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _cached(self, name: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        return stats_cache.get_or_set(name, loader)
+
+    def order_stats(self) -> Dict[str, Any]:
+        return self._cached("orders", self._order_stats)
+
+    def chat_stats(self) -> Dict[str, Any]:
+        return self._cached("chat", self._chat_stats)
+
+    def appointment_stats(self) -> Dict[str, Any]:
+        return self._cached("appointments", self._appointment_stats)
+
+    def subscription_stats(self) -> Dict[str, Any]:
+        return self._cached("subscriptions", self._subscription_stats)
+
+    def invoice_stats(self) -> Dict[str, Any]:
+        return self._cached("invoices", self._invoice_stats)
+
+    # ----- Requêtes -----
+
+    def _order_stats(self) -> Dict[str, Any]:
+        start, end = today_range()
+        paid = Order.payment_status == PaymentStatus.PAID
+        today = (Order.created_at >= start) & (Order.created_at < end)
+
+        row = self.db.query(
+            _count().label("total_orders"),
+            _sum(Order.total_amount, paid).label("total_revenue"),
+            _count(Order.status == OrderStatus.PENDING).label("pending_orders"),
+            _count(Order.status == OrderStatus.CONFIRMED).label("confirmed_orders"),
+            _count(today).label("today_orders"),
+            _sum(Order.total_amount, today & paid).label("today_revenue")
+        ).select_from(Order).one()
+        return dict(row._mapping)
+
+    def _chat_stats(self) -> Dict[str, Any]:
+        start, end = today_range()
+
+        row = self.db.query(
+            _count().label("total_conversations"),
+            _count(ChatConversation.status == ChatStatus.OPEN).label("open_conversations"),
+            _count(
+                (ChatConversation.created_at >= start) & (ChatConversation.created_at < end)
+            ).label("today_conversations"),
+            func.avg(ChatConversation.rating).label("average_rating")
+        ).select_from(ChatConversation).one()
+        stats = dict(row._mapping)
+        stats["average_rating"] = round(float(row.average_rating), 2) if row.average_rating else 0
+        return stats
+
+    def _appointment_stats(self) -> Dict[str, Any]:
+        start, end = today_range()
+
+        row = self.db.query(
+            _count().label("total_appointments"),
+            _count(Appointment.status == AppointmentStatus.PENDING).label("pending_appointments"),
+            _count(Appointment.status == AppointmentStatus.CONFIRMED).label("confirmed_appointments"),
+            _count(
+                (Appointment.scheduled_date >= start) & (Appointment.scheduled_date < end)
+            ).label("today_appointments"),
+            _count(Appointment.status == AppointmentStatus.NO_SHOW).label("no_shows"),
+            _count(Appointment.status == AppointmentStatus.COMPLETED).label("completed")
+        ).select_from(Appointment).one()
+        return {
+            "total_appointments": row.total_appointments,
+            "pending_appointments": row.pending_appointments,
+            "confirmed_appointments": row.confirmed_appointments,
+            "today_appointments": row.today_appointments,
+            "no_show_rate": _rate(row.no_shows, row.completed)
+        }
+
+    def _subscription_stats(self) -> Dict[str, Any]:
+        active = Subscription.status == SubscriptionStatus.ACTIVE
+
+        row = self.db.query(
+            _count().label("total_subscriptions"),
+            _count(active).label("active_subscriptions"),
+            _count(Subscription.status == SubscriptionStatus.CANCELLED).label("cancelled_subscriptions"),
+            # Revenus récurrents mensuels (MRR)
+            _sum(
+                Subscription.amount, active & (Subscription.billing_interval == BillingInterval.MONTHLY)
+            ).label("monthly_recurring_revenue")
+        ).select_from(Subscription).one()
+        stats = dict(row._mapping)
+        # Taux de rétention (approximatif)
+        stats["retention_rate"] = _rate(row.active_subscriptions, row.cancelled_subscriptions)
+        return stats
+
+    def _invoice_stats(self) -> Dict[str, Any]:
+        # Un agrégat par table, réunis en une seule ligne (une requête)
+        customer = self.db.query(
+            _count().label("total"),
+            _sum(CustomerInvoice.total_amount, CustomerInvoice.is_paid == True).label("total_revenue"),
+            _count(CustomerInvoice.is_paid == False).label("pending")
+        ).select_from(CustomerInvoice).subquery()
+        supplier = self.db.query(
+            _count().label("total"),
+            _sum(SupplierInvoice.total_amount, SupplierInvoice.is_paid == True).label("total_expenses"),
+            _count(SupplierInvoice.is_paid == False).label("pending")
+        ).select_from(SupplierInvoice).subquery()
+
+        row = self.db.query(customer, supplier).select_from(customer).join(supplier, true()).one()
+        customer_stats = {"total": row[0], "total_revenue": row[1], "pending": row[2]}
+        supplier_stats = {"total": row[3], "total_expenses": row[4], "pending": row[5]}
+        return {
+            "customer_invoices": customer_stats,
+            "supplier_invoices": supplier_stats,
+            "net_profit": customer_stats["total_revenue"] - supplier_stats["total_expenses"]
+        }
+
+
+# Factory function pour l'injection de dépendances
+def get_stats_service(db: Session) -> StatsService:
+    """Factory pour créer une instance de StatsService"""
+    return StatsService(db)
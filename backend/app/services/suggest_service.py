@@ -0,0 +1,214 @@
+"""
+Service Suggestions - Autocomplétion de la barre de recherche
+Principe Single Responsibility: Index de préfixes des noms de produits et de services
+
+L'index est un tableau trié de (mot normalisé, type, id): un préfixe saisi
+correspond à une plage contiguë trouvée par dichotomie, sans requête SQL.
+Chaque mot du nom est indexé, "vit" trouve donc "Sérum vitamine C".
+Les suggestions sont classées par popularité (sales_count pour les
+produits, booking_count pour les services).
+
+Les modifications admin marquent les entrées à rafraîchir; elles sont
+relues en une requête lors de la suggestion suivante.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.models.service import Service
+from app.services.search_service import tokenize
+
+PRODUCT = "product"
+SERVICE = "service"
+
+# Nombre de préfixes dont le résultat est mémorisé
+MEMO_SIZE = 2048
+
+
+class Suggestion(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    slug: Optional[str]
+    popularity: int
+    tokens: Tuple[str, ...]
+
+
+class SuggestIndex:
+    """
+    Index de préfixes en mémoire
+
+    Usage:
+        suggest_index.replace(Suggestion("product", 1, "Sérum", "serum", 12, ("serum",)))
+        suggest_index.suggest("ser", limit=8)
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys: List[Tuple[str, str, int]] = []
+        self._items: Dict[Tuple[str, int], Suggestion] = {}
+        self._memo: Dict[Tuple[str, int], List[Suggestion]] = {}
+        self._dirty: Dict[str, Set[int]] = {PRODUCT: set(), SERVICE: set()}
+        self.loaded = False
+
+    # ----- Écriture -----
+
+    def load(self, items: Iterable[Suggestion]) -> None:
+        with self._lock:
+            self._items = {(item.kind, item.id): item for item in items}
+            self._keys = sorted(
+                (token, item.kind, item.id)
+                for item in self._items.values()
+                for token in set(item.tokens)
+            )
+            self._memo.clear()
+            self.loaded = True
+
+    def replace(self, item: Suggestion) -> None:
+        with self._lock:
+            self._remove(item.kind, item.id)
+            self._items[(item.kind, item.id)] = item
+            for token in set(item.tokens):
+                insort(self._keys, (token, item.kind, item.id))
+            self._memo.clear()
+
+    def remove(self, kind: str, item_id: int) -> None:
+        with self._lock:
+            self._remove(kind, item_id)
+            self._memo.clear()
+
+    def _remove(self, kind: str, item_id: int) -> None:
+        old = self._items.pop((kind, item_id), None)
+        if old is None:
+            return
+        for token in set(old.tokens):
+            position = bisect_left(self._keys, (token, kind, item_id))
+            if position < len(self._keys) and self._keys[position] == (token, kind, item_id):
+                del self._keys[position]
+
+    def mark_dirty(self, kind: str, item_ids: Iterable[int]) -> None:
+        """Signaler des entrées à relire avant la prochaine suggestion"""
+        with self._lock:
+            self._dirty[kind].update(item_ids)
+
+    def take_dirty(self) -> Dict[str, Set[int]]:
+        with self._lock:
+            dirty = {kind: ids for kind, ids in self._dirty.items() if ids}
+            self._dirty = {PRODUCT: set(), SERVICE: set()}
+            return dirty
+
+    # ----- Lecture -----
+
+    def suggest(self, query: str, limit: int = 8) -> List[Suggestion]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        memo_key = (" ".join(terms), limit)
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            # Parcourir la plage du terme le plus sélectif (deux dichotomies par terme)
+            ranges = [
+                (bisect_left(self._keys, (term,)), bisect_left(self._keys, (term + "\uffff",)))
+                for term in terms
+            ]
+            start, end = min(ranges, key=lambda bounds: bounds[1] - bounds[0])
+            seen: Set[Tuple[str, int]] = set()
+            matches: List[Suggestion] = []
+            for token, kind, item_id in self._keys[start:end]:
+                if (kind, item_id) in seen:
+                    continue
+                seen.add((kind, item_id))
+                item = self._items[(kind, item_id)]
+                if all(any(word.startswith(term) for word in item.tokens) for term in terms):
+                    matches.append(item)
+
+            matches.sort(key=lambda item: (-item.popularity, len(item.name), item.name))
+            result = matches[:limit]
+
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[memo_key] = result
+            return result
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Index partagé par le processus
+suggest_index = SuggestIndex()
+
+
+class SuggestService:
+    """Alimentation de l'index depuis la base et lecture des suggestions"""
+
+    def __init__(self, db: Session, index: Optional[SuggestIndex] = None):
+        self.db = db
+        self.index = index or suggest_index
+
+    def rebuild(self) -> int:
+        """Reconstruire l'index à partir des produits et services actifs"""
+        self.index.take_dirty()
+        products = self.db.query(
+            Product.id, Product.name, Product.slug, Product.sales_count
+        ).filter(Product.is_active == True)
+        services = self.db.query(
+            Service.id, Service.name, Service.slug, Service.booking_count
+        ).filter(Service.is_active == True)
+
+        self.index.load([
+            *(self._build(PRODUCT, *row) for row in products),
+            *(self._build(SERVICE, *row) for row in services),
+        ])
+        return len(self.index)
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict[str, object]]:
+        """Suggestions pour une saisie (aucune requête SQL hors rafraîchissement)"""
+        if not self.index.loaded:
+            self.rebuild()
+        else:
+            self._refresh_dirty()
+
+        return [
+            {"type": item.kind, "id": item.id, "name": item.name, "slug": item.slug}
+            for item in self.index.suggest(query, limit)
+        ]
+
+    def _refresh_dirty(self) -> None:
+        dirty = self.index.take_dirty()
+        for kind, model, popularity in (
+            (PRODUCT, Product, Product.sales_count),
+            (SERVICE, Service, Service.booking_count),
+        ):
+            ids = dirty.get(kind)
+            if not ids:
+                continue
+            rows = self.db.query(
+                model.id, model.name, model.slug, popularity, model.is_active
+            ).filter(model.id.in_(ids)).all()
+            found = set()
+            for row in rows:
+                found.add(row.id)
+                if row.is_active:
+                    self.index.replace(self._build(kind, row[0], row[1], row[2], row[3]))
+                else:
+                    self.index.remove(kind, row.id)
+            for missing in ids - found:
+                self.index.remove(kind, missing)
+
+    @staticmethod
+    def _build(kind: str, item_id: int, name: str, slug: Optional[str], popularity: Optional[int]) -> Suggestion:
+        return Suggestion(kind, item_id, name, slug, popularity or 0, tuple(tokenize(name)))
+
+
+# Factory function pour l'injection de dépendances
+def get_suggest_service(db: Session) -> SuggestService:
+    """Factory pour créer une instance de SuggestService"""
+    return SuggestService(db)
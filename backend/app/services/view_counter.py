@@ -0,0 +1,136 @@
+"""
+Tampon d'écriture différée pour les compteurs de vues
+Principe Single Responsibility: Agrège les vues en mémoire et les écrit par lots
+
+Les GET publics (fiche produit, fiche service) n'écrivent plus en base:
+ils incrémentent un compteur en mémoire, vidé périodiquement avec un seul
+UPDATE ... SET view_count = view_count + delta par table.
+
+Les vues déjà écrites par ce processus restent comptées (flushed): une fiche
+mise en cache avant un vidage affiche view_count + flushed - flushed au
+moment de la mise en cache + pending, et le compteur ne recule jamais.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import Table, case, func, update
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.product import Product
+from app.models.service import Service
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounterBuffer:
+    """
+    Compteurs de vues en attente d'écriture, par type d'entité et par id
+
+    Usage:
+        view_counter.increment("product", product.id)
+        view_count = product.view_count + view_counter.pending("product", product.id)
+
+        # Valeur en cache: base = view_counter.flushed(...) lu avec view_count
+        view_count = cached_view_count + view_counter.since("product", product_id, base)
+    """
+
+    def __init__(self, tables: Dict[str, Table], flush_interval: float = 10.0):
+        self.tables = tables
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[int, int]] = {kind: {} for kind in tables}
+        self._flushed: Dict[str, Dict[int, int]] = {kind: {} for kind in tables}
+        self._task: Optional[asyncio.Task] = None
+
+    def increment(self, kind: str, entity_id: int, delta: int = 1) -> None:
+        """Enregistrer une vue (aucune requête SQL)"""
+        with self._lock:
+            counters = self._pending[kind]
+            counters[entity_id] = counters.get(entity_id, 0) + delta
+
+    def pending(self, kind: str, entity_id: int) -> int:
+        """Vues pas encore écrites en base pour une entité"""
+        with self._lock:
+            return self._pending[kind].get(entity_id, 0)
+
+    def flushed(self, kind: str, entity_id: int) -> int:
+        """Vues déjà écrites en base par ce processus pour une entité"""
+        with self._lock:
+            return self._flushed[kind].get(entity_id, 0)
+
+    def since(self, kind: str, entity_id: int, flushed: int) -> int:
+        """Vues enregistrées depuis une valeur lue avec flushed() (écrites ou non)"""
+        with self._lock:
+            return (
+                self._flushed[kind].get(entity_id, 0) - flushed
+                + self._pending[kind].get(entity_id, 0)
+            )
+
+    def flush(self) -> int:
+        """Écrire les compteurs en attente; retourne le nombre de lignes mises à jour"""
+        with self._lock:
+            batches = {kind: counters for kind, counters in self._pending.items() if counters}
+            self._pending = {kind: {} for kind in self.tables}
+
+        updated = 0
+        for kind, deltas in batches.items():
+            table = self.tables[kind]
+            stmt = (
+                update(table)
+                .where(table.c.id.in_(list(deltas)))
+                .values(
+                    view_count=func.coalesce(table.c.view_count, 0)
+                    + case(deltas, value=table.c.id, else_=0)
+                )
+            )
+            try:
+                with engine.begin() as conn:
+                    conn.execute(stmt)
+                updated += len(deltas)
+                with self._lock:
+                    written = self._flushed[kind]
+                    for entity_id, delta in deltas.items():
+                        written[entity_id] = written.get(entity_id, 0) + delta
+            except Exception as e:
+                # Remettre les compteurs dans le tampon pour le prochain cycle
+                logger.error(f"Échec de l'écriture des vues ({kind}): {e}")
+                for entity_id, delta in deltas.items():
+                    self.increment(kind, entity_id, delta)
+
+        return updated
+
+    async def run(self) -> None:
+        """Boucle de vidage périodique"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def start(self) -> None:
+        """Démarrer la boucle de vidage (au démarrage de l'application)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Arrêter la boucle et écrire les dernières vues (arrêt gracieux)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+# Instance partagée par le processus
+view_counter = ViewCounterBuffer(
+    tables={
+        "product": Product.__table__,
+        "service": Service.__table__,
+    },
+    flush_interval=settings.VIEW_COUNT_FLUSH_SECONDS
+)
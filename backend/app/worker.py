@@ -0,0 +1,28 @@
+"""
+StelleWorld - Worker Celery (optionnel) des tâches en arrière-plan
+
+Avec JOBS_BACKEND=celery, l'API prend les tâches dues dans background_jobs
+et les envoie au broker (CELERY_BROKER_URL); ce worker les exécute:
+
+    celery -A app.worker worker --loglevel=info
+
+Sans Celery (JOBS_BACKEND=local, par défaut), l'API les exécute elle-même.
+"""
+
+from celery import Celery
+
+from app.core.config import settings
+from app.services import checkout_jobs  # noqa: F401 - enregistre les tâches après commande
+from app.services.job_queue import execute_job
+
+celery_app = Celery(
+    "stelleworld",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND
+)
+
+
+@celery_app.task(name="stelleworld.run_job")
+def run_job(job_id: int) -> bool:
+    """Exécuter une tâche prise par l'API (statut et nouveaux essais gérés en base)"""
+    return execute_job(job_id)
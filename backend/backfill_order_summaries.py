@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Script de remplissage du résumé dénormalisé des commandes existantes
+À exécuter une fois depuis le dossier backend/, après la migration 0009.
+
+Calcule item_count (somme des quantités des articles), customer_name et
+customer_email (client du compte) des commandes créées avant ces colonnes.
+Chaque lot est une seule requête UPDATE validée séparément: les commandes
+ne sont jamais verrouillées longtemps. Relançable sans risque (seules les
+commandes encore incomplètes sont traitées).
+
+Usage:
+    python backfill_order_summaries.py [--batch-size 1000] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+from sqlalchemy import func, or_, select, update
+
+# Ajouter le dossier parent au PYTHONPATH pour les imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.models.order import Order, OrderItem
+from app.models.user import User
+
+PENDING = or_(Order.item_count.is_(None), Order.customer_name.is_(None), Order.customer_email.is_(None))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=1000, help="Commandes par lot")
+    parser.add_argument("--dry-run", action="store_true", help="Compter sans modifier la base")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        remaining = db.query(func.count(Order.id)).filter(PENDING).scalar()
+        print(f"📦 {remaining} commande(s) sans résumé")
+        if args.dry_run:
+            print("ℹ️ Aucune modification (--dry-run)")
+            sys.exit(0)
+
+        item_count = (
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+        )
+        customer_name = select(User.first_name + " " + User.last_name).where(User.id == Order.user_id).scalar_subquery()
+        customer_email = select(User.email).where(User.id == Order.user_id).scalar_subquery()
+
+        done = 0
+        last_id = 0
+        while True:
+            # Lot suivant par id croissant (recherche d'index, pas d'OFFSET)
+            ids = [
+                row.id for row in
+                db.query(Order.id)
+                .filter(Order.id > last_id, PENDING)
+                .order_by(Order.id)
+                .limit(args.batch_size)
+                .all()
+            ]
+            if not ids:
+                break
+
+            db.execute(
+                update(Order)
+                .where(Order.id.in_(ids))
+                .values(
+                    item_count=func.coalesce(Order.item_count, item_count),
+                    customer_name=func.coalesce(Order.customer_name, customer_name),
+                    customer_email=func.coalesce(Order.customer_email, customer_email),
+                    # Remplissage technique: la date de modification ne change pas
+                    updated_at=Order.updated_at
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            done += len(ids)
+            last_id = ids[-1]
+            print(f"   {done}/{remaining}")
+
+        print(f"✅ {done} commande(s) complétée(s)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
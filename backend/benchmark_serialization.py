@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la sérialisation des réponses de liste (page de 100 éléments)
+
+Compare, sur des objets SQLAlchemy construits en mémoire (aucune base requise):
+- avant: dictionnaires construits à la main + jsonable_encoder + json (JSONResponse)
+- après: modèles Pydantic typés rendus par FastJSONResponse (pydantic-core / orjson)
+
+Usage:
+    python benchmark_serialization.py [--items 100] [--rounds 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Ajouter le dossier parent au PYTHONPATH pour les imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.product import Category, Product
+from app.schemas.catalog import ProductCard, ProductPage
+from app.schemas.order import OrderList, OrderSummary
+
+
+def build_products(count: int):
+    category = Category(id=1, name="Soins du visage", slug="soins-du-visage")
+    now = datetime.utcnow()
+    return [
+        Product(
+            id=i,
+            name=f"Sérum éclat vitamine C n°{i}",
+            slug=f"serum-eclat-vitamine-c-{i}",
+            description="Sérum concentré à la vitamine C pour un teint lumineux. " * 4,
+            short_description="Sérum éclat à la vitamine C",
+            price=29.90 + i,
+            compare_at_price=39.90 + i if i % 3 == 0 else None,
+            stock_quantity=i % 7,
+            track_inventory=True,
+            allow_backorder=False,
+            is_active=True,
+            is_featured=i % 5 == 0,
+            main_image_url=f"https://cdn.example.com/products/{i}.jpg",
+            gallery_images='["https://cdn.example.com/products/a.jpg"]',
+            sales_count=i * 3,
+            view_count=i * 11,
+            category=category,
+            created_at=now - timedelta(days=i),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def build_orders(count: int):
+    now = datetime.utcnow()
+    return [
+        Order(
+            id=i,
+            order_number=f"ST-20250101-{i:04d}",
+            status=OrderStatus.CONFIRMED,
+            payment_status=PaymentStatus.PAID,
+            total_amount=59.80 + i,
+            items=[],
+            created_at=now - timedelta(hours=i),
+            confirmed_at=now - timedelta(hours=i - 1),
+            shipped_at=None,
+            tracking_number=None,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def products_before(products):
+    payload = {
+        "products": [
+            {
+                "id": product.id,
+                "name": product.name,
+                "description": product.description,
+                "short_description": product.short_description,
+                "slug": product.slug,
+                "price": product.price,
+                "compare_at_price": product.compare_at_price,
+                "discount_percentage": product.discount_percentage,
+                "main_image_url": product.main_image_url,
+                "gallery_images": product.gallery_images,
+                "is_in_stock": product.is_in_stock,
+                "is_active": product.is_active,
+                "stock_quantity": product.stock_quantity if product.track_inventory else None,
+                "is_featured": product.is_featured,
+                "category": {
+                    "id": product.category.id,
+                    "name": product.category.name,
+                    "slug": product.category.slug
+                } if product.category else None,
+                "sales_count": product.sales_count,
+                "view_count": product.view_count
+            }
+            for product in products
+        ],
+        "total": len(products),
+        "skip": 0,
+        "limit": len(products),
+        "has_more": False,
+        "next_cursor": None
+    }
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def products_after(products):
+    page = ProductPage(
+        products=[ProductCard.model_validate(product) for product in products],
+        total=len(products),
+        skip=0,
+        limit=len(products),
+    )
+    return FastJSONResponse(page).body
+
+
+def orders_before(orders):
+    payload = {
+        "orders": [
+            {
+                "id": order.id,
+                "order_number": order.order_number,
+                "status": order.status,
+                "payment_status": order.payment_status,
+                "total_amount": order.total_amount,
+                "total_items": order.total_items,
+                "created_at": order.created_at,
+                "confirmed_at": order.confirmed_at,
+                "shipped_at": order.shipped_at,
+                "tracking_number": order.tracking_number
+            }
+            for order in orders
+        ]
+    }
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def orders_after(orders):
+    return FastJSONResponse(OrderList(
+        orders=[OrderSummary.model_validate(order) for order in orders]
+    )).body
+
+
+def measure(func, data, rounds: int) -> float:
+    """Durée moyenne d'un appel, en millisecondes"""
+    func(data)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(data)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"⏱️  Sérialisation d'une page de {args.items} éléments ({args.rounds} tours)\n")
+    print(f"{'Liste':<12}{'avant (ms)':>12}{'après (ms)':>12}{'gain':>8}")
+
+    for label, data, before, after in (
+        ("produits", build_products(args.items), products_before, products_after),
+        ("commandes", build_orders(args.items), orders_before, orders_after),
+    ):
+        before_ms = measure(before, data, args.rounds)
+        after_ms = measure(after, data, args.rounds)
+        print(f"{label:<12}{before_ms:>12.3f}{after_ms:>12.3f}{before_ms / after_ms:>7.1f}x")
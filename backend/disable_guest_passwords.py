@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script de migration des clients invités créés avant GuestCustomerService
+À exécuter une fois depuis le dossier backend/.
+
+Les anciens invités WhatsApp ont un hash bcrypt du mot de passe partagé
+"whatsapp_guest": n'importe qui pouvait se connecter à leur compte. Ce
+script le remplace par le marqueur UNUSABLE_PASSWORD (aucune connexion
+possible), comme pour les nouveaux invités.
+
+Seuls les comptes non admin ayant au moins une commande WhatsApp (WA-)
+sont vérifiés (bcrypt est volontairement lent).
+
+Usage:
+    python disable_guest_passwords.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+# Ajouter le dossier parent au PYTHONPATH pour les imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.core.security import UNUSABLE_PASSWORD, verify_password
+from app.models.order import Order
+from app.models.user import User
+
+LEGACY_GUEST_PASSWORD = "whatsapp_guest"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true", help="Compter sans modifier la base")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        candidates = (
+            db.query(User)
+            .filter(
+                User.is_admin == False,
+                User.id.in_(db.query(Order.user_id).filter(Order.order_number.like("WA-%")))
+            )
+            .all()
+        )
+        print(f"🔐 {len(candidates)} compte(s) avec une commande WhatsApp à vérifier...")
+
+        disabled = 0
+        for user in candidates:
+            if verify_password(LEGACY_GUEST_PASSWORD, user.hashed_password):
+                user.hashed_password = UNUSABLE_PASSWORD
+                disabled += 1
+
+        if args.dry_run:
+            db.rollback()
+            print(f"ℹ️ {disabled} invité(s) à migrer (aucune modification, --dry-run)")
+        else:
+            db.commit()
+            print(f"✅ {disabled} invité(s) migré(s) vers un mot de passe inutilisable")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
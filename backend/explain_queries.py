@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Vérification des plans d'exécution des requêtes fréquentes
+
+Exécute EXPLAIN sur chaque forme de requête enregistrée ci-dessous (listes
+du catalogue, commandes, analytics, classements, réservations, rendez-vous) et signale celles qui
+parcourent encore une table séquentiellement.
+
+Sur PostgreSQL, le planificateur est lancé avec enable_seqscan = off: sur
+une petite base il préfère souvent un Seq Scan même quand un index existe,
+un Seq Scan restant signifie donc qu'aucun index n'est utilisable.
+Sur SQLite, EXPLAIN QUERY PLAN signale les "SCAN <table>" sans index.
+
+Usage:
+    python explain_queries.py [--verbose]
+
+Code de sortie 1 si au moins une requête fait un parcours séquentiel.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+# Ajouter le dossier parent au PYTHONPATH pour les imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import and_, desc, func, text
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, SessionLocal
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
+from app.models.product import Category, Product
+from app.models.sales import ProductSalesDaily
+from app.models.stock import StockHold
+from app.services.product_service import active_product_counts
+
+# Nom de la forme -> fonction construisant la requête (Query ORM)
+QUERY_SHAPES: Dict[str, Callable[[Session], object]] = {}
+
+
+def query_shape(name: str):
+    """Enregistrer une forme de requête à vérifier"""
+    def register(build: Callable[[Session], object]):
+        QUERY_SHAPES[name] = build
+        return build
+    return register
+
+
+NOW = datetime.utcnow()
+PERIOD_START = NOW - timedelta(days=30)
+
+
+# ----- Catalogue (app/api/products.py) -----
+
+@query_shape("products.list.created_at")
+def _products_list(db: Session):
+    return (
+        db.query(Product).filter(Product.is_active == True)
+        .order_by(Product.created_at.desc(), Product.id.desc()).limit(20)
+    )
+
+
+@query_shape("products.list.category")
+def _products_by_category(db: Session):
+    return (
+        db.query(Product).filter(Product.is_active == True, Product.category_id == 1)
+        .order_by(Product.created_at.desc(), Product.id.desc()).limit(20)
+    )
+
+
+@query_shape("products.list.price_range")
+def _products_by_price(db: Session):
+    return (
+        db.query(Product)
+        .filter(Product.is_active == True, Product.price >= 10, Product.price <= 50)
+        .order_by(Product.price.asc(), Product.id.asc()).limit(20)
+    )
+
+
+@query_shape("products.best_sellers")
+def _products_best_sellers(db: Session):
+    return (
+        db.query(Product).filter(Product.is_active == True)
+        .order_by(Product.sales_count.desc()).limit(10)
+    )
+
+
+@query_shape("products.featured")
+def _products_featured(db: Session):
+    return (
+        db.query(Product)
+        .filter(and_(Product.is_active == True, Product.is_featured == True))
+        .order_by(Product.sales_count.desc(), Product.created_at.desc()).limit(8)
+    )
+
+
+@query_shape("categories.product_counts")
+def _category_counts(db: Session):
+    counts = active_product_counts()
+    return (
+        db.query(Category.id, func.coalesce(counts.c.product_count, 0))
+        .outerjoin(counts, counts.c.category_id == Category.id)
+        .filter(Category.slug == "soins")
+    )
+
+
+# ----- Commandes (app/api/orders.py) -----
+
+@query_shape("orders.admin.list")
+def _orders_admin(db: Session):
+    return db.query(Order).order_by(Order.created_at.desc(), Order.id.desc()).limit(50)
+
+
+@query_shape("orders.admin.by_status")
+def _orders_admin_status(db: Session):
+    return (
+        db.query(Order).filter(Order.status == OrderStatus.PENDING)
+        .order_by(Order.created_at.desc(), Order.id.desc()).limit(50)
+    )
+
+
+@query_shape("orders.user_history")
+def _orders_user(db: Session):
+    return db.query(Order).filter(Order.user_id == 1).order_by(Order.created_at.desc())
+
+
+# ----- Analytics (app/api/analytics.py) -----
+
+@query_shape("analytics.paid_revenue")
+def _paid_revenue(db: Session):
+    return db.query(func.sum(Order.total_amount)).filter(
+        Order.payment_status == PaymentStatus.PAID,
+        Order.created_at >= PERIOD_START
+    )
+
+
+@query_shape("analytics.best_sellers")
+def _analytics_best_sellers(db: Session):
+    return (
+        db.query(Product.id, func.sum(OrderItem.quantity).label("total_sold"))
+        .join(OrderItem, Product.id == OrderItem.product_id)
+        .join(Order, OrderItem.order_id == Order.id)
+        .filter(Order.created_at >= PERIOD_START, Order.payment_status == PaymentStatus.PAID)
+        .group_by(Product.id)
+        .order_by(desc("total_sold"))
+        .limit(10)
+    )
+
+
+@query_shape("leaderboards.daily_snapshot")
+def _sales_snapshot(db: Session):
+    return db.query(ProductSalesDaily.product_id, ProductSalesDaily.quantity).filter(
+        ProductSalesDaily.day >= PERIOD_START.date()
+    )
+
+
+@query_shape("analytics.order_items")
+def _order_items(db: Session):
+    return db.query(OrderItem.product_id).filter(OrderItem.order_id == 1)
+
+
+# ----- Réservations de stock (app/services/inventory_service.py) -----
+
+@query_shape("stock_holds.expired")
+def _expired_holds(db: Session):
+    return (
+        db.query(StockHold.id, StockHold.product_id, StockHold.quantity)
+        .filter(StockHold.expires_at <= NOW).order_by(StockHold.expires_at).limit(1000)
+    )
+
+
+@query_shape("stock_holds.token")
+def _hold_lines(db: Session):
+    return db.query(StockHold.product_id, StockHold.quantity).filter(StockHold.token == "x")
+
+
+# ----- Rendez-vous (app/api/appointments.py) -----
+
+@query_shape("appointments.slot_check")
+def _slot_check(db: Session):
+    return db.query(func.count(Appointment.id)).filter(
+        Appointment.scheduled_date == NOW,
+        Appointment.status.in_([
+            AppointmentStatus.PENDING,
+            AppointmentStatus.CONFIRMED,
+            AppointmentStatus.IN_PROGRESS
+        ])
+    )
+
+
+@query_shape("appointments.admin.range")
+def _appointments_range(db: Session):
+    return (
+        db.query(Appointment)
+        .filter(Appointment.scheduled_date >= PERIOD_START, Appointment.scheduled_date < NOW)
+        .order_by(Appointment.scheduled_date.desc(), Appointment.id.desc()).limit(50)
+    )
+
+
+@query_shape("appointments.admin.by_status")
+def _appointments_status(db: Session):
+    return (
+        db.query(Appointment).filter(Appointment.status == AppointmentStatus.CONFIRMED)
+        .order_by(Appointment.scheduled_date.desc(), Appointment.id.desc()).limit(50)
+    )
+
+
+@query_shape("appointments.user")
+def _appointments_user(db: Session):
+    return (
+        db.query(Appointment).filter(Appointment.user_id == 1)
+        .order_by(Appointment.scheduled_date.desc())
+    )
+
+
+# ----- Analyse des plans -----
+
+def _compile(db: Session, query) -> str:
+    statement = query.statement if hasattr(query, "statement") else query
+    return str(statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"literal_binds": True}
+    ))
+
+
+def _postgres_seq_scans(plan: dict) -> List[str]:
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        scans.extend(_postgres_seq_scans(child))
+    return scans
+
+
+def explain(db: Session, query) -> Dict[str, object]:
+    """Plan d'une requête et tables parcourues séquentiellement"""
+    sql = _compile(db, query)
+
+    if db.get_bind().dialect.name == "postgresql":
+        row = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = (json.loads(row) if isinstance(row, str) else row)[0]["Plan"]
+        return {"plan": plan, "seq_scans": _postgres_seq_scans(plan)}
+
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    details = [row[-1] for row in rows]
+    # Seules les tables comptent (pas les sous-requêtes matérialisées)
+    seq_scans = [
+        detail.split()[1] for detail in details
+        if detail.startswith("SCAN ") and " INDEX" not in detail
+        and detail.split()[1] in Base.metadata.tables
+    ]
+    return {"plan": details, "seq_scans": seq_scans}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verbose", action="store_true", help="Afficher les plans complets")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET enable_seqscan = off"))
+
+        flagged = 0
+        print(f"🔎 {len(QUERY_SHAPES)} forme(s) de requête ({db.get_bind().dialect.name})\n")
+        for name, build in QUERY_SHAPES.items():
+            result = explain(db, build(db))
+            if result["seq_scans"]:
+                flagged += 1
+                print(f"❌ {name}: parcours séquentiel de {', '.join(result['seq_scans'])}")
+            else:
+                print(f"✅ {name}")
+            if args.verbose:
+                plan = result["plan"]
+                print("   " + (json.dumps(plan, indent=2) if isinstance(plan, dict) else "\n   ".join(plan)))
+    finally:
+        db.rollback()
+        db.close()
+
+    print(f"\n{flagged} requête(s) avec parcours séquentiel")
+    sys.exit(1 if flagged else 0)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Script de reconstruction de l'index de recherche des produits
+À exécuter depuis le dossier backend/ après un chargement de fixtures
+ou une modification directe des produits en base.
+
+Usage:
+    python rebuild_search_index.py
+"""
+
+import sys
+import os
+
+# Ajouter le dossier parent au PYTHONPATH pour les imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal, engine, Base
+from app.models import Product, ProductSearchDocument
+from app.services.search_service import get_search_service
+
+if __name__ == "__main__":
+    print("🔎 Reconstruction de l'index de recherche...")
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        indexed = get_search_service(db).ensure_index(rebuild=True)
+        print(f"✅ {indexed} produit(s) indexé(s)")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test de charge de la réservation de stock (aucune survente sous concurrence)
+
+Crée des produits temporaires à faible stock, puis lance de nombreux
+threads qui les commandent tous en même temps, chacun avec sa session et
+sa transaction (comme une requête HTTP) et dans un ordre de panier
+aléatoire (vérifie aussi l'absence d'interblocage).
+
+Vérifie à la fin, pour chaque produit:
+- le stock disponible observé n'est jamais négatif;
+- les unités réservées ne dépassent pas le stock initial;
+- stock disponible final = stock initial - unités réservées.
+
+--holds remplace les commandes par des réservations temporaires (POST
+/api/orders/holds): le stock physique reste intact, reserved_quantity
+porte les unités retenues.
+
+Usage:
+    python stress_stock_reservation.py [--stock 5] [--threads 50] [--products 2] [--quantity 1] [--holds]
+
+Sur SQLite, des transactions concurrentes échouent en "database is locked":
+elles sont comptées à part (la garantie vérifiée est l'absence de survente).
+Les produits temporaires sont supprimés à la fin.
+Code de sortie 1 en cas de survente ou de stock négatif.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+# Ajouter le dossier parent au PYTHONPATH pour les imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import SessionLocal
+from app.models.product import Product
+from app.models.stock import StockHold
+from app.services.inventory_service import InventoryService, StockError
+
+
+def create_products(count: int, stock: int) -> list:
+    db = SessionLocal()
+    try:
+        suffix = uuid.uuid4().hex[:8]
+        products = [
+            Product(
+                name=f"Stress stock {suffix} #{i}",
+                slug=f"stress-stock-{suffix}-{i}",
+                price=10.0,
+                stock_quantity=stock,
+                track_inventory=True,
+                allow_backorder=False,
+                is_active=True,
+            )
+            for i in range(count)
+        ]
+        db.add_all(products)
+        db.commit()
+        return [product.id for product in products]
+    finally:
+        db.close()
+
+
+def delete_products(product_ids: list) -> None:
+    db = SessionLocal()
+    try:
+        db.query(StockHold).filter(StockHold.product_id.in_(product_ids)).delete(synchronize_session=False)
+        db.query(Product).filter(Product.id.in_(product_ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def stocks(product_ids: list) -> dict:
+    """Stock disponible (physique moins réservé) de chaque produit"""
+    db = SessionLocal()
+    try:
+        return dict(db.query(Product.id, Product.available_quantity).filter(Product.id.in_(product_ids)).all())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stock", type=int, default=5, help="Stock initial de chaque produit")
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--products", type=int, default=2, help="Produits par panier")
+    parser.add_argument("--quantity", type=int, default=1, help="Quantité de chaque produit par panier")
+    parser.add_argument("--holds", action="store_true", help="Réservations temporaires au lieu de commandes")
+    args = parser.parse_args()
+
+    product_ids = create_products(args.products, args.stock)
+    reserved = Counter()
+    outcomes = Counter()
+    lowest = {"stock": args.stock}
+    lock = threading.Lock()
+    start = threading.Barrier(args.threads)
+    running = threading.Event()
+    running.set()
+
+    def checkout() -> None:
+        cart = {product_id: args.quantity for product_id in random.sample(product_ids, len(product_ids))}
+        start.wait()
+        db = SessionLocal()
+        try:
+            if args.holds:
+                InventoryService(db).create_hold(cart)
+            else:
+                InventoryService(db).reserve(cart)
+            time.sleep(random.random() / 100)  # Transaction ouverte pendant le reste de la commande
+            db.commit()
+            with lock:
+                reserved.update(cart)
+                outcomes["réservées"] += 1
+        except StockError:
+            db.rollback()
+            with lock:
+                outcomes["refusées (stock)"] += 1
+        except DBAPIError as error:
+            db.rollback()
+            with lock:
+                outcomes[f"erreurs base ({type(error.orig).__name__})"] += 1
+        finally:
+            db.close()
+
+    def monitor() -> None:
+        while running.is_set():
+            current = min(stocks(product_ids).values(), default=0)
+            lowest["stock"] = min(lowest["stock"], current)
+            time.sleep(0.005)
+
+    watcher = threading.Thread(target=monitor)
+    watcher.start()
+    threads = [threading.Thread(target=checkout) for _ in range(args.threads)]
+    began = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+    finally:
+        running.clear()
+        watcher.join()
+
+    final = stocks(product_ids)
+    delete_products(product_ids)
+
+    print(f"🧪 {args.threads} {'réservations concurrentes' if args.holds else 'paniers concurrents'} sur "
+          f"{args.products} produit(s) de stock {args.stock} ({elapsed:.2f}s)\n")
+    for label, count in sorted(outcomes.items()):
+        print(f"   {label}: {count}")
+
+    failures = []
+    for product_id in product_ids:
+        sold = reserved[product_id]
+        print(f"   produit {product_id}: {sold} unité(s) réservée(s), stock disponible final {final[product_id]}")
+        if sold > args.stock:
+            failures.append(f"survente du produit {product_id} ({sold} > {args.stock})")
+        if final[product_id] != args.stock - sold:
+            failures.append(f"stock final incohérent pour {product_id} ({final[product_id]} != {args.stock - sold})")
+    if lowest["stock"] < 0 or min(final.values()) < 0:
+        failures.append("stock négatif observé")
+
+    print()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Aucune survente, aucun stock négatif")
+    sys.exit(1 if failures else 0)
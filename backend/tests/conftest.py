@@ -0,0 +1,41 @@
+"""
+Fixtures communes des tests backend
+
+La base de test est un fichier SQLite temporaire: DATABASE_URL est fixé
+avant le premier import de l'application (le moteur et create_all sont
+exécutés à l'import de app.main), jamais la base configurée.
+"""
+
+import os
+import sys
+import tempfile
+
+_TEST_DIR = tempfile.mkdtemp(prefix="stelleworld-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ["DEBUG"] = "false"
+
+# Ajouter le dossier backend au PYTHONPATH pour les imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    """Client de test FastAPI (sans les tâches de démarrage)"""
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    """Session de base de données de test"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,83 @@
+"""
+Nombre de requêtes SQL des listes du catalogue
+
+Avec un chargement anticipé correct (PRODUCT_LIST_OPTIONS, comptages
+agrégés), chaque liste envoie un nombre fixe d'instructions SQL: il ne
+dépend pas de la taille de la page. Le cache du catalogue est vidé avant
+chaque appel pour mesurer la base.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine
+from app.core.security import get_current_admin_user
+from app.models.product import Category, Product
+from app.services.catalog_cache import catalog_cache
+
+CATEGORIES = 12
+PRODUCTS = 60
+MAX_STATEMENTS = 5
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """Catalogue de PRODUCTS produits actifs répartis sur CATEGORIES catégories"""
+    db = SessionLocal()
+    try:
+        categories = [
+            Category(name=f"Catégorie {i}", slug=f"categorie-{i}", sort_order=i)
+            for i in range(CATEGORIES)
+        ]
+        db.add_all(categories)
+        db.flush()
+        db.add_all([
+            Product(
+                name=f"Produit {i}",
+                slug=f"produit-{i}",
+                price=10 + i,
+                stock_quantity=20,
+                category_id=categories[i % CATEGORIES].id,
+                is_active=True
+            )
+            for i in range(PRODUCTS)
+        ])
+        db.commit()
+        yield
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def statements():
+    """Instructions SQL envoyées pendant le test"""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("url", [
+    "/api/products/",
+    "/api/products/categories",
+    "/api/admin/products",
+])
+def test_list_statement_count_is_independent_of_page_size(url, catalog, client, statements):
+    """Même nombre de requêtes (borné) pour limit=5 et limit=50"""
+    # Endpoints admin appelés sans jeton: seul le nombre de requêtes est mesuré
+    client.app.dependency_overrides[get_current_admin_user] = lambda: None
+
+    counts = {}
+    for limit in (5, 50):
+        catalog_cache.clear()
+        statements.clear()
+        response = client.get(url, params={"limit": limit})
+        assert response.status_code == 200, response.text
+        counts[limit] = len(statements)
+
+    assert counts[5] == counts[50], f"{url}: {counts}"
+    assert counts[50] <= MAX_STATEMENTS, f"{url}: {counts}"